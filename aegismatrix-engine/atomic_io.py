@@ -0,0 +1,134 @@
+"""
+Crash- and concurrency-safe file writes.
+
+Writers produce a temp file in the target's directory and os.replace() it
+over the target, so a reader opening the path sees either the old or the
+new complete file, never a partial one; readers take no locks. Writers that
+read-modify-write (appends, merges, publishing a model generation) serialize
+on an advisory lock file (fcntl.flock; a no-op where fcntl is unavailable).
+"""
+
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, rename is still atomic
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+# Process umask (read once: os.umask can only be queried by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _temp_path(path: Path) -> Path:
+    """Unique hidden sibling that keeps the suffix (np.savez and friends key off it)."""
+    fd, name = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=f".tmp{path.suffix}", dir=path.parent)
+    os.close(fd)
+    return Path(name)
+
+
+def _match_mode(tmp: Path, path: Path):
+    """Give the temp file the target's mode, or the umask default for a new file (mkstemp creates 0600)."""
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp, mode)
+
+
+def _fsync_dir(directory: Path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def write_lock(path: PathLike, blocking: bool = True) -> Iterator[bool]:
+    """
+    Exclusive advisory lock for writers of `path` (lock file `<path>.lock`).
+
+    Args:
+        path: File (or directory) being written
+        blocking: Wait for the lock; if False, yield False when it is held elsewhere
+
+    Yields:
+        True if the lock is held
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield True
+        return
+    with open(path.with_name(path.name + ".lock"), "a") as handle:
+        flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(handle, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_path(path: PathLike) -> Iterator[Path]:
+    """
+    Temp path to hand to a library writer (to_parquet, np.savez, ...);
+    it replaces `path` only if the block succeeds.
+
+    Args:
+        path: Final destination
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(path)
+    try:
+        yield tmp
+        _match_mode(tmp, path)
+        os.replace(tmp, path)
+        _fsync_dir(path.parent)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+@contextmanager
+def atomic_write(path: PathLike, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """
+    Open a temp file for writing; it is fsynced and renamed over `path` on
+    success, discarded on error.
+
+    Args:
+        path: Final destination
+        mode: "w" or "wb"
+        **kwargs: Passed to open() (e.g. encoding)
+    """
+    with atomic_path(path) as tmp:
+        with open(tmp, mode, **kwargs) as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+def atomic_write_text(path: PathLike, text: str, encoding: str = "utf-8") -> Path:
+    """Atomic replacement for Path.write_text."""
+    with atomic_write(path, "w", encoding=encoding) as handle:
+        handle.write(text)
+    return Path(path)
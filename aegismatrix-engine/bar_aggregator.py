@@ -0,0 +1,183 @@
+"""
+Incremental bar aggregation: ingest the finest bars once (1m or 5m) and
+maintain coarser timeframes plus a synthetic "today so far" daily bar.
+
+Each new bar only touches the last (partial) bucket of every timeframe, so
+all timeframes stay consistent with each other without extra downloads.
+Intraday buckets are anchored at the NSE open (09:15 IST), matching how
+NSE charts label 15m/30m/1h bars. Timestamps are naive UTC, as cached.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+SESSION_OPEN_MINUTE = 9 * 60 + 15  # 09:15 IST, minutes since midnight
+
+# Timeframe name -> bucket size in minutes (None = one bucket per session)
+TIMEFRAMES = {
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "1h": 60,
+    "1d": None,
+}
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _bucket(ts: int, minutes: Optional[int]) -> int:
+    """
+    Bucket start (epoch seconds, UTC) for a bar starting at ts.
+    Daily buckets are labelled at the session open, like the daily cache.
+    """
+    ist = ts + IST_OFFSET_SECONDS
+    day_start = ist - ist % 86400
+    if minutes is None:
+        start_minute = SESSION_OPEN_MINUTE
+    else:
+        minute_of_day = (ist % 86400) // 60
+        start_minute = SESSION_OPEN_MINUTE + ((minute_of_day - SESSION_OPEN_MINUTE) // minutes) * minutes
+    return day_start + start_minute * 60 - IST_OFFSET_SECONDS
+
+
+def interval_minutes(interval: str) -> Optional[int]:
+    """Minutes in an intraday interval string ("5m", "60m", "1h"); None for daily and longer."""
+    if interval.endswith(("d", "wk", "mo")):
+        return None
+    return int(pd.Timedelta(interval).total_seconds() // 60)
+
+
+def on_grid(index: pd.DatetimeIndex, minutes: int) -> np.ndarray:
+    """
+    True for bars starting on the `minutes` grid anchored at the session open.
+    Yahoo appends the live quote with its own timestamp (e.g. 08:22:32 on a
+    5m chart); that bar is off the grid.
+
+    Args:
+        index: Naive UTC bar start times
+        minutes: Bar size
+    """
+    ts = pd.DatetimeIndex(index).as_unit("s").asi8
+    ist = ts + IST_OFFSET_SECONDS
+    minute_of_day = (ist % 86400) // 60
+    return (ist % 60 == 0) & ((minute_of_day - SESSION_OPEN_MINUTE) % minutes == 0)
+
+
+class BarAggregator:
+    """
+    Maintain OHLCV bars for several timeframes from one stream of fine bars.
+
+    Args:
+        timeframes: Names from TIMEFRAMES to maintain
+        bar_minutes: Size of the fine bars; off-grid bars (Yahoo's live
+            quote) are then folded into the bar of their slot
+    """
+
+    def __init__(self, timeframes: Sequence[str] = tuple(TIMEFRAMES), bar_minutes: Optional[int] = None):
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Unknown timeframes: {unknown}")
+        self.timeframes = list(timeframes)
+        self.bar_minutes = bar_minutes
+        self.last_ts: Optional[int] = None
+        self._last_bar: Optional[list] = None  # [o, h, l, c, v] of the bar at last_ts
+        # Completed buckets per timeframe: list of [start, o, h, l, c, v]
+        self._done: Dict[str, List[list]] = {tf: [] for tf in self.timeframes}
+        # Current (partial) bucket, and its state before the last bar was applied
+        self._open: Dict[str, Optional[list]] = {tf: None for tf in self.timeframes}
+        self._before_last: Dict[str, Optional[list]] = {tf: None for tf in self.timeframes}
+        self._last_rolled: Dict[str, bool] = {tf: False for tf in self.timeframes}
+
+    def update(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> None:
+        """
+        Apply one fine bar (start time ts, epoch seconds UTC).
+
+        A bar with the same timestamp as the previous one replaces it (a
+        still-forming bar being refreshed); older bars are ignored. With
+        bar_minutes set, an off-grid bar is snapped to its slot and, if that
+        slot is the last bar's, merged into it; the settled bar for the slot
+        then replaces the merged one.
+        """
+        if self.bar_minutes is not None:
+            slot = _bucket(ts, self.bar_minutes)
+            if slot != ts:
+                if slot == self.last_ts and self._last_bar is not None:
+                    last_o, last_h, last_l, _, last_v = self._last_bar
+                    o, h, l, v = last_o, max(last_h, h), min(last_l, l), max(last_v, v)
+                ts = slot
+        if self.last_ts is not None and ts < self.last_ts:
+            logger.debug(f"Ignoring out-of-order bar at {ts}")
+            return
+        replace = ts == self.last_ts
+
+        for tf in self.timeframes:
+            if replace:
+                # Undo the previous version of this bar before re-applying it
+                if self._last_rolled[tf]:
+                    self._done[tf].pop()
+                self._open[tf] = self._before_last[tf]
+
+            start = _bucket(ts, TIMEFRAMES[tf])
+            current = self._open[tf]
+            self._before_last[tf] = None if current is None else list(current)
+            rolled = current is not None and current[0] != start
+            if rolled:
+                self._done[tf].append(current)
+                current = None
+            self._last_rolled[tf] = rolled
+
+            if current is None:
+                self._open[tf] = [start, o, h, l, c, v]
+            else:
+                current[2] = max(current[2], h)
+                current[3] = min(current[3], l)
+                current[4] = c
+                current[5] += v
+
+        self.last_ts = ts
+        self._last_bar = [o, h, l, c, v]
+
+    def ingest(self, df: pd.DataFrame) -> int:
+        """
+        Feed bars from an OHLCV frame; only bars at or after the last
+        ingested timestamp are applied.
+
+        Returns:
+            Number of bars applied
+        """
+        if df is None or df.empty:
+            return 0
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        ts = index.as_unit("s").asi8
+        values = df.reindex(columns=COLUMNS).fillna({"Volume": 0.0}).to_numpy(dtype="float64")
+
+        start = 0 if self.last_ts is None else int(np.searchsorted(ts, self.last_ts, side="left"))
+        for i in range(start, len(ts)):
+            self.update(int(ts[i]), *values[i])
+        return len(ts) - start
+
+    def bars(self, timeframe: str, include_partial: bool = True) -> pd.DataFrame:
+        """OHLCV frame for a timeframe (naive UTC index)."""
+        rows = list(self._done[timeframe])
+        if include_partial and self._open[timeframe] is not None:
+            rows.append(self._open[timeframe])
+        if not rows:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+        arr = np.asarray(rows, dtype="float64")
+        index = pd.DatetimeIndex(pd.to_datetime(arr[:, 0].astype("int64"), unit="s"), name="Date")
+        return pd.DataFrame(arr[:, 1:], index=index, columns=COLUMNS)
+
+    def today_bar(self) -> Optional[pd.Series]:
+        """Synthetic daily bar for the session in progress (None before any bar)."""
+        if "1d" not in self.timeframes or self._open["1d"] is None:
+            return None
+        current = self._open["1d"]
+        return pd.Series(current[1:], index=COLUMNS, name=pd.to_datetime(current[0], unit="s"))
@@ -0,0 +1,192 @@
+"""
+Memory-mapped, append-only OHLCV bar store.
+
+Each (symbol, kind) is a directory of fixed-width column files:
+    ts.i64                 int64 epoch seconds (UTC-naive, as cached elsewhere)
+    Open.f64 ... Volume.f64 float64 values
+
+Appends write only the new tail of each file, and loads np.memmap the files
+and wrap them as a DataFrame without copying. Replacing a stale tail writes a
+new file and renames it into place, so mapped readers are never truncated. Because it is a CacheStore,
+get_daily_history/get_intraday_history (and therefore the training scripts)
+read it when CACHE_BACKEND = "mmap".
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR
+from cache_store import CacheStore, CsvCacheStore, OHLCV_COLUMNS, _safe_symbol
+from atomic_io import atomic_write, write_lock
+
+logger = logging.getLogger(__name__)
+
+TS_FILE = "ts.i64"
+
+
+def _to_epoch_seconds(index: pd.Index) -> np.ndarray:
+    """Convert a DatetimeIndex to int64 epoch seconds."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("s").asi8
+
+
+class MmapBarStore(CacheStore):
+    """
+    Fixed-width binary bar store with O(1) appends and zero-copy loads.
+    Files may differ in length after an interrupted append; readers use the
+    shortest column, so a torn write only loses the partial bar.
+    """
+
+    def __init__(self, root: Path = DATA_DIR):
+        super().__init__(root)
+        self._csv = CsvCacheStore(root)
+
+    def path(self, symbol: str, kind: str) -> Path:
+        return self.root / "bars" / f"{_safe_symbol(symbol)}_{kind}"
+
+    def exists(self, symbol: str, kind: str) -> bool:
+        return (self.path(symbol, kind) / TS_FILE).exists() or self._csv.exists(symbol, kind)
+
+    def mtime(self, symbol: str, kind: str) -> float:
+        return (self.path(symbol, kind) / TS_FILE).stat().st_mtime
+
+    def num_bars(self, symbol: str, kind: str) -> int:
+        """Number of complete bars stored (shortest column wins)."""
+        base = self.path(symbol, kind)
+        sizes = [(base / TS_FILE).stat().st_size if (base / TS_FILE).exists() else 0]
+        for col in OHLCV_COLUMNS:
+            f = base / f"{col}.f64"
+            sizes.append(f.stat().st_size if f.exists() else 0)
+        return min(sizes) // 8
+
+    def _memmap(self, file: Path, dtype: str, n: int) -> np.ndarray:
+        return np.memmap(file, dtype=dtype, mode="r", shape=(n,))
+
+    def load(self, symbol: str, kind: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Map the column files into a DataFrame (no parsing, no copy).
+        Migrates a legacy CSV cache on first access.
+        """
+        base = self.path(symbol, kind)
+        if not (base / TS_FILE).exists():
+            self.migrate(symbol, kind)
+
+        columns = OHLCV_COLUMNS if columns is None else [c for c in OHLCV_COLUMNS if c in columns]
+        n = self.num_bars(symbol, kind)
+        if n == 0:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"))
+
+        ts = self._memmap(base / TS_FILE, "int64", n)
+        index = pd.DatetimeIndex(np.asarray(ts).view("datetime64[s]"), name="Date", copy=False)
+        data = {col: self._memmap(base / f"{col}.f64", "float64", n) for col in columns}
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def append(self, symbol: str, kind: str, df: pd.DataFrame) -> int:
+        """
+        Append bars, rewriting only the tail that changed.
+
+        The new frame is aligned against stored bars from its first timestamp
+        onward; stored bars that are identical are kept, anything from the
+        first difference is truncated and replaced, so the store always ends
+        with the given frame. A pure append touches only the end of each file.
+
+        Returns:
+            Number of bars written
+        """
+        return self._write(symbol, kind, df, replace=False)
+
+    def _write(self, symbol: str, kind: str, df: pd.DataFrame, replace: bool) -> int:
+        """
+        Write `df` over the stored bars, keeping the longest identical prefix.
+
+        Args:
+            replace: Drop stored bars before the frame's first timestamp
+                (the store then holds exactly `df`); otherwise keep them
+
+        Returns:
+            Number of bars written
+        """
+        base = self.path(symbol, kind)
+        base.mkdir(parents=True, exist_ok=True)
+        if df.empty and not replace:
+            return 0
+
+        df = df.sort_index()
+        ts_new = _to_epoch_seconds(df.index)
+        values = {col: df[col].to_numpy(dtype="float64") if col in df.columns
+                  else np.full(len(df), np.nan) for col in OHLCV_COLUMNS}
+
+        # Held across the read of the stored bars too: sizes must not change before the write
+        with write_lock(base):
+            n = self.num_bars(symbol, kind)
+            keep = 0
+            common = 0
+            if n > 0 and len(ts_new) > 0:
+                ts_old = self._memmap(base / TS_FILE, "int64", n)
+                offset = int(np.searchsorted(ts_old, ts_new[0], side="left"))
+                # A replacement starting later than the store keeps nothing (keep = 0)
+                if not (replace and offset > 0):
+                    overlap = min(n - offset, len(ts_new))
+                    if overlap > 0:
+                        same = ts_old[offset:offset + overlap] == ts_new[:overlap]
+                        for col in OHLCV_COLUMNS:
+                            old = self._memmap(base / f"{col}.f64", "float64", n)[offset:offset + overlap]
+                            new = values[col][:overlap]
+                            same &= (old == new) | (np.isnan(old) & np.isnan(new))
+                        mismatch = np.flatnonzero(~same)
+                        common = int(mismatch[0]) if len(mismatch) else overlap
+                    keep = offset + common
+
+            # Value columns first, timestamps last: readers size by the shortest file
+            files = [(base / f"{col}.f64", values[col]) for col in OHLCV_COLUMNS] + [(base / TS_FILE, ts_new)]
+            for file, arr in files:
+                tail = np.ascontiguousarray(arr[common:]).tobytes()
+                if file.exists() and file.stat().st_size != keep * 8:
+                    # Stale tail (or a torn write): rewrite into a new file rather than
+                    # truncating in place, which would fault readers that have it mapped
+                    with open(file, "rb") as f:
+                        head = f.read(keep * 8)
+                    with atomic_write(file, "wb") as f:
+                        f.write(head)
+                        f.write(tail)
+                else:
+                    with open(file, "ab") as f:
+                        f.write(tail)
+
+        return len(ts_new) - common
+
+    def save(self, symbol: str, kind: str, df: pd.DataFrame) -> Path:
+        """
+        Replace the stored bars with `df` (like the CSV and Parquet stores),
+        still writing only the tail that differs. ts.i64 is touched even when
+        nothing changed, so mtime() reflects the save for freshness checks.
+        """
+        written = self._write(symbol, kind, df, replace=True)
+        path = self.path(symbol, kind)
+        os.utime(path / TS_FILE)
+        logger.debug(f"Bar store {symbol} {kind}: wrote {written} bars")
+        return path
+
+    def migrate(self, symbol: str, kind: str) -> Optional[Path]:
+        """One-time import of the legacy CSV cache into the bar store."""
+        if not self._csv.exists(symbol, kind):
+            return None
+        csv_path = self._csv.path(symbol, kind)
+        df = self._csv.load(symbol, kind)
+        path = self.save(symbol, kind, df)
+        # Keep the CSV mtime so intraday freshness checks are not fooled by the migration
+        stat = csv_path.stat()
+        for file in path.iterdir():
+            os.utime(file, (stat.st_atime, stat.st_mtime))
+        logger.info(f"Migrated {csv_path.name} -> {path.name}/ ({len(df)} bars)")
+        return path
@@ -0,0 +1,77 @@
+"""
+Benchmark cache load time: CSV vs Parquet.
+
+Scales:
+    5y daily    (~1,250 bars)
+    20y daily   (~5,000 bars)
+    3y 1m bars  (~280,000 bars)
+
+Usage:
+    python bench_cache_store.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cache_store import CsvCacheStore, ParquetCacheStore
+
+SCALES = {
+    "daily_5y": (1250, "1D"),
+    "daily_20y": (5000, "1D"),
+    "1m_3y": (375 * 250 * 3, "1min"),
+}
+
+
+def make_bars(n: int, freq: str) -> pd.DataFrame:
+    """Random-walk OHLCV frame with n bars."""
+    rng = np.random.default_rng(42)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = np.abs(rng.normal(0, 5, n))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 2, n),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(0, 1_000_000, n).astype("float64"),
+        },
+        index=pd.date_range("2010-01-01", periods=n, freq=freq, name="Date"),
+    )
+
+
+def time_load(store, symbol: str, columns=None, repeat: int = 5) -> float:
+    """Best-of-N load time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        store.load(symbol, "daily", columns=columns)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_store = CsvCacheStore(Path(tmp))
+        pq_store = ParquetCacheStore(Path(tmp))
+
+        print(f"{'scale':<12}{'rows':>10}{'csv ms':>10}{'parquet ms':>12}{'pq Close ms':>13}{'speedup':>9}")
+        for name, (n, freq) in SCALES.items():
+            df = make_bars(n, freq)
+            csv_store.save(name, "daily", df)
+            pq_store.save(name, "daily", df)
+
+            csv_ms = time_load(csv_store, name)
+            pq_ms = time_load(pq_store, name)
+            pq_close_ms = time_load(pq_store, name, columns=["Close"])
+            print(f"{name:<12}{n:>10}{csv_ms:>10.2f}{pq_ms:>12.2f}{pq_close_ms:>13.2f}{csv_ms / pq_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
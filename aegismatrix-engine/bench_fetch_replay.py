@@ -0,0 +1,130 @@
+"""
+Offline benchmark of the data layer using recorded HTTP responses.
+
+Replays Yahoo chart cassettes through the real fetch functions, optionally
+injecting latency, 429s and timeouts, and reports parse throughput, the
+number of HTTP attempts (retries) per fetch and the rate limiter state.
+
+Usage:
+    # Build cassettes from the CSVs in data/ (no network needed)
+    python bench_fetch_replay.py --synthesize
+
+    # Or record real responses once
+    AEGIS_HTTP_MODE=record python infer.py
+
+    # Replay
+    python bench_fetch_replay.py --runs 20 --latency 0.05 --rate-429 0.2
+
+    # Replay under the configured per-host rate limits instead of unthrottled
+    python bench_fetch_replay.py --runs 5 --rate-429 0.2 --configured-limits
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR, NIFTY_SYMBOL, VIX_SYMBOL, INTRADAY_PERIOD, INTRADAY_INTERVAL
+from http_client import HttpClient, set_http_client
+from http_replay import CassetteStore, ReplayFaults
+from rate_limiter import RateLimiter
+import data_fetcher
+
+YAHOO_CHART = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+
+CASES = [
+    (NIFTY_SYMBOL, "daily", {"interval": "1d"}),
+    (VIX_SYMBOL, "daily", {"interval": "1d"}),
+    (NIFTY_SYMBOL, "intraday", {"interval": INTRADAY_INTERVAL, "range": INTRADAY_PERIOD}),
+]
+
+
+def chart_payload(df: pd.DataFrame, symbol: str) -> dict:
+    """Yahoo v8 chart JSON for an OHLCV frame."""
+    return {
+        "chart": {
+            "result": [{
+                "meta": {"symbol": symbol, "regularMarketPrice": float(df["Close"].iloc[-1])},
+                "timestamp": (df.index.as_unit("s").asi8).tolist(),
+                "indicators": {"quote": [{
+                    "open": df["Open"].tolist(),
+                    "high": df["High"].tolist(),
+                    "low": df["Low"].tolist(),
+                    "close": df["Close"].tolist(),
+                    "volume": df["Volume"].tolist(),
+                }]},
+            }],
+            "error": None,
+        }
+    }
+
+
+def case_url(symbol: str, params: dict) -> str:
+    return requests.Request("GET", YAHOO_CHART.format(symbol=symbol), params=params).prepare().url
+
+
+def synthesize(store: CassetteStore):
+    """Write cassettes for CASES from the CSV caches in DATA_DIR."""
+    for symbol, kind, params in CASES:
+        csv_path = DATA_DIR / f"{symbol.replace('^', '')}_{kind}.csv"
+        df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(chart_payload(df, symbol)).encode()
+        path = store.save("GET", case_url(symbol, params), response)
+        print(f"Wrote {path} ({len(df)} bars)")
+
+
+def run(client: HttpClient, runs: int):
+    print(f"{'case':<24}{'rows':>7}{'mean ms':>10}{'rows/s':>12}{'attempts':>10}")
+    for symbol, kind, params in CASES:
+        before = client._requests["query1.finance.yahoo.com"]
+        total, rows = 0.0, 0
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            if kind == "daily":
+                df = data_fetcher._fetch_yahoo_api_data(symbol, interval=params["interval"])
+            else:
+                df = data_fetcher._fetch_yahoo_api_data(symbol, period=params["range"], interval=params["interval"])
+            total += time.perf_counter() - t0
+            rows = len(df)
+        attempts = (client._requests["query1.finance.yahoo.com"] - before) / runs
+        mean_ms = total / runs * 1000
+        rate = rows / (total / runs) if total else 0
+        print(f"{symbol + ' ' + kind:<24}{rows:>7}{mean_ms:>10.2f}{rate:>12.0f}{attempts:>10.2f}")
+    for host, state in client.limiter.snapshot().items():
+        print(f"limiter {host}: {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fetch benchmark (record/replay)")
+    parser.add_argument("--synthesize", action="store_true", help="build cassettes from data/*.csv")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="injected seconds per response")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of responses answered 429")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="fraction of requests timing out")
+    parser.add_argument("--timeout", type=float, default=0.5, help="seconds an injected timeout blocks")
+    parser.add_argument("--configured-limits", action="store_true", help="apply config.RATE_LIMITS (default: unthrottled)")
+    args = parser.parse_args()
+
+    store = CassetteStore()
+    if args.synthesize:
+        synthesize(store)
+
+    faults = ReplayFaults(
+        latency=args.latency, rate_429=args.rate_429, rate_timeout=args.rate_timeout, timeout_delay=args.timeout
+    )
+    limiter = RateLimiter() if args.configured_limits else RateLimiter(limits={}, default=(1e6, 1e6))
+    client = set_http_client(HttpClient(mode="replay", cassettes=store, faults=faults, limiter=limiter))
+    run(client, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,22 +10,26 @@ import joblib
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import MODEL_DIR
+from model_registry import current_generation
 
 logger = logging.getLogger(__name__)
 
 
-def load_models():
+def load_models(model_dir=None):
     """
     Load pre-trained buyer models.
     
+    Args:
+        model_dir: Model generation directory (default: the published one, see model_registry)
+    
     Returns:
         Tuple of (breakout_model, spike_model, theta_model)
     """
+    model_dir = model_dir or current_generation()
     try:
-        breakout_model = joblib.load(MODEL_DIR / "buyer_breakout.pkl")
-        spike_model = joblib.load(MODEL_DIR / "buyer_spike.pkl")
-        theta_model = joblib.load(MODEL_DIR / "buyer_theta.pkl")
+        breakout_model = joblib.load(model_dir / "buyer_breakout.pkl")
+        spike_model = joblib.load(model_dir / "buyer_spike.pkl")
+        theta_model = joblib.load(model_dir / "buyer_theta.pkl")
         return breakout_model, spike_model, theta_model
     except Exception as e:
         logger.error(f"Error loading buyer models: {e}")
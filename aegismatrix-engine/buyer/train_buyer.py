@@ -25,7 +25,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import MODEL_DIR, RANDOM_SEED, BUYER_BREAKOUT_WINDOW
 from data_fetcher import get_market_snapshots
-from features.daily_features import build_buyer_features
+from model_registry import training_generation
+from feature_store import FEATURE_STORE
+from features.pipeline import FeaturePipeline
 
 # Setup logging
 logging.basicConfig(
@@ -134,7 +136,7 @@ def create_theta_edge_targets(nifty_df, lookback=14):
     return targets
 
 
-def train_breakout_classifier(X, y_breakout):
+def train_breakout_classifier(X, y_breakout, model_dir=MODEL_DIR):
     """Train XGBoost classifier for breakout prediction."""
     logger.info("=" * 60)
     logger.info("Training Breakout Classifier")
@@ -180,13 +182,13 @@ def train_breakout_classifier(X, y_breakout):
     logger.info(f"  AUC-ROC: {auc:.4f}")
     logger.info(classification_report(y_val, y_pred, target_names=["No Breakout", "Breakout"]))
     
-    joblib.dump(model, MODEL_DIR / "buyer_breakout.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'buyer_breakout.pkl'}")
+    joblib.dump(model, model_dir / "buyer_breakout.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'buyer_breakout.pkl'}")
     
     return model
 
 
-def train_spike_direction_classifier(X, y_spike_dir, y_breakout):
+def train_spike_direction_classifier(X, y_spike_dir, y_breakout, model_dir=MODEL_DIR):
     """Train classifier for spike direction (UP vs DOWN given breakout)."""
     logger.info("=" * 60)
     logger.info("Training Spike Direction Classifier")
@@ -232,13 +234,13 @@ def train_spike_direction_classifier(X, y_spike_dir, y_breakout):
     logger.info(f"  Accuracy: {accuracy:.4f}")
     logger.info(classification_report(y_val, y_pred, target_names=["DOWN", "UP"]))
     
-    joblib.dump(model, MODEL_DIR / "buyer_spike.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'buyer_spike.pkl'}")
+    joblib.dump(model, model_dir / "buyer_spike.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'buyer_spike.pkl'}")
     
     return model
 
 
-def train_theta_edge_regressor(X, y_theta):
+def train_theta_edge_regressor(X, y_theta, model_dir=MODEL_DIR):
     """Train regressor for theta edge score."""
     logger.info("=" * 60)
     logger.info("Training Theta Edge Regressor")
@@ -274,8 +276,8 @@ def train_theta_edge_regressor(X, y_theta):
     logger.info(f"✓ Theta edge regressor trained")
     logger.info(f"  Val MAE: {mae:.4f}")
     
-    joblib.dump(model, MODEL_DIR / "buyer_theta.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'buyer_theta.pkl'}")
+    joblib.dump(model, model_dir / "buyer_theta.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'buyer_theta.pkl'}")
     
     return model
 
@@ -296,7 +298,7 @@ def main():
     
     # Build features
     logger.info("Building buyer features...")
-    features_df = build_buyer_features(nifty, vix)
+    features_df = FeaturePipeline(nifty, vix, name="NIFTY", store=FEATURE_STORE).buyer()
     
     if features_df is None or len(features_df) < 200:
         logger.error("Feature engineering failed")
@@ -325,9 +327,11 @@ def main():
                f"Theta range: [{y_theta.min():.4f}, {y_theta.max():.4f}]")
     
     # Train models
-    train_breakout_classifier(X, y_breakout)
-    train_spike_direction_classifier(X, y_spike_dir, y_breakout)
-    train_theta_edge_regressor(X, y_theta)
+    # Written into a staged model generation, published atomically on success
+    with training_generation() as model_dir:
+        train_breakout_classifier(X, y_breakout, model_dir)
+        train_spike_direction_classifier(X, y_spike_dir, y_breakout, model_dir)
+        train_theta_edge_regressor(X, y_theta, model_dir)
     
     logger.info("=" * 60)
     logger.info("✓ Buyer training complete!")
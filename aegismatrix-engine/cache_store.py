@@ -0,0 +1,154 @@
+"""
+Storage backends for the OHLCV cache in DATA_DIR.
+data_fetcher only talks to a CacheStore, so the on-disk format can change
+without touching the fetch logic.
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR, CACHE_BACKEND
+from atomic_io import atomic_path
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _safe_symbol(symbol: str) -> str:
+    """Sanitize symbol for filename."""
+    return symbol.replace("^", "").replace(":", "_")
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce a cache frame to a DatetimeIndex named Date with float64 columns."""
+    df = df.copy()
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    df.index.name = "Date"
+    for col in df.columns:
+        if col in OHLCV_COLUMNS:
+            df[col] = df[col].astype("float64")
+    return df
+
+
+class CacheStore:
+    """Base class: one file per (symbol, kind), kind being "daily" or "intraday"."""
+
+    suffix = ""
+
+    def __init__(self, root: Path = DATA_DIR):
+        self.root = Path(root)
+
+    def path(self, symbol: str, kind: str) -> Path:
+        return self.root / f"{_safe_symbol(symbol)}_{kind}{self.suffix}"
+
+    def exists(self, symbol: str, kind: str) -> bool:
+        return self.path(symbol, kind).exists()
+
+    def mtime(self, symbol: str, kind: str) -> float:
+        """Last modification time of the cached data (epoch seconds)."""
+        return self.path(symbol, kind).stat().st_mtime
+
+    def load(self, symbol: str, kind: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def save(self, symbol: str, kind: str, df: pd.DataFrame) -> Path:
+        raise NotImplementedError
+
+
+class CsvCacheStore(CacheStore):
+    """Plain CSV files (the original cache format)."""
+
+    suffix = ".csv"
+
+    def load(self, symbol: str, kind: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        usecols = None if columns is None else lambda c: c in columns or c == "Date"
+        df = pd.read_csv(self.path(symbol, kind), index_col=0, parse_dates=True, usecols=usecols)
+        return _normalize_frame(df)
+
+    def save(self, symbol: str, kind: str, df: pd.DataFrame) -> Path:
+        path = self.path(symbol, kind)
+        with atomic_path(path) as tmp:
+            df.to_csv(tmp)
+        return path
+
+
+class ParquetCacheStore(CacheStore):
+    """
+    Typed columnar files via pyarrow.
+    Only the requested columns are read from disk. On first access a
+    legacy CSV with the same name is migrated in place.
+    """
+
+    suffix = ".parquet"
+
+    def __init__(self, root: Path = DATA_DIR):
+        super().__init__(root)
+        self._csv = CsvCacheStore(root)
+
+    def exists(self, symbol: str, kind: str) -> bool:
+        return self.path(symbol, kind).exists() or self._csv.exists(symbol, kind)
+
+    def load(self, symbol: str, kind: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        path = self.path(symbol, kind)
+        if not path.exists():
+            self.migrate(symbol, kind)
+        return pd.read_parquet(path, columns=columns, engine="pyarrow")
+
+    def save(self, symbol: str, kind: str, df: pd.DataFrame) -> Path:
+        path = self.path(symbol, kind)
+        with atomic_path(path) as tmp:
+            _normalize_frame(df).to_parquet(tmp, engine="pyarrow", index=True)
+        return path
+
+    def migrate(self, symbol: str, kind: str) -> Optional[Path]:
+        """
+        One-time conversion of the legacy CSV cache to Parquet.
+        The CSV is left in place so older checkouts keep working.
+
+        Returns:
+            Path of the Parquet file, or None if there was no CSV to migrate
+        """
+        if not self._csv.exists(symbol, kind):
+            return None
+        csv_path = self._csv.path(symbol, kind)
+        df = self._csv.load(symbol, kind)
+        path = self.save(symbol, kind, df)
+        # Keep the CSV mtime so intraday freshness checks are not fooled by the migration
+        stat = csv_path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime))
+        logger.info(f"Migrated {csv_path.name} -> {path.name} ({len(df)} rows)")
+        return path
+
+
+def get_cache_store(backend: str = CACHE_BACKEND, root: Path = DATA_DIR) -> CacheStore:
+    """
+    Build the configured cache backend.
+
+    Args:
+        backend: "csv", "parquet", "mmap" (bar_store.MmapBarStore)
+            or "auto" (parquet when pyarrow is installed)
+        root: Directory holding the cache files
+
+    Returns:
+        CacheStore instance
+    """
+    if backend == "mmap":
+        from bar_store import MmapBarStore
+        return MmapBarStore(root)
+    if backend in ("parquet", "auto"):
+        try:
+            import pyarrow  # noqa: F401
+            return ParquetCacheStore(root)
+        except ImportError:
+            if backend == "parquet":
+                logger.warning("pyarrow not installed, falling back to CSV cache")
+    return CsvCacheStore(root)
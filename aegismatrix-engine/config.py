@@ -3,6 +3,8 @@ Central configuration for AegisMatrix engine.
 No business logic - only constants and paths.
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Paths
@@ -10,16 +12,88 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 CLIENT_ROOT = PROJECT_ROOT.parent / "client"
 JSON_OUTPUT_PATH = CLIENT_ROOT / "public" / "data" / "aegismatrix.json"
 MODEL_DIR = PROJECT_ROOT / "models"
+MODEL_KEEP_GENERATIONS = 3  # published model generations kept under MODEL_DIR/generations
 DATA_DIR = PROJECT_ROOT / "data"
+CACHE_BACKEND = "auto"  # "csv", "parquet", "mmap" or "auto" (parquet when pyarrow is installed)
 
 # Market symbols
 NIFTY_SYMBOL = "^NSEI"
 VIX_SYMBOL = "^INDIAVIX"
 
+# Index universe: Yahoo symbol and NSE option-chain symbol per index
+INDEX_UNIVERSE = {
+    "NIFTY": {"symbol": NIFTY_SYMBOL, "nse_symbol": "NIFTY"},
+    "BANKNIFTY": {"symbol": "^NSEBANK", "nse_symbol": "BANKNIFTY"},
+    "FINNIFTY": {"symbol": "NIFTY_FIN_SERVICE.NS", "nse_symbol": "FINNIFTY"},
+    "MIDCPNIFTY": {"symbol": "NIFTY_MID_SELECT.NS", "nse_symbol": "MIDCPNIFTY"},
+}
+# Indices run by infer.py (AEGIS_INDICES, comma-separated); NIFTY writes JSON_OUTPUT_PATH.
+# Must be a subset of MODELED_INDICES: the fetch stage serves any INDEX_UNIVERSE entry,
+# but models are only trained for NIFTY, so other indices are rejected at startup.
+ACTIVE_INDICES = [i.strip() for i in os.environ.get("AEGIS_INDICES", "NIFTY").split(",") if i.strip()]
+PRIMARY_INDEX = "NIFTY"
+# Indices the trained models and their constants (spot fallback, expected-move defaults) are for
+MODELED_INDICES = ("NIFTY",)
+
 # Data parameters
 LOOKBACK_YEARS = 5
 INTRADAY_PERIOD = "5d"
 INTRADAY_INTERVAL = "5m"
+GAMMA_HISTORY_DAYS = 30  # calendar days of archived sessions averaged into the buyer gamma windows
+INTRADAY_CACHE_TTL = timedelta(minutes=15)  # intraday cache lifetime while the market is open
+LIVE_QUOTE_TTL = 30  # seconds a live quote is reused within a run
+FETCH_DEADLINE_SECONDS = 60  # overall budget for the concurrent acquisition stage
+DAILY_MAX_GAP_DAYS = 10  # larger gaps between cached daily bars force a full refetch
+
+# Cache pre-warmer (prewarm.py): refresh caches ahead of each scheduled inference run
+INFER_WORKFLOW_PATH = Path(
+    os.environ.get("AEGIS_INFER_WORKFLOW", PROJECT_ROOT.parent / ".github" / "workflows" / "aegismatrix-infer-build.yml")
+)  # cron schedule source
+PREWARM_LEAD = timedelta(minutes=3)  # warm this long before each scheduled run (keep below INTRADAY_CACHE_TTL)
+
+# Feature store (feature_store.py): computed daily feature frames keyed by input bars + feature code
+FEATURE_STORE_DIR = DATA_DIR / "feature_store"
+FEATURE_STORE_KEEP = 8  # entries kept per index symbol
+
+# OHLCV data-quality gate (data_quality.check_ohlcv)
+QUALITY_SPIKE_Z = 8.0  # robust z-score for a spike-and-revert print
+QUALITY_MAX_BAD_FRACTION = 0.02  # more dropped rows than this marks a frame "fail"
+
+# HTTP client (shared keep-alive pools for Yahoo/NSE)
+HTTP_POOL_CONNECTIONS = 10  # per-host pools kept alive
+HTTP_POOL_MAXSIZE = 10  # keep-alive connections per host
+HTTP_TIMEOUT = 15  # default request timeout (seconds)
+NSE_COOKIE_MAX_AGE = 30 * 60  # seconds to reuse NSE session cookies without an expiry
+
+# Per-host rate limiting: host -> (requests per second, burst)
+RATE_LIMITS = {
+    "query1.finance.yahoo.com": (2.0, 4),
+    "query2.finance.yahoo.com": (2.0, 4),
+    "www.nseindia.com": (1.0, 2),
+}
+RATE_LIMIT_DEFAULT = (5.0, 10)
+RATE_LIMIT_MAX_WAIT = 30.0  # longest a request waits for its host before failing
+BACKOFF_BASE = 1.0  # seconds; jittered exponential backoff after 429/5xx/errors
+BACKOFF_MAX = 60.0
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures that open a host's circuit
+CIRCUIT_RESET_SECONDS = 120  # open circuit duration before a probe request
+
+# Hedged fetching (start the fallback source if the primary is slow)
+HEDGED_FETCH = True
+HEDGE_DELAY = 3.0  # seconds before hedging, until enough latency samples exist
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_DELAY = 10.0
+
+# Option-chain history (keyframe + delta snapshots per refresh)
+OPTION_KEYFRAME_INTERVAL = 12  # full snapshot every N refreshes
+
+# HTTP record/replay (offline benchmarks and regression tests)
+HTTP_MODE = os.environ.get("AEGIS_HTTP_MODE", "live")  # "live", "record" or "replay"
+HTTP_CASSETTE_DIR = Path(os.environ.get("AEGIS_HTTP_CASSETTES", PROJECT_ROOT / "cassettes"))
+HTTP_CASSETTE_IGNORE_PARAMS = ("period1", "period2")  # volatile query params not used for matching
+HTTP_REPLAY_LATENCY = float(os.environ.get("AEGIS_REPLAY_LATENCY", 0.0))  # seconds per response
+HTTP_REPLAY_429_RATE = float(os.environ.get("AEGIS_REPLAY_429_RATE", 0.0))  # fraction answered 429
+HTTP_REPLAY_TIMEOUT_RATE = float(os.environ.get("AEGIS_REPLAY_TIMEOUT_RATE", 0.0))  # fraction timing out
 
 # Direction engine
 DIRECTION_HORIZONS = [1, 3, 5, 10, 20, 40]  # t+1, t+3, t+5, t+10, t+20, t+40 days
@@ -6,7 +6,7 @@ Falls back to NSE API for intraday/live data.
 
 import pandas as pd
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import json
 import logging
@@ -14,7 +14,11 @@ import sys
 import requests
 import time
 import random
-from typing import Optional, Tuple, Dict, Any
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Dict, Any, List
 
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -24,18 +28,29 @@ from config import (
     LOOKBACK_YEARS,
     INTRADAY_PERIOD,
     INTRADAY_INTERVAL,
+    INTRADAY_CACHE_TTL,
+    DAILY_MAX_GAP_DAYS,
+    FETCH_DEADLINE_SECONDS,
+    LIVE_QUOTE_TTL,
+    INDEX_UNIVERSE,
+    ACTIVE_INDICES,
     DATA_DIR,
 )
+from cache_store import get_cache_store
+from http_client import get_http_client, ACCEPT_ENCODING
+from nse_fetcher import nse_get, NSE_CHAIN_URL
+from hedging import hedged_fetch
+from rate_limiter import CircuitOpenError, RATE_LIMITER
+from yahoo_chart import ChartError, parse_chart, loads as json_loads
+from intraday_archive import ARCHIVE
+from bar_aggregator import BarAggregator, TIMEFRAMES, interval_minutes
+from market_calendar import daily_cache_is_fresh, intraday_cache_is_fresh, latest_session_date
+from data_quality import check_ohlcv, raise_on_fail
 
 logger = logging.getLogger(__name__)
 
-# NSE API endpoints for fallback
-NSE_CHAIN_URL = "https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY"
-NSE_HDR = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-    "Accept": "application/json",
-    "Referer": "https://www.nseindia.com/",
-}
+# Cache backend for DATA_DIR (CSV, Parquet or mmap bar store, see config.CACHE_BACKEND)
+CACHE_STORE = get_cache_store()
 
 # Rotate User Agents to avoid blocking
 USER_AGENTS = [
@@ -51,7 +66,7 @@ def _get_random_header() -> Dict[str, str]:
     return {
         "User-Agent": random.choice(USER_AGENTS),
         "Accept": "*/*",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Connection": "keep-alive",
     }
 
@@ -65,15 +80,8 @@ def _fetch_nse_live_spot() -> Optional[float]:
         Current spot price or None if failed
     """
     try:
-        session = requests.Session()
-        session.headers.update(NSE_HDR)
-        
-        # Establish session first
-        session.get("https://www.nseindia.com", timeout=10)
-        time.sleep(0.5)
-        
-        # Fetch option chain (has current spot)
-        response = session.get(NSE_CHAIN_URL, timeout=15)
+        # Fetch option chain (has current spot); cookies come from the persisted NSE session
+        response = nse_get(NSE_CHAIN_URL, timeout=15)
         response.raise_for_status()
         data = response.json()
         
@@ -87,17 +95,18 @@ def _fetch_nse_live_spot() -> Optional[float]:
     return None
 
 
-def _fetch_yahoo_api_data(
+def _fetch_yahoo_chart(
     symbol: str, 
     start_date: Optional[datetime] = None, 
     end_date: Optional[datetime] = None, 
     period: Optional[str] = None, 
     interval: str = "1d",
     retries: int = 3
-) -> pd.DataFrame:
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
-    Fetch data directly from Yahoo Finance API with retries and robust error handling.
-    Supports both historical (start/end) and range-based (period) fetching.
+    Fetch a Yahoo v8 chart with retries, returning both the bars and the
+    chart meta block. The meta price is remembered as a live quote (see
+    get_live_quotes), so a chart pull doubles as a quote lookup.
     
     Args:
         symbol: Ticker symbol (e.g., "^NSEI")
@@ -108,7 +117,7 @@ def _fetch_yahoo_api_data(
         retries: Number of retry attempts
         
     Returns:
-        DataFrame with OHLCV data or empty DataFrame if failed
+        (OHLCV DataFrame, meta dict); empty DataFrame and {} if failed
     """
     # Construct URL based on parameters
     if period:
@@ -127,142 +136,244 @@ def _fetch_yahoo_api_data(
     for attempt in range(retries):
         try:
             headers = _get_random_header()
-            response = requests.get(url, headers=headers, timeout=10)
+            response = get_http_client().get(url, headers=headers, timeout=10)
             
             if response.status_code == 429:
-                logger.warning(f"Rate limited by Yahoo (429). Waiting before retry {attempt+1}/{retries}...")
-                time.sleep(2 * (attempt + 1))
+                # The shared rate limiter has already scheduled the cool-down
+                logger.warning(f"Rate limited by Yahoo (429). Retry {attempt+1}/{retries} after cool-down...")
                 continue
                 
             if response.status_code != 200:
                 logger.warning(f"Yahoo API returned status {response.status_code} for {symbol}")
                 continue
-                
-            data = response.json()
-            
-            if "chart" not in data or "result" not in data["chart"] or not data["chart"]["result"]:
-                logger.warning(f"No data in API response for {symbol}")
-                return pd.DataFrame()
-            
-            result = data["chart"]["result"][0]
-            timestamps = result.get("timestamp", [])
-            quotes = result.get("indicators", {}).get("quote", [{}])[0]
             
-            if not timestamps or not quotes:
-                logger.warning(f"Empty timestamps or quotes for {symbol}")
-                return pd.DataFrame()
+            df, meta = parse_chart(response.content)
+            _remember_chart_meta(symbol, meta)
             
-            df = pd.DataFrame({
-                "Date": pd.to_datetime(timestamps, unit="s"),
-                "Open": quotes.get("open", []),
-                "High": quotes.get("high", []),
-                "Low": quotes.get("low", []),
-                "Close": quotes.get("close", []),
-                "Volume": quotes.get("volume", []),
-            })
-            
-            df = df.dropna()
-            df.set_index("Date", inplace=True)
+            if df.empty:
+                # Well-formed but empty range (holiday, newly listed symbol): retrying will not help
+                logger.warning(f"No data in API response for {symbol}")
+                return df, meta
             
-            if not df.empty:
-                logger.info(f"Fetched {len(df)} rows from direct API for {symbol}")
-                return df
+            logger.info(f"Fetched {len(df)} rows from direct API for {symbol}")
+            return df, meta
                 
+        except CircuitOpenError as e:
+            logger.warning(f"{e}; giving up on {symbol}")
+            break
         except requests.exceptions.RequestException as e:
+            # Backoff before the next attempt is applied by the rate limiter
             logger.debug(f"Attempt {attempt+1}/{retries} failed for {symbol}: {e}")
-            time.sleep(1)
         except json.JSONDecodeError:
             logger.warning(f"Failed to decode JSON from Yahoo for {symbol}")
+        except ChartError as e:
+            logger.warning(f"Bad chart payload for {symbol} ({e}). Retry {attempt+1}/{retries}")
         except Exception as e:
             logger.error(f"Unexpected error fetching {symbol}: {e}")
             
     logger.error(f"Failed to fetch data for {symbol} after {retries} attempts")
-    return pd.DataFrame()
+    return pd.DataFrame(), {}
+
+
+def _fetch_yahoo_api_data(
+    symbol: str, 
+    start_date: Optional[datetime] = None, 
+    end_date: Optional[datetime] = None, 
+    period: Optional[str] = None, 
+    interval: str = "1d",
+    retries: int = 3
+) -> pd.DataFrame:
+    """
+    Fetch data directly from Yahoo Finance API with retries and robust error handling.
+    Supports both historical (start/end) and range-based (period) fetching.
+    
+    Args:
+        symbol: Ticker symbol (e.g., "^NSEI")
+        start_date: Start date for historical data
+        end_date: End date for historical data
+        period: Range string (e.g., "5d", "1mo") - overrides start/end dates if provided
+        interval: Data interval (e.g., "1d", "5m")
+        retries: Number of retry attempts
+        
+    Returns:
+        DataFrame with OHLCV data or empty DataFrame if failed
+    """
+    df, _ = _fetch_yahoo_chart(symbol, start_date, end_date, period, interval, retries)
+    return df
+
+
+def _daily_cache_is_sound(df: pd.DataFrame, start: datetime) -> bool:
+    """
+    Gap/corruption check for a cached daily frame.
+    A cache that fails this check is discarded and fully refetched.
+    
+    Args:
+        df: Cached daily OHLCV
+        start: Earliest date the caller expects the cache to cover
+        
+    Returns:
+        True if the cache can be extended incrementally
+    """
+    required = ["Open", "High", "Low", "Close"]
+    if df.empty or any(col not in df.columns for col in required):
+        return False
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return False
+    if not df.index.is_monotonic_increasing or df.index.normalize().has_duplicates:
+        return False
+    if df[required].isna().any().any():
+        return False
+    
+    # Cache must reach back to the requested lookback (allow a week for holidays)
+    if df.index[0] > pd.Timestamp(start) + timedelta(days=7):
+        return False
+    
+    # No missing stretches longer than a holiday break
+    gaps = df.index.to_series().diff().dt.days
+    if gaps.max() > DAILY_MAX_GAP_DAYS:
+        return False
+    
+    return True
+
+
+def _merge_daily_bars(cached_df: pd.DataFrame, fetched_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append freshly fetched daily bars to the cache.
+    Bars are deduplicated per calendar date, keeping the newest fetch
+    (so a partial intraday bar for today is replaced once it settles).
+    """
+    fetched_df = fetched_df[[col for col in cached_df.columns if col in fetched_df.columns]]
+    merged = pd.concat([cached_df, fetched_df])
+    merged = merged[~merged.index.normalize().duplicated(keep="last")]
+    return merged.sort_index()
+
+
+def _has_bars(df: Optional[pd.DataFrame]) -> bool:
+    """Validation shared by all fetch sources: non-empty frame with a Close column."""
+    return df is not None and not df.empty and "Close" in df.columns
+
+
+def _yf_download_daily(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Daily bars via yf.download (fallback source)."""
+    fetched_df = yf.download(symbol, start=start, end=end, progress=False, timeout=30)
+    
+    # Handle MultiIndex columns (yfinance update)
+    if isinstance(fetched_df.columns, pd.MultiIndex):
+        fetched_df.columns = fetched_df.columns.get_level_values(0)
+        
+    fetched_df = fetched_df.dropna()
+    if not fetched_df.empty:
+        logger.info(f"Downloaded {len(fetched_df)} daily candles for {symbol} via yfinance")
+    return fetched_df
+
+
+def _yf_intraday_history(symbol: str, period: str, interval: str) -> pd.DataFrame:
+    """Intraday bars via yf.Ticker.history, retrying with period="1d" (fallback source)."""
+    ticker = yf.Ticker(symbol)
+    fetched_df = ticker.history(period=period, interval=interval, auto_adjust=False)
+    
+    if fetched_df.empty:
+        logger.warning(f"No intraday data for {symbol}, trying alternative period")
+        # Try 1d as fallback
+        fetched_df = ticker.history(period="1d", interval=interval, auto_adjust=False)
+    
+    fetched_df = fetched_df.dropna()
+    if not fetched_df.empty:
+        logger.info(f"Downloaded {len(fetched_df)} intraday candles for {symbol}")
+    return fetched_df
+
+
+# Hosts yfinance talks to through its own (unthrottled) session
+YFINANCE_HOSTS = ("query1.finance.yahoo.com", "query2.finance.yahoo.com")
+
+
+def _yahoo_cooling_down(source: str) -> bool:
+    """Hold back the yfinance fallback while our limiter is backing off the Yahoo hosts it would hit."""
+    return source == "yfinance" and any(RATE_LIMITER.cooling_down(host) for host in YFINANCE_HOSTS)
+
+
+def _download_daily(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Download daily bars between start and end.
+    Direct API first, yfinance as the hedge/fallback (see hedging.hedged_fetch).
+    
+    Returns:
+        DataFrame with OHLCV data or empty DataFrame if both sources failed
+    """
+    fetched_df = hedged_fetch(
+        "daily",
+        [
+            ("yahoo_api", lambda: _fetch_yahoo_api_data(symbol, start_date=start, end_date=end, interval="1d")),
+            ("yfinance", lambda: _yf_download_daily(symbol, start, end)),
+        ],
+        validate=_has_bars,
+        blocked=_yahoo_cooling_down,
+    )
+    return fetched_df if fetched_df is not None else pd.DataFrame()
 
 
 def get_daily_history(symbol: str, years: int = LOOKBACK_YEARS, force_refresh: bool = False) -> pd.DataFrame:
     """
     Fetch daily OHLCV history for a symbol.
-    Checks local CSV cache first. If cache is stale or missing, fetches from API and updates cache.
+    Checks the local cache (CACHE_STORE) first. A stale cache is extended with only the bars
+    since its last date; the full lookback window is refetched only when
+    force_refresh is set or the cache fails the gap/corruption check.
     
     Args:
         symbol: Ticker symbol (e.g., "^NSEI")
         years: Lookback period in years
-        force_refresh: If True, ignore cache and force API fetch
+        force_refresh: If True, ignore cache and force a full API fetch
         
     Returns:
         DataFrame with OHLCV data, sorted by date
     """
     # Ensure data directory exists
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path = CACHE_STORE.path(symbol, "daily")
     
-    # Sanitize symbol for filename
-    safe_symbol = symbol.replace("^", "").replace(":", "_")
-    cache_path = DATA_DIR / f"{safe_symbol}_daily.csv"
+    end = datetime.today()
+    start = end - timedelta(days=365 * years)
     
     cached_df = pd.DataFrame()
-    cache_valid = False
     
     # Try to load from cache
-    if cache_path.exists() and not force_refresh:
+    if CACHE_STORE.exists(symbol, "daily") and not force_refresh:
         try:
-            cached_df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+            cached_df = CACHE_STORE.load(symbol, "daily")
             if not cached_df.empty:
                 last_date = cached_df.index[-1].date()
-                today = datetime.now().date()
+                mtime = datetime.fromtimestamp(CACHE_STORE.mtime(symbol, "daily"))
                 
-                # If data is from today, we consider it fresh enough
-                # (For a real production system, we'd check market close time, but this is sufficient)
-                if last_date >= today:
+                # Fresh if it holds the latest session (settled after the close);
+                # weekends, holidays and pre-open never trigger a fetch
+                if daily_cache_is_fresh(last_date, mtime):
                     logger.info(f"Cache hit for {symbol}: Data up to {last_date} is fresh.")
-                    cache_valid = True
-                else:
-                    logger.info(f"Cache stale for {symbol}: Last date {last_date}, today {today}. Will try to update.")
+                    return cached_df
+                logger.info(f"Cache stale for {symbol}: Last date {last_date}, latest session {latest_session_date()}. Will try to update.")
         except Exception as e:
             logger.warning(f"Failed to read cache for {symbol}: {e}")
-            
-    if cache_valid:
-        return cached_df
-
-    # If we are here, we need to fetch data (either no cache, stale cache, or force_refresh)
-    end = datetime.today()
-    start = end - timedelta(days=365 * years)
-    
-    logger.info(f"Fetching daily history for {symbol} from {start.date()} to {end.date()}")
+            cached_df = pd.DataFrame()
     
-    fetched_df = pd.DataFrame()
-    fetch_success = False
+    incremental = not cached_df.empty and _daily_cache_is_sound(cached_df, start)
+    if not cached_df.empty and not incremental:
+        logger.warning(f"Cache for {symbol} failed gap/corruption check, refetching full history")
     
-    # Try direct API first
-    try:
-        fetched_df = _fetch_yahoo_api_data(symbol, start_date=start, end_date=end, interval="1d")
+    if incremental:
+        # Refetch from the last cached date so a partial bar for that day gets settled
+        delta_start = datetime.combine(cached_df.index[-1].date(), datetime.min.time())
+        logger.info(f"Fetching daily delta for {symbol} from {delta_start.date()} to {end.date()}")
+        fetched_df = _download_daily(symbol, delta_start, end)
         if not fetched_df.empty:
-            fetch_success = True
-    except Exception as e:
-        logger.warning(f"Direct API fetch failed for {symbol}: {e}")
-
-    # Fallback to yfinance if direct API failed
-    if not fetch_success:
-        try:
-            logger.info(f"Falling back to yfinance for {symbol}")
-            fetched_df = yf.download(symbol, start=start, end=end, progress=False, timeout=30)
-            
-            # Handle MultiIndex columns (yfinance update)
-            if isinstance(fetched_df.columns, pd.MultiIndex):
-                fetched_df.columns = fetched_df.columns.get_level_values(0)
-                
-            fetched_df = fetched_df.dropna()
-            if not fetched_df.empty:
-                fetch_success = True
-                logger.info(f"Downloaded {len(fetched_df)} daily candles for {symbol} via yfinance")
-        except Exception as e:
-            logger.error(f"Error fetching {symbol} via yfinance: {e}")
+            fetched_df = _merge_daily_bars(cached_df, fetched_df)
+    else:
+        logger.info(f"Fetching daily history for {symbol} from {start.date()} to {end.date()}")
+        fetched_df = _download_daily(symbol, start, end)
 
     # Decide what to return
-    if fetch_success and not fetched_df.empty:
+    if not fetched_df.empty:
         # Save to cache
         try:
-            fetched_df.to_csv(cache_path)
+            CACHE_STORE.save(symbol, "daily", fetched_df)
             logger.info(f"Saved {len(fetched_df)} rows to cache: {cache_path}")
         except Exception as e:
             logger.error(f"Failed to save cache for {symbol}: {e}")
@@ -274,13 +385,8 @@ def get_daily_history(symbol: str, years: int = LOOKBACK_YEARS, force_refresh: b
         return cached_df
         
     # If everything failed
-    if not fetch_success:
-        logger.error(f"Failed to fetch data for {symbol} and no cache available.")
-        # Raise if it was a yfinance error that bubbled up, or return empty
-        # The original code raised on yfinance error, so we should probably raise or return empty.
-        # Returning empty allows the caller to handle it.
-        return pd.DataFrame()
-        
+    logger.error(f"Failed to fetch data for {symbol} and no cache available.")
+    # Returning empty allows the caller to handle it.
     return pd.DataFrame()
 
 
@@ -289,7 +395,7 @@ def get_intraday_history(
 ) -> pd.DataFrame:
     """
     Fetch intraday OHLCV history.
-    Checks local CSV cache first.
+    Checks the local cache (CACHE_STORE) first.
     
     Args:
         symbol: Ticker symbol
@@ -302,24 +408,21 @@ def get_intraday_history(
     """
     # Ensure data directory exists
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # Sanitize symbol for filename
-    safe_symbol = symbol.replace("^", "").replace(":", "_")
-    cache_path = DATA_DIR / f"{safe_symbol}_intraday.csv"
+    cache_path = CACHE_STORE.path(symbol, "intraday")
     
     cached_df = pd.DataFrame()
     cache_valid = False
     
     # Try to load from cache
-    if cache_path.exists() and not force_refresh:
+    if CACHE_STORE.exists(symbol, "intraday") and not force_refresh:
         try:
-            cached_df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+            cached_df = CACHE_STORE.load(symbol, "intraday")
             if not cached_df.empty:
-                # Check if cache is recent (e.g. modified within last 15 mins)
-                # For intraday, "freshness" is more strict. 
+                # During the session the cache is fresh for INTRADAY_CACHE_TTL;
+                # outside it, fresh if written after the last close.
                 # But if we are rate limited, we definitely want the cache.
-                mtime = datetime.fromtimestamp(cache_path.stat().st_mtime)
-                if datetime.now() - mtime < timedelta(minutes=15):
+                mtime = datetime.fromtimestamp(CACHE_STORE.mtime(symbol, "intraday"))
+                if intraday_cache_is_fresh(mtime, INTRADAY_CACHE_TTL):
                     logger.info(f"Intraday cache hit for {symbol}: {mtime}")
                     cache_valid = True
                 else:
@@ -332,44 +435,31 @@ def get_intraday_history(
 
     logger.info(f"Fetching intraday history for {symbol} (period={period}, interval={interval})")
     
-    fetched_df = pd.DataFrame()
-    fetch_success = False
+    # Direct API first, yfinance as the hedge/fallback
+    fetched_df = hedged_fetch(
+        "intraday",
+        [
+            ("yahoo_api", lambda: _fetch_yahoo_api_data(symbol, period=period, interval=interval)),
+            ("yfinance", lambda: _yf_intraday_history(symbol, period, interval)),
+        ],
+        validate=_has_bars,
+        blocked=_yahoo_cooling_down,
+    )
+    fetch_success = fetched_df is not None
     
-    # Try direct API first
-    try:
-        fetched_df = _fetch_yahoo_api_data(symbol, period=period, interval=interval)
-        if not fetched_df.empty:
-            fetch_success = True
-    except Exception as e:
-        logger.warning(f"Direct API intraday fetch failed for {symbol}: {e}")
-        
-    if not fetch_success:
-        try:
-            # Fallback to yfinance
-            logger.info(f"Falling back to yfinance for intraday {symbol}")
-            ticker = yf.Ticker(symbol)
-            fetched_df = ticker.history(period=period, interval=interval, auto_adjust=False)
-            
-            if fetched_df.empty:
-                logger.warning(f"No intraday data for {symbol}, trying alternative period")
-                # Try 1d as fallback
-                fetched_df = ticker.history(period="1d", interval=interval, auto_adjust=False)
-            
-            fetched_df = fetched_df.dropna()
-            if not fetched_df.empty:
-                fetch_success = True
-                logger.info(f"Downloaded {len(fetched_df)} intraday candles for {symbol}")
-        except Exception as e:
-            logger.error(f"Error fetching intraday {symbol}: {e}")
-            
     # Decide what to return
     if fetch_success and not fetched_df.empty:
         # Save to cache
         try:
-            fetched_df.to_csv(cache_path)
+            CACHE_STORE.save(symbol, "intraday", fetched_df)
             logger.info(f"Saved {len(fetched_df)} intraday rows to cache: {cache_path}")
         except Exception as e:
             logger.error(f"Failed to save intraday cache for {symbol}: {e}")
+        try:
+            # Grow the multi-week archive from the rolling pull
+            ARCHIVE.merge(symbol, fetched_df, interval)
+        except Exception as e:
+            logger.error(f"Failed to archive intraday bars for {symbol}: {e}")
         return fetched_df
     
     # If fetch failed but we have stale cache, return that as fallback
@@ -382,6 +472,68 @@ def get_intraday_history(
     return pd.DataFrame()
 
 
+def get_intraday_sessions(
+    symbol: str, start: Optional[date] = None, end: Optional[date] = None, interval: str = INTRADAY_INTERVAL
+) -> pd.DataFrame:
+    """
+    Read archived intraday bars for a range of sessions (no download).
+    
+    Args:
+        symbol: Ticker symbol
+        start: First session date (inclusive, None = oldest archived)
+        end: Last session date (inclusive, None = latest archived)
+        interval: Bar interval of the archive
+        
+    Returns:
+        DataFrame with intraday OHLCV data, empty if nothing is archived
+    """
+    return ARCHIVE.load(symbol, start=start, end=end, interval=interval)
+
+
+# Per (symbol, interval) aggregators fed from the finest intraday bars we hold
+_AGGREGATORS: Dict[Tuple[str, str], BarAggregator] = {}
+_AGGREGATOR_LOCK = threading.Lock()
+
+
+def _get_aggregator(symbol: str, interval: str = INTRADAY_INTERVAL) -> BarAggregator:
+    """Feed any new intraday bars (cache or fetch) into the symbol's aggregator."""
+    intraday = get_intraday_history(symbol, interval=interval)
+    with _AGGREGATOR_LOCK:
+        aggregator = _AGGREGATORS.get((symbol, interval))
+        if aggregator is None:
+            bar_minutes = interval_minutes(interval)
+            timeframes = [tf for tf, minutes in TIMEFRAMES.items() if minutes is None or minutes >= bar_minutes]
+            aggregator = _AGGREGATORS[(symbol, interval)] = BarAggregator(timeframes, bar_minutes=bar_minutes)
+        aggregator.ingest(intraday)
+    return aggregator
+
+
+def get_aggregated_bars(symbol: str, timeframe: str, interval: str = INTRADAY_INTERVAL) -> pd.DataFrame:
+    """
+    Coarser bars (e.g. "15m", "1h", "1d") built from the intraday pull,
+    instead of downloading each timeframe separately.
+    
+    Args:
+        symbol: Ticker symbol
+        timeframe: Target timeframe (see bar_aggregator.TIMEFRAMES)
+        interval: Source intraday interval (must be in minutes, e.g. "5m")
+        
+    Returns:
+        DataFrame with OHLCV data; the last bar may be partial
+    """
+    return _get_aggregator(symbol, interval).bars(timeframe)
+
+
+def get_today_bar(symbol: str, interval: str = INTRADAY_INTERVAL) -> Optional[pd.Series]:
+    """
+    Synthetic "today so far" daily bar from intraday data.
+    
+    Returns:
+        Series with Open/High/Low/Close/Volume, or None without intraday data
+    """
+    return _get_aggregator(symbol, interval).today_bar()
+
+
 def get_vix_history(years: int = LOOKBACK_YEARS) -> pd.DataFrame:
     """
     Fetch India VIX daily history.
@@ -395,10 +547,11 @@ def get_vix_history(years: int = LOOKBACK_YEARS) -> pd.DataFrame:
     return get_daily_history(VIX_SYMBOL, years=years)
 
 
-def get_live_price(symbol: str) -> float:
+def _get_live_price_cascade(symbol: str) -> float:
     """
-    Get live/current price with multiple fallback strategies.
-    Prioritizes: 1) Intraday 1m data, 2) Info, 3) Fast_info, 4) Historical 1m
+    Get live/current price via yfinance with multiple fallback strategies.
+    Used only when the batched quote request fails.
+    Prioritizes: 1) Intraday 1m data, 2) Info, 3) Fast_info, 4) Cached 5m intraday
     
     Args:
         symbol: Ticker symbol (e.g., "^NSEI")
@@ -440,11 +593,11 @@ def get_live_price(symbol: str) -> float:
         except Exception as e:
             logger.debug(f"Fast_info fetch failed for {symbol}: {e}")
         
-        # Fallback: 5-minute data
+        # Fallback: today's synthetic bar from the (cached) 5-minute intraday pull
         try:
-            hist_5m = ticker.history(period="5d", interval="5m", auto_adjust=False)
-            if not hist_5m.empty:
-                price = float(hist_5m["Close"].iloc[-1])
+            today_bar = get_today_bar(symbol)
+            if today_bar is not None:
+                price = float(today_bar["Close"])
                 if price > 0:
                     logger.info(f"Got live price for {symbol} from 5-min data: {price}")
                     return price
@@ -459,15 +612,134 @@ def get_live_price(symbol: str) -> float:
         return None
 
 
+YAHOO_SPARK_URL = "https://query1.finance.yahoo.com/v7/finance/spark"
+
+# Per-run memo of live quotes: symbol -> (fetched_at, price)
+_QUOTE_CACHE: Dict[str, Tuple[float, float]] = {}
+_QUOTE_LOCK = threading.Lock()
+# Latest chart meta block per symbol (regularMarketPrice, previousClose, ...)
+_CHART_META: Dict[str, Dict[str, Any]] = {}
+
+
+def _remember_chart_meta(symbol: str, meta: Dict[str, Any]) -> None:
+    """Keep a chart's meta block and memoize its price as a live quote."""
+    if not meta:
+        return
+    price = meta.get("regularMarketPrice")
+    with _QUOTE_LOCK:
+        _CHART_META[symbol] = meta
+        if price and price > 0:
+            _QUOTE_CACHE[symbol] = (time.time(), float(price))
+
+
+def get_chart_meta(symbol: str) -> Dict[str, Any]:
+    """
+    Meta block from the most recent chart fetch for a symbol.
+    
+    Returns:
+        Dict (e.g. regularMarketPrice, previousClose), empty if not fetched yet
+    """
+    with _QUOTE_LOCK:
+        return dict(_CHART_META.get(symbol, {}))
+
+
+def _fetch_yahoo_batch_quotes(symbols: List[str]) -> Dict[str, float]:
+    """
+    Fetch regularMarketPrice for several symbols in a single request
+    using Yahoo's spark endpoint (chart meta for each symbol).
+    
+    Args:
+        symbols: Ticker symbols (e.g., ["^NSEI", "^INDIAVIX"])
+        
+    Returns:
+        Dict of symbol -> price for the symbols that returned a valid price
+    """
+    params = {"symbols": ",".join(symbols), "range": "1d", "interval": "1m"}
+    try:
+        response = get_http_client().get(YAHOO_SPARK_URL, params=params, headers=_get_random_header(), timeout=10)
+        if response.status_code != 200:
+            logger.warning(f"Yahoo spark returned status {response.status_code} for {symbols}")
+            return {}
+        data = json_loads(response.content)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.debug(f"Batched quote fetch failed for {symbols}: {e}")
+        return {}
+    
+    prices = {}
+    for item in (data.get("spark") or {}).get("result") or []:
+        for chart in item.get("response") or []:
+            meta = chart.get("meta", {})
+            price = meta.get("regularMarketPrice")
+            symbol = meta.get("symbol") or item.get("symbol")
+            if symbol and price and price > 0:
+                prices[symbol] = float(price)
+    logger.info(f"Got batched live quotes: {prices}")
+    return prices
+
+
+def get_live_quotes(symbols: List[str], ttl: float = LIVE_QUOTE_TTL) -> Dict[str, Optional[float]]:
+    """
+    Get live prices for several symbols with one request.
+    Quotes are memoized for `ttl` seconds so no symbol is looked up twice per
+    run; symbols missing from the batched response fall back to the yfinance cascade.
+    
+    Args:
+        symbols: Ticker symbols
+        ttl: Memo lifetime in seconds
+        
+    Returns:
+        Dict of symbol -> price (None if every method failed)
+    """
+    now = time.time()
+    quotes: Dict[str, Optional[float]] = {}
+    with _QUOTE_LOCK:
+        for symbol in symbols:
+            cached = _QUOTE_CACHE.get(symbol)
+            if cached and now - cached[0] < ttl:
+                quotes[symbol] = cached[1]
+    
+    missing = [s for s in symbols if s not in quotes]
+    if missing:
+        fetched = _fetch_yahoo_batch_quotes(missing)
+        for symbol in missing:
+            price = fetched.get(symbol)
+            if price is None:
+                price = _get_live_price_cascade(symbol)
+            quotes[symbol] = price
+            if price is not None:
+                with _QUOTE_LOCK:
+                    _QUOTE_CACHE[symbol] = (time.time(), price)
+    
+    return quotes
+
+
+def get_live_price(symbol: str) -> float:
+    """
+    Get live/current price for one symbol (memoized, see get_live_quotes).
+    
+    Args:
+        symbol: Ticker symbol (e.g., "^NSEI")
+        
+    Returns:
+        Current price as float or None if all methods fail
+    """
+    return get_live_quotes([symbol])[symbol]
+
+
 def get_market_snapshots() -> tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Get latest daily snapshots for NIFTY and VIX.
+    Get latest daily snapshots for NIFTY and VIX, passed through the
+    data-quality gate (bad bars dropped, OHLC repaired).
     
     Returns:
         Tuple of (nifty_df, vix_df)
+        
+    Raises:
+        DataQualityError: A frame failed the gate (training keeps the published models)
     """
-    nifty = get_daily_history(NIFTY_SYMBOL)
-    vix = get_vix_history()
+    nifty, nifty_report = check_ohlcv(get_daily_history(NIFTY_SYMBOL), NIFTY_SYMBOL, "daily", repair=True)
+    vix, vix_report = check_ohlcv(get_vix_history(), VIX_SYMBOL, "daily", repair=True)
+    raise_on_fail(nifty_report, vix_report)
     return nifty, vix
 
 
@@ -482,8 +754,9 @@ def get_latest_values() -> dict:
     
     # Use live price for latest values to ensure real-time accuracy
     # (Daily history often lags by one day for VIX in yfinance)
-    latest_spot = get_live_price(NIFTY_SYMBOL)
-    latest_vix = get_live_price(VIX_SYMBOL)
+    quotes = get_live_quotes([NIFTY_SYMBOL, VIX_SYMBOL])
+    latest_spot = quotes[NIFTY_SYMBOL]
+    latest_vix = quotes[VIX_SYMBOL]
     
     # Fallback to daily close if live fetch fails
     if latest_spot is None:
@@ -523,6 +796,142 @@ def get_latest_values() -> dict:
     }
 
 
+
+@dataclass
+class MarketSnapshot:
+    """Everything one index pipeline needs from the network, fetched in one stage."""
+    index: str
+    symbol: str
+    daily: pd.DataFrame
+    vix: pd.DataFrame
+    intraday: pd.DataFrame
+    live_spot: Optional[float] = None
+    live_vix: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    timed_out: list = field(default_factory=list)
+
+
+def _load_cached(symbol: str, kind: str) -> pd.DataFrame:
+    """Best-effort cache read used when a fetch misses the deadline."""
+    try:
+        if CACHE_STORE.exists(symbol, kind):
+            return CACHE_STORE.load(symbol, kind)
+    except Exception as e:
+        logger.warning(f"Failed to read {kind} cache for {symbol}: {e}")
+    return pd.DataFrame()
+
+
+async def acquire_universe_data_async(
+    indices: List[str] = ACTIVE_INDICES, deadline: float = FETCH_DEADLINE_SECONDS
+) -> Dict[str, MarketSnapshot]:
+    """
+    Shared fetch stage for several indices.
+    Daily and intraday pulls for every underlying (and VIX, once) run
+    concurrently, and all live quotes come from one batched request. Each
+    fetch keeps its own retries/fallbacks; the whole stage is bounded by a
+    single deadline, after which missing pieces fall back to the cache.
+    
+    Args:
+        indices: Keys of INDEX_UNIVERSE (e.g. ["NIFTY", "BANKNIFTY"])
+        deadline: Overall wall-clock budget in seconds
+        
+    Returns:
+        Dict of index -> MarketSnapshot (timings/timed_out are shared by all)
+    """
+    unknown = [i for i in indices if i not in INDEX_UNIVERSE]
+    if unknown:
+        raise ValueError(f"Unknown indices: {unknown}. Known: {list(INDEX_UNIVERSE)}")
+    symbols = list(dict.fromkeys(INDEX_UNIVERSE[i]["symbol"] for i in indices))
+    
+    jobs = {f"daily:{VIX_SYMBOL}": lambda: get_vix_history()}
+    for symbol in symbols:
+        jobs[f"daily:{symbol}"] = lambda symbol=symbol: get_daily_history(symbol)
+        jobs[f"intraday:{symbol}"] = lambda symbol=symbol: get_intraday_history(symbol)
+    jobs["live_quotes"] = lambda: get_live_quotes(symbols + [VIX_SYMBOL])
+    
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    
+    def timed(name, fn):
+        try:
+            return fn()
+        finally:
+            timings[name] = time.perf_counter() - start
+    
+    # Own executor so a stuck request cannot hold up shutdown of the event loop
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="fetch")
+    tasks = {
+        name: loop.run_in_executor(executor, timed, name, fn)
+        for name, fn in jobs.items()
+    }
+    try:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    results: Dict[str, Any] = {}
+    timed_out = []
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            timed_out.append(name)
+            logger.warning(f"Fetch '{name}' missed the {deadline:.0f}s deadline")
+            continue
+        try:
+            results[name] = task.result()
+        except Exception as e:
+            logger.error(f"Fetch '{name}' failed: {e}")
+    
+    def frame(kind, symbol):
+        df = results.get(f"{kind}:{symbol}")
+        return df if df is not None else _load_cached(symbol, kind)
+    
+    vix = frame("daily", VIX_SYMBOL)
+    quotes = results.get("live_quotes") or {}
+    snapshots = {}
+    for index in indices:
+        symbol = INDEX_UNIVERSE[index]["symbol"]
+        snapshots[index] = MarketSnapshot(
+            index=index,
+            symbol=symbol,
+            daily=frame("daily", symbol),
+            vix=vix,
+            intraday=frame("intraday", symbol),
+            live_spot=quotes.get(symbol),
+            live_vix=quotes.get(VIX_SYMBOL),
+            timings=timings,
+            timed_out=timed_out,
+        )
+    logger.info(
+        f"Acquired market data for {indices} in {time.perf_counter() - start:.2f}s "
+        f"({', '.join(f'{k}={v:.2f}s' for k, v in timings.items())})"
+    )
+    return snapshots
+
+
+def acquire_universe_data(
+    indices: List[str] = ACTIVE_INDICES, deadline: float = FETCH_DEADLINE_SECONDS
+) -> Dict[str, MarketSnapshot]:
+    """
+    Synchronous wrapper around acquire_universe_data_async.
+    
+    Returns:
+        Dict of index -> MarketSnapshot
+    """
+    return asyncio.run(acquire_universe_data_async(indices, deadline))
+
+
+def acquire_market_data(deadline: float = FETCH_DEADLINE_SECONDS) -> MarketSnapshot:
+    """
+    NIFTY-only acquisition stage (see acquire_universe_data).
+    
+    Returns:
+        MarketSnapshot
+    """
+    return acquire_universe_data(["NIFTY"], deadline)["NIFTY"]
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     
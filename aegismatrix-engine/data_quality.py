@@ -0,0 +1,251 @@
+"""
+Vectorized OHLCV data-quality gate, run on fetched bars before feature building.
+
+One pass of numpy masks over the frame finds duplicate or out-of-order
+timestamps, missing/non-positive prices, inconsistent OHLC, zero-range bars,
+stale repeated bars, isolated spike-and-revert prints and missing sessions
+(daily: NSE calendar; intraday: gaps inside a session). The result is a
+QualityReport; with repair=True the fixable problems are fixed and the bad
+rows dropped explicitly instead of disappearing in a later dropna().
+"""
+
+import logging
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import QUALITY_SPIKE_Z, QUALITY_MAX_BAD_FRACTION
+from market_calendar import NSE_HOLIDAYS
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+_DAY_SECONDS = 86400
+
+# Holiday table coverage; before it only weekends are known, so short gaps are tolerated
+_CALENDAR_START = np.datetime64(f"{min(NSE_HOLIDAYS).year}-01-01", "D")
+_HOLIDAYS = np.array(sorted(NSE_HOLIDAYS), dtype="datetime64[D]")
+_UNCOVERED_GAP_TOLERANCE = 2  # weekday holidays allowed in a row outside the table
+
+# Issues whose rows are dropped by repair (the rest are reported or fixed in place)
+DROPPED_ISSUES = ("duplicate", "missing_price", "non_positive", "spike")
+
+
+@dataclass
+class QualityReport:
+    """Counts and example timestamps per issue for one frame."""
+    name: str
+    kind: str
+    bars: int
+    counts: Dict[str, int] = field(default_factory=dict)
+    examples: Dict[str, List[str]] = field(default_factory=dict)
+    repaired: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.counts.values())
+
+    @property
+    def bad_fraction(self) -> float:
+        bad = sum(self.counts.get(issue, 0) for issue in DROPPED_ISSUES)
+        return bad / self.bars if self.bars else 1.0
+
+    @property
+    def severity(self) -> str:
+        """"ok", "warn" (usable, see counts) or "fail" (too much bad data to trust)."""
+        if self.bars < 2 or self.bad_fraction > QUALITY_MAX_BAD_FRACTION:
+            return "fail"
+        return "ok" if self.ok else "warn"
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "bars": self.bars,
+            "severity": self.severity,
+            "counts": {k: v for k, v in self.counts.items() if v},
+            "examples": self.examples,
+            "repaired": self.repaired,
+        }
+
+    def log(self):
+        if self.ok:
+            logger.debug(f"Data quality {self.name} {self.kind}: {self.bars} bars clean")
+            return
+        issues = ", ".join(f"{k}={v}" for k, v in self.counts.items() if v)
+        level = logging.ERROR if self.severity == "fail" else logging.WARNING
+        logger.log(level, f"Data quality {self.name} {self.kind} [{self.severity}]: {self.bars} bars, {issues}")
+
+
+class DataQualityError(Exception):
+    """A frame failed the quality gate (severity "fail"); it must not feed models or payloads."""
+
+    def __init__(self, reports: List[QualityReport]):
+        self.reports = reports
+        super().__init__(
+            "data quality failed for " + ", ".join(f"{r.name} {r.kind} ({r.bad_fraction:.1%} bad of {r.bars})" for r in reports)
+        )
+
+
+def raise_on_fail(*reports: QualityReport):
+    """
+    Log every report, then raise if any of them failed.
+
+    Raises:
+        DataQualityError: With the failed reports
+    """
+    for report in reports:
+        report.log()
+    failed = [r for r in reports if r.severity == "fail"]
+    if failed:
+        raise DataQualityError(failed)
+
+
+def _missing_daily_sessions(days: np.ndarray) -> np.ndarray:
+    """Per bar, NSE sessions missing between it and the previous bar."""
+    missing = np.zeros(len(days), dtype="int64")
+    if len(days) < 2:
+        return missing
+    prev, curr = days[:-1] + 1, days[1:]
+    expected = np.busday_count(prev, curr, holidays=_HOLIDAYS)
+    uncovered = curr < _CALENDAR_START
+    expected[uncovered] = np.maximum(expected[uncovered] - _UNCOVERED_GAP_TOLERANCE, 0)
+    missing[1:] = expected
+    return missing
+
+
+def _missing_intraday_bars(ts: np.ndarray) -> np.ndarray:
+    """Per bar, bars missing between it and the previous bar of the same IST session."""
+    missing = np.zeros(len(ts), dtype="int64")
+    if len(ts) < 3:
+        return missing
+    gaps = np.diff(ts)
+    same_day = np.diff((ts + IST_OFFSET_SECONDS) // _DAY_SECONDS) == 0
+    inside = gaps[same_day & (gaps > 0)]
+    if not len(inside):
+        return missing
+    step = np.median(inside)
+    missing[1:] = np.where(same_day & (gaps > step), np.round(gaps / step).astype("int64") - 1, 0)
+    return missing
+
+
+def check_ohlcv(
+    df: pd.DataFrame, name: str = "", kind: str = "daily", repair: bool = False
+) -> Tuple[pd.DataFrame, QualityReport]:
+    """
+    Validate (and optionally repair) an OHLCV frame.
+
+    Repair sorts, keeps the last of duplicate timestamps, widens High/Low to
+    cover Open/Close, and drops rows with missing or non-positive prices and
+    isolated spike-and-revert prints. Zero-range bars, stale repeats and
+    missing sessions are reported only; nothing is fabricated.
+
+    Args:
+        df: OHLCV frame indexed by timestamp (naive UTC for intraday)
+        name: Label for the report (e.g. symbol)
+        kind: "daily" or "intraday" (selects the missing-session check)
+        repair: Return a repaired frame instead of the input
+
+    Returns:
+        (frame, QualityReport); the frame is the input unless repair=True
+    """
+    report = QualityReport(name=name, kind=kind, bars=0 if df is None else len(df))
+    if df is None or df.empty:
+        return df, report
+    if not set(PRICE_COLUMNS).issubset(df.columns):
+        report.counts["missing_columns"] = 1
+        return df, report
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    ts = index.as_unit("s").asi8
+
+    order = None
+    unsorted = int((np.diff(ts) < 0).sum())
+    if unsorted:
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+    # Keep the last occurrence of each timestamp (latest fetch wins)
+    dup = np.zeros(len(ts), dtype=bool)
+    dup[:-1] = ts[1:] == ts[:-1]
+
+    # (4, n) block built from the column arrays (avoids a DataFrame column selection)
+    prices = np.vstack([df[col].to_numpy(dtype="float64") for col in PRICE_COLUMNS])
+    if order is not None:
+        prices = prices[:, order]
+    o, h, l, c = prices
+
+    missing_price = np.isnan(prices).any(axis=0)
+    non_positive = ~missing_price & (prices <= 0).any(axis=0)
+    valid = ~(dup | missing_price | non_positive)
+
+    bad_high = valid & (h < np.maximum(o, c))
+    bad_low = valid & (l > np.minimum(o, c))
+    zero_range = valid & (h == l)
+
+    stale = np.zeros(len(ts), dtype=bool)
+    stale[1:] = (prices[:, 1:] == prices[:, :-1]).all(axis=0) & valid[1:] & valid[:-1]
+
+    # Spike-and-revert: a close far from both neighbours, in opposite directions
+    spike = np.zeros(len(ts), dtype=bool)
+    vc = c[valid]
+    if len(vc) >= 5:
+        r = np.diff(np.log(vc))
+        mad = np.median(np.abs(r - np.median(r))) * 1.4826
+        if mad > 0:
+            z = r / mad
+            flagged = (np.abs(z[:-1]) > QUALITY_SPIKE_Z) & (np.abs(z[1:]) > QUALITY_SPIKE_Z) & (z[:-1] * z[1:] < 0)
+            spike[np.flatnonzero(valid)[1:-1][flagged]] = True
+
+    if kind == "daily":
+        missing_sessions = _missing_daily_sessions((ts[valid] // _DAY_SECONDS).astype("datetime64[D]"))
+    else:
+        missing_sessions = _missing_intraday_bars(ts[valid])
+
+    masks = {
+        "unsorted": None,
+        "duplicate": dup,
+        "missing_price": missing_price,
+        "non_positive": non_positive,
+        "bad_high": bad_high,
+        "bad_low": bad_low,
+        "zero_range": zero_range,
+        "stale_repeat": stale,
+        "spike": spike,
+    }
+    report.counts["unsorted"] = unsorted
+    for issue, mask in masks.items():
+        if mask is None:
+            continue
+        count = int(mask.sum())
+        report.counts[issue] = count
+        if count:
+            report.examples[issue] = [str(t) for t in ts[mask][:3].astype("datetime64[s]")]
+    report.counts["missing_sessions" if kind == "daily" else "missing_bars"] = int(missing_sessions.sum())
+    if missing_sessions.any():
+        gap_ends = ts[valid][missing_sessions > 0][:3].astype("datetime64[s]")
+        report.examples["missing_before"] = [str(t) for t in gap_ends]
+
+    if not repair:
+        return df, report
+
+    keep = valid & ~spike
+    out = df.iloc[order] if order is not None else df
+    out = out.iloc[np.flatnonzero(keep)].copy()
+    if (bad_high | bad_low)[keep].any():
+        out["High"] = np.maximum(h[keep], np.maximum(o[keep], c[keep]))
+        out["Low"] = np.minimum(l[keep], np.minimum(o[keep], c[keep]))
+    report.repaired = {
+        "dropped": int((~keep).sum()),
+        "ohlc_fixed": int((bad_high | bad_low)[keep].sum()),
+        "reordered": unsorted,
+    }
+    return out, report
@@ -12,18 +12,23 @@ import joblib
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import MODEL_DIR, DIRECTION_HORIZONS
+from config import DIRECTION_HORIZONS
+from model_registry import current_generation
 
 logger = logging.getLogger(__name__)
 
 
-def load_models():
+def load_models(model_dir=None):
     """
     Load pre-trained direction models.
     
+    Args:
+        model_dir: Model generation directory (default: the published one, see model_registry)
+    
     Returns:
         Tuple of (direction_model, magnitude_model, scaler)
     """
+    model_dir = model_dir or current_generation()
     try:
         # Load BiLSTM
         # We need to redefine the class or import it. 
@@ -33,7 +38,7 @@ def load_models():
         # However, we don't know input_size easily without the scaler or data.
         # BUT, we saved the scaler! The scaler's mean_ attribute has shape (n_features,).
         
-        scaler_path = MODEL_DIR / "direction_scaler.pkl"
+        scaler_path = model_dir / "direction_scaler.pkl"
         if not scaler_path.exists():
             logger.warning("Scaler not found, returning None")
             return None, None, None
@@ -52,7 +57,7 @@ def load_models():
         device = torch.device("cpu")
         direction_model = BiLSTMClassifier(input_size=input_size).to(device)
         
-        model_path = MODEL_DIR / "direction_seq.pt"
+        model_path = model_dir / "direction_seq.pt"
         if model_path.exists():
             direction_model.load_state_dict(torch.load(model_path, map_location=device))
             direction_model.eval()
@@ -61,7 +66,7 @@ def load_models():
             direction_model = None
             
         # Load Magnitude Model
-        mag_path = MODEL_DIR / "direction_magnitude.pkl"
+        mag_path = model_dir / "direction_magnitude.pkl"
         if mag_path.exists():
             magnitude_model = joblib.load(mag_path)
         else:
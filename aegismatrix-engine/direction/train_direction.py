@@ -27,7 +27,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import MODEL_DIR, DIRECTION_DEAD_ZONE, RANDOM_SEED
 from data_fetcher import get_market_snapshots
-from features.daily_features import build_direction_features
+from model_registry import training_generation
+from feature_store import FEATURE_STORE
+from features.pipeline import FeaturePipeline
 
 # Setup logging
 logging.basicConfig(
@@ -133,7 +135,7 @@ def create_labels(returns, dead_zone=DIRECTION_DEAD_ZONE):
     return labels
 
 
-def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size=32):
+def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size=32, model_dir=MODEL_DIR):
     """Train BiLSTM classifier."""
     logger.info("=" * 60)
     logger.info("Training Direction Classifier (BiLSTM)")
@@ -204,7 +206,7 @@ def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size
             best_val_loss = val_loss
             patience_counter = 0
             try:
-                torch.save(model.state_dict(), str(MODEL_DIR / "direction_seq.pt"))
+                torch.save(model.state_dict(), str(model_dir / "direction_seq.pt"))
                 logger.info(f"✓ Checkpoint saved at epoch {epoch+1}")
             except Exception as e:
                 logger.warning(f"Failed to save checkpoint: {e}")
@@ -218,7 +220,7 @@ def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size
     
     # Final save with explicit error handling
     try:
-        save_path = str(MODEL_DIR / "direction_seq.pt")
+        save_path = str(model_dir / "direction_seq.pt")
         torch.save(model.state_dict(), save_path)
         file_size = os.path.getsize(save_path)
         logger.info(f"✓ Model saved: {save_path} ({file_size} bytes)")
@@ -226,7 +228,7 @@ def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size
         logger.error(f"Failed to save final model: {e}")
         logger.warning("Trying alternative save method...")
         try:
-            torch.save(model, str(MODEL_DIR / "direction_seq.pt"))
+            torch.save(model, str(model_dir / "direction_seq.pt"))
             logger.info(f"✓ Full model saved as fallback")
         except Exception as e2:
             logger.error(f"Fallback save also failed: {e2}")
@@ -238,7 +240,7 @@ def train_direction_classifier(X_seq, y_class, seq_len=60, epochs=50, batch_size
     return scaler
 
 
-def train_direction_magnitude(X_reg, y_points):
+def train_direction_magnitude(X_reg, y_points, model_dir=MODEL_DIR):
     """Train XGBoost regressor for expected move magnitude."""
     logger.info("=" * 60)
     logger.info("Training Direction Magnitude (XGBoost Regressor)")
@@ -271,9 +273,9 @@ def train_direction_magnitude(X_reg, y_points):
     mae = mean_absolute_error(y_val, y_pred)
     
     logger.info(f"✓ Direction magnitude trained. Val MAE: {mae:.2f} points")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'direction_magnitude.pkl'}")
+    logger.info(f"✓ Model saved: {model_dir / 'direction_magnitude.pkl'}")
     
-    joblib.dump(model, MODEL_DIR / "direction_magnitude.pkl")
+    joblib.dump(model, model_dir / "direction_magnitude.pkl")
     
     return model
 
@@ -294,7 +296,7 @@ def main():
     
     # Build features
     logger.info("Building features...")
-    features_df = build_direction_features(nifty, vix)
+    features_df = FeaturePipeline(nifty, vix, name="NIFTY", store=FEATURE_STORE).direction()
     
     if features_df is None or len(features_df) < 200:
         logger.error("Feature engineering failed")
@@ -321,15 +323,17 @@ def main():
     
     logger.info(f"Sequences: {X_seq.shape} | Classes: {y_seq_class.shape} | Points: {y_points_seq.shape}")
     
-    # Train classifier
-    scaler = train_direction_classifier(X_seq, y_seq_class)
-    
-    # Train magnitude
-    train_direction_magnitude(X, y_points)
-    
-    # Save scaler
-    joblib.dump(scaler, MODEL_DIR / "direction_scaler.pkl")
-    logger.info(f"✓ Scaler saved: {MODEL_DIR / 'direction_scaler.pkl'}")
+    # Written into a staged model generation (checkpoints included), published atomically on success
+    with training_generation() as model_dir:
+        # Train classifier
+        scaler = train_direction_classifier(X_seq, y_seq_class, model_dir=model_dir)
+        
+        # Train magnitude
+        train_direction_magnitude(X, y_points, model_dir)
+        
+        # Save scaler
+        joblib.dump(scaler, model_dir / "direction_scaler.pkl")
+        logger.info(f"✓ Scaler saved: {model_dir / 'direction_scaler.pkl'}")
 
     logger.info("=" * 60)
     logger.info("✓ Direction training complete!")
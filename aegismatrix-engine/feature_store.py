@@ -0,0 +1,293 @@
+"""
+Content-addressed on-disk store of computed daily feature frames.
+
+An entry is keyed by a hash of the input bars (index and VIX OHLCV with their
+timestamps) and of the feature code (FEATURE_VERSION plus the source of the
+feature modules), so inference and every training script get the same,
+precomputed frames for the same data, and a code change can never serve stale
+features. One Parquet file per entry holds the base columns and the seller
+and buyer columns; each engine reads only its own columns.
+
+When the inputs only grew (new bars appended, or the latest bar refreshed)
+the newest matching entry is extended instead of rebuilt: its saved
+StreamingBaseFeatures state takes the new bars in O(1) each, and the engine
+columns are recomputed over a short tail.
+
+Layout: FEATURE_STORE_DIR/<name>/<key>.parquet|.json|.state
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import FEATURE_STORE_DIR, FEATURE_STORE_KEEP
+from atomic_io import atomic_path, atomic_write, atomic_write_text
+import features.daily_features as daily_features
+import features.rolling as rolling
+import features.streaming as streaming
+from features.daily_features import (
+    FEATURE_VERSION,
+    add_basic_features,
+    add_buyer_features,
+    add_seller_features,
+    merge_vix_features,
+)
+from features.streaming import BAR_COLUMNS, StreamingBaseFeatures
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("direction", "seller", "buyer")
+# Engine -> function adding its columns to the base frame
+ENGINE_EXTENSIONS = {"seller": add_seller_features, "buyer": add_buyer_features}
+# Base rows recomputed before the new ones when extending engine columns (longest window + shift)
+EXTENSION_CONTEXT = 64
+
+
+@lru_cache(maxsize=1)
+def feature_code_version() -> str:
+    """Fingerprint of the feature code: FEATURE_VERSION and the source of the feature modules."""
+    digest = hashlib.blake2b(str(FEATURE_VERSION).encode(), digest_size=8)
+    for module in (daily_features, rolling, streaming):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def _storable(df: pd.DataFrame) -> bool:
+    return (
+        df is not None
+        and len(df) > 0
+        and isinstance(df.index, pd.DatetimeIndex)
+        and list(df.columns) == BAR_COLUMNS
+    )
+
+
+class _Inputs:
+    """Timestamps and values of one input frame, hashed by prefix length."""
+
+    def __init__(self, df: pd.DataFrame):
+        index = df.index.tz_convert("UTC").tz_localize(None) if df.index.tz is not None else df.index
+        self.ts = index.as_unit("ns").asi8
+        self.values = np.ascontiguousarray(df.to_numpy(dtype="float64"))
+        self.df = df
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def update(self, digest, n: int):
+        digest.update(n.to_bytes(8, "little"))
+        digest.update(self.ts[:n].tobytes())
+        digest.update(self.values[:n].tobytes())
+
+
+def _key(index: _Inputs, vix: _Inputs, n_index: int, n_vix: int) -> str:
+    digest = hashlib.blake2b(feature_code_version().encode(), digest_size=16)
+    index.update(digest, n_index)
+    vix.update(digest, n_vix)
+    return digest.hexdigest()
+
+
+def _engine_frames(full: pd.DataFrame, groups: Dict[str, List[str]], engines: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    return {engine: full[groups["base"] + groups.get(engine, [])] for engine in engines}
+
+
+class FeatureStore:
+    """
+    Feature frames keyed by input bars and feature code.
+
+    Args:
+        root: Store directory
+        keep: Entries kept per name (least recently used are pruned)
+    """
+
+    def __init__(self, root: Path = FEATURE_STORE_DIR, keep: int = FEATURE_STORE_KEEP):
+        self.root = Path(root)
+        self.keep = keep
+        try:
+            import pyarrow  # noqa: F401
+            self.enabled = True
+        except ImportError:
+            logger.warning("pyarrow not installed, feature store disabled")
+            self.enabled = False
+
+    def _paths(self, name: str, key: str) -> Dict[str, Path]:
+        base = self.root / name / key
+        return {ext: base.with_suffix(f".{ext}") for ext in ("parquet", "json", "state")}
+
+    def get(
+        self, index: pd.DataFrame, vix: pd.DataFrame, name: str, engines: Sequence[str] = ENGINES
+    ) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Feature frames for the inputs: stored, extended from a stored
+        prefix, or built and stored.
+
+        Args:
+            index: Daily OHLCV of the index
+            vix: Daily VIX OHLCV
+            name: Index name (groups entries for extension and pruning)
+            engines: Engines whose frames to return
+
+        Returns:
+            Dict of engine -> frame (equal to build_<engine>_features), or
+            None if the inputs cannot be stored (then compute directly)
+        """
+        if not self.enabled or not (_storable(index) and _storable(vix)):
+            return None
+        index_in, vix_in = _Inputs(index), _Inputs(vix)
+        key = _key(index_in, vix_in, len(index_in), len(vix_in))
+        paths = self._paths(name, key)
+
+        try:
+            if paths["parquet"].exists() and paths["json"].exists():
+                groups = json.loads(paths["json"].read_text())["columns"]
+                columns = list(dict.fromkeys(c for e in engines for c in groups["base"] + groups.get(e, [])))
+                full = pd.read_parquet(paths["parquet"], columns=columns, engine="pyarrow")
+                os.utime(paths["json"])  # recently used, for pruning
+                logger.info(f"Feature store hit for {name} ({key[:12]}, {len(full)} rows)")
+                return _engine_frames(full, groups, engines)
+
+            extended = self._extend(index_in, vix_in, name)
+            if extended is not None:
+                full, groups, state = extended
+            else:
+                full, groups, state = self._build(index, vix)
+                logger.info(f"Feature store miss for {name}: built {len(full)} rows")
+            self._save(name, key, len(index_in), len(vix_in), index_in, vix_in, full, groups, state)
+            return _engine_frames(full, groups, engines)
+        except Exception as e:
+            logger.error(f"Feature store failed for {name}, computing features directly: {e}")
+            return None
+
+    def _build(self, index: pd.DataFrame, vix: pd.DataFrame):
+        """Full build with the batch code, plus the streaming state for later extension."""
+        base = merge_vix_features(add_basic_features(index), add_basic_features(vix))
+        groups = {"base": list(base.columns)}
+        parts = [base]
+        for engine, extend in ENGINE_EXTENSIONS.items():
+            frame = extend(base.copy(deep=False))
+            groups[engine] = [c for c in frame.columns if c not in base.columns]
+            parts.append(frame[groups[engine]])
+        full = pd.concat(parts, axis=1)
+
+        state = StreamingBaseFeatures()
+        self._feed(state, index, vix, 0, 0)
+        # Inputs the stream cannot follow (e.g. one side lagging for weeks) are only ever rebuilt
+        return full, groups, None if state.out_of_order else state
+
+    @staticmethod
+    def _feed(
+        state: StreamingBaseFeatures, index: pd.DataFrame, vix: pd.DataFrame, start_index: int, start_vix: int
+    ) -> pd.DataFrame:
+        """
+        Feed bars from the given positions on, date by date, and compact the state.
+
+        Returns:
+            Base rows from the previous last row on (that one possibly replaced)
+        """
+        days: Dict[pd.Timestamp, Dict[str, list]] = {}
+        for side, df, start in (("index", index, start_index), ("vix", vix, start_vix)):
+            tail = df.iloc[start:]
+            for ts, bar in zip(tail.index, tail.to_numpy(dtype="float64").tolist()):
+                days.setdefault(StreamingBaseFeatures._day(ts), {})[side] = bar
+        # Both engines are stamped with the date, so a refreshed bar always replaces its predecessor
+        for day in sorted(days):
+            state.update(day, days[day].get("index"), days[day].get("vix"))
+        emitted = state.frame()
+        state.compact()
+        return emitted
+
+    def _extend(self, index: _Inputs, vix: _Inputs, name: str):
+        """Extend the newest stored entry whose inputs are a prefix of these (None if there is none)."""
+        directory = self.root / name
+        if not directory.exists():
+            return None
+        code = feature_code_version()
+        metas = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta_path in metas:
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (OSError, ValueError):
+                continue
+            n_i, n_v = meta["rows"]
+            if meta.get("code") != code or n_i > len(index) or n_v > len(vix):
+                continue
+            if _key(index, vix, n_i, n_v) == meta["key"]:
+                start_i, start_v = n_i, n_v
+            elif _key(index, vix, n_i - 1, n_v - 1) == meta["head"]:
+                # Latest bar refreshed (e.g. today's forming bar): replace it, then append
+                start_i, start_v = n_i - 1, n_v - 1
+            else:
+                continue
+            paths = self._paths(name, meta["key"])
+            if not paths["state"].exists() or not paths["parquet"].exists():
+                continue
+            with open(paths["state"], "rb") as handle:
+                state = pickle.load(handle)
+            if not isinstance(state, StreamingBaseFeatures):
+                continue
+            full = pd.read_parquet(paths["parquet"], engine="pyarrow")
+            groups = meta["columns"]
+            emitted = self._feed(state, index.df, vix.df, start_i, start_v)
+            if state.out_of_order:
+                continue
+            full = self._append_rows(full, groups, emitted)
+            logger.info(
+                f"Feature store partial hit for {name}: extended {meta['key'][:12]} "
+                f"with {len(index) - start_i} index / {len(vix) - start_v} VIX bars"
+            )
+            return full, groups, state
+        return None
+
+    @staticmethod
+    def _append_rows(full: pd.DataFrame, groups: Dict[str, List[str]], emitted: pd.DataFrame) -> pd.DataFrame:
+        """Replace/append streamed base rows, recomputing engine columns over a short tail."""
+        if emitted.empty:
+            return full
+        emitted = emitted[groups["base"]]
+        first = emitted.index[0]
+        kept = full[full.index < first]
+        base = pd.concat([kept[groups["base"]], emitted])
+        tail = base.iloc[-(len(emitted) + EXTENSION_CONTEXT):].copy()
+        parts = [emitted]
+        for engine, extend in ENGINE_EXTENSIONS.items():
+            parts.append(extend(tail.copy(deep=False))[groups[engine]].iloc[-len(emitted):])
+        new_rows = pd.concat(parts, axis=1)[full.columns].astype(full.dtypes.to_dict())
+        return pd.concat([kept, new_rows])
+
+    def _save(self, name, key, n_index, n_vix, index: _Inputs, vix: _Inputs, full, groups, state):
+        paths = self._paths(name, key)
+        with atomic_path(paths["parquet"]) as tmp:
+            full.to_parquet(tmp, engine="pyarrow", index=True)
+        if state is not None:
+            with atomic_write(paths["state"], "wb") as handle:
+                pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        meta = {
+            "key": key,
+            "head": _key(index, vix, n_index - 1, n_vix - 1),
+            "code": feature_code_version(),
+            "rows": [n_index, n_vix],
+            "columns": groups,
+        }
+        # Sidecar last: an entry is only visible once its frame and state exist
+        atomic_write_text(paths["json"], json.dumps(meta))
+        self._prune(name)
+
+    def _prune(self, name: str):
+        metas = sorted((self.root / name).glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta_path in metas[self.keep:]:
+            for path in self._paths(name, meta_path.stem).values():
+                path.unlink(missing_ok=True)
+            logger.debug(f"Pruned feature store entry {name}/{meta_path.stem}")
+
+
+FEATURE_STORE = FeatureStore()
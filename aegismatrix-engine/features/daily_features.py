@@ -6,8 +6,14 @@ import pandas as pd
 import numpy as np
 import logging
 
+from features.rolling import rolling_masked_mean, rolling_percentile
+
 logger = logging.getLogger(__name__)
 
+# Bump when a feature definition changes in a way the source fingerprint
+# of the feature store would not catch (e.g. a dependency upgrade)
+FEATURE_VERSION = 1
+
 
 def add_basic_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -58,20 +64,17 @@ def add_basic_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def build_direction_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataFrame:
+def merge_vix_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataFrame:
     """
-    Build feature matrix for direction engine.
+    Join VIX features onto NIFTY features (the shared base frame of all engines).
     
     Args:
-        nifty: Daily NIFTY OHLCV
-        vix: Daily VIX OHLCV
+        nifty: NIFTY frame from add_basic_features
+        vix: VIX frame from add_basic_features
         
     Returns:
         Feature DataFrame aligned to dates
     """
-    nifty = add_basic_features(nifty).copy()
-    vix = add_basic_features(vix).copy()
-    
     # Rename VIX features to avoid conflict
     vix_cols = {col: f"vix_{col}" for col in vix.columns if col != "Close"}
     vix = vix.rename(columns=vix_cols)
@@ -85,9 +88,60 @@ def build_direction_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataF
     df = df.dropna()
     
     # VIX percentile
-    df["vix_percentile"] = df["Close_vix"].rolling(252).apply(
-        lambda x: (x.iloc[-1] >= x).sum() / len(x)
-    )
+    df["vix_percentile"] = rolling_percentile(df["Close_vix"], 252)
+    return df
+
+
+def add_seller_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add seller-specific columns to a base feature frame (in place).
+    
+    Args:
+        df: Frame from build_direction_features / merge_vix_features
+        
+    Returns:
+        The same frame
+    """
+    # Tail metrics
+    ret = df["ret_1d"]
+    df["downside_tail"] = rolling_masked_mean(ret, (ret < 0).to_numpy(), 20)
+    df["upside_tail"] = rolling_masked_mean(ret, (ret > 0).to_numpy(), 20)
+    df["tail_asymmetry"] = (df["downside_tail"].abs() - df["upside_tail"].abs()) / (df["upside_tail"].abs() + 1e-6)
+    return df
+
+
+def add_buyer_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add buyer-specific columns to a base feature frame (in place).
+    
+    Args:
+        df: Frame from build_direction_features / merge_vix_features
+        
+    Returns:
+        The same frame
+    """
+    # Range compression
+    df["range_10d"] = (df["High"] - df["Low"]).rolling(10).mean()
+    df["range_60d"] = (df["High"] - df["Low"]).rolling(60).mean()
+    df["range_compression"] = df["range_10d"] / (df["range_60d"] + 1e-6)
+    
+    # Breakout tendency
+    df["closes_above_10d_high"] = (df["Close"] > df["High"].rolling(10).max().shift(1)).astype(int)
+    return df
+
+
+def build_direction_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build feature matrix for direction engine.
+    
+    Args:
+        nifty: Daily NIFTY OHLCV
+        vix: Daily VIX OHLCV
+        
+    Returns:
+        Feature DataFrame aligned to dates
+    """
+    df = merge_vix_features(add_basic_features(nifty), add_basic_features(vix))
     
     logger.info(f"Built direction features: {df.shape}")
     return df
@@ -104,14 +158,8 @@ def build_seller_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataFram
     Returns:
         Feature DataFrame
     """
-    # Same base as direction for now
-    # Can extend with seller-specific metrics later
-    df = build_direction_features(nifty, vix)
-    
-    # Tail metrics
-    df["downside_tail"] = df["ret_1d"].rolling(20).apply(lambda x: x[x < 0].mean())
-    df["upside_tail"] = df["ret_1d"].rolling(20).apply(lambda x: x[x > 0].mean())
-    df["tail_asymmetry"] = (df["downside_tail"].abs() - df["upside_tail"].abs()) / (df["upside_tail"].abs() + 1e-6)
+    # Same base as direction, plus seller-specific metrics
+    df = add_seller_features(build_direction_features(nifty, vix))
     
     logger.info(f"Built seller features: {df.shape}")
     return df
@@ -128,16 +176,8 @@ def build_buyer_features(nifty: pd.DataFrame, vix: pd.DataFrame) -> pd.DataFrame
     Returns:
         Feature DataFrame
     """
-    # Same base as direction
-    df = build_direction_features(nifty, vix)
-    
-    # Range compression
-    df["range_10d"] = (df["High"] - df["Low"]).rolling(10).mean()
-    df["range_60d"] = (df["High"] - df["Low"]).rolling(60).mean()
-    df["range_compression"] = df["range_10d"] / (df["range_60d"] + 1e-6)
-    
-    # Breakout tendency
-    df["closes_above_10d_high"] = (df["Close"] > df["High"].rolling(10).max().shift(1)).astype(int)
+    # Same base as direction, plus buyer-specific metrics
+    df = add_buyer_features(build_direction_features(nifty, vix))
     
     logger.info(f"Built buyer features: {df.shape}")
     return df
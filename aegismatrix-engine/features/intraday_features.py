@@ -114,3 +114,35 @@ def build_gamma_window_features(intraday: pd.DataFrame) -> list[dict]:
     
     logger.info(f"Built gamma window features: {len(results)} windows")
     return results
+
+
+def build_gamma_window_history(intraday: pd.DataFrame) -> list[dict]:
+    """
+    Average gamma-window scores across several sessions
+    (e.g. a range read from the intraday archive).
+    
+    Args:
+        intraday: Multi-session intraday OHLCV (naive UTC or tz-aware index)
+        
+    Returns:
+        List of {"window": "HH:MM-HH:MM", "score": 0-1, "sessions": n}
+    """
+    if len(intraday) == 0:
+        return []
+    
+    index = pd.DatetimeIndex(intraday.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    sessions = index.tz_convert("Asia/Kolkata").date
+    
+    scores = {}
+    for _, session_df in intraday.groupby(sessions):
+        for window in build_gamma_window_features(session_df):
+            scores.setdefault(window["window"], []).append(window["score"])
+    
+    results = [
+        {"window": label, "score": float(np.mean(values)), "sessions": len(values)}
+        for label, values in scores.items()
+    ]
+    logger.info(f"Built gamma window history over {len(set(sessions))} sessions")
+    return results
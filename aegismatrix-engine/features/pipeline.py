@@ -0,0 +1,85 @@
+"""
+Daily feature pipeline shared by the three engines.
+
+The base frame (basic features for NIFTY and VIX, joined, plus the VIX
+percentile) is built once per (index, VIX) pair. Engine frames are shallow
+copies of it with their own columns added, so the base is neither recomputed
+nor copied, and each engine still sees exactly the columns its
+build_*_features function produces.
+
+With a feature store (feature_store.FeatureStore), all engine frames come
+from it in one lookup; the pipeline computes them itself only when the store
+cannot serve the inputs.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from features.daily_features import add_basic_features, add_buyer_features, add_seller_features, merge_vix_features
+
+logger = logging.getLogger(__name__)
+
+
+class FeaturePipeline:
+    """
+    Lazily built, memoized daily feature frames for one index.
+
+    Args:
+        nifty: Daily OHLCV of the index
+        vix: Daily VIX OHLCV
+        name: Label for logs (e.g. index key); also the feature store entry group
+        store: Optional feature store (e.g. feature_store.FEATURE_STORE)
+    """
+
+    def __init__(self, nifty: pd.DataFrame, vix: pd.DataFrame, name: str = "", store=None):
+        self.nifty = nifty
+        self.vix = vix
+        self.name = name
+        self.store = store
+        self.timings: Dict[str, float] = {}  # stage -> seconds
+        self._base: Optional[pd.DataFrame] = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    def _timed(self, stage: str, fn: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    @property
+    def base(self) -> pd.DataFrame:
+        """Shared base frame (same columns as build_direction_features)."""
+        if self._base is None:
+            nifty = self._timed("basic_index", add_basic_features, self.nifty)
+            vix = self._timed("basic_vix", add_basic_features, self.vix)
+            self._base = self._timed("merge_vix", merge_vix_features, nifty, vix)
+        return self._base
+
+    def _engine_frame(self, engine: str, extend: Optional[Callable]) -> pd.DataFrame:
+        if self.store is not None and not self._frames and self._base is None:
+            stored = self._timed("feature_store", self.store.get, self.nifty, self.vix, self.name or "default")
+            if stored is not None:
+                self._frames.update(stored)
+        if engine not in self._frames:
+            # Shallow copy: shares the base columns, new columns only land in this frame
+            frame = self.base.copy(deep=False)
+            self._frames[engine] = self._timed(engine, extend, frame) if extend else frame
+        return self._frames[engine]
+
+    def direction(self) -> pd.DataFrame:
+        return self._engine_frame("direction", None)
+
+    def seller(self) -> pd.DataFrame:
+        return self._engine_frame("seller", add_seller_features)
+
+    def buyer(self) -> pd.DataFrame:
+        return self._engine_frame("buyer", add_buyer_features)
+
+    def log_timings(self):
+        stages = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in self.timings.items())
+        total = sum(self.timings.values()) * 1000
+        logger.info(f"Feature pipeline {self.name}: {total:.1f}ms ({stages})")
@@ -0,0 +1,83 @@
+"""
+Vectorized rolling-window primitives.
+
+Drop-in replacements for `Series.rolling(window).apply(python_fn)` patterns:
+same full-window semantics (NaN until `window` observations, NaN for any
+window containing a NaN) and the same values, computed with numpy over
+sliding-window views instead of one Python call per row.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows of the (rows, window) comparison block evaluated at once (bounds temporary memory)
+_CHUNK_ROWS = 4096
+
+
+def _nan_in_window(values: np.ndarray, window: int) -> np.ndarray:
+    """Per full window (aligned to its last row), True if it contains a NaN."""
+    nan_count = np.concatenate(([0], np.cumsum(np.isnan(values))))
+    return (nan_count[window:] - nan_count[:-window]) > 0
+
+
+def rolling_percentile(series: pd.Series, window: int) -> pd.Series:
+    """
+    Fraction of the trailing window at or below the current value.
+
+    Equivalent to
+    `series.rolling(window).apply(lambda x: (x.iloc[-1] >= x).sum() / len(x))`.
+
+    Args:
+        series: Input values
+        window: Window length (including the current row)
+
+    Returns:
+        Series aligned to `series`, NaN for the first window - 1 rows
+    """
+    values = series.to_numpy(dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window)
+        for start in range(0, len(windows), _CHUNK_ROWS):
+            block = windows[start:start + _CHUNK_ROWS]
+            at = start + window - 1
+            out[at:at + len(block)] = np.count_nonzero(block <= block[:, -1:], axis=1) / window
+        out[window - 1:][_nan_in_window(values, window)] = np.nan
+    return pd.Series(out, index=series.index, name=series.name)
+
+
+def rolling_masked_mean(series: pd.Series, mask: np.ndarray, window: int) -> pd.Series:
+    """
+    Mean of the values selected by `mask` within each trailing window.
+
+    Equivalent to `series.rolling(window).apply(lambda x: x[cond(x)].mean())`
+    with `mask = cond(series)`: NaN where the window selects nothing, for the
+    first window - 1 rows and for any window containing a NaN. The masked sum
+    adds zeros in place of unselected values, so results agree with the
+    per-window mean to floating-point rounding (summation order differs).
+
+    Args:
+        series: Input values
+        mask: Boolean array aligned to `series` (e.g. series < 0)
+        window: Window length (including the current row)
+
+    Returns:
+        Series aligned to `series`
+    """
+    values = series.to_numpy(dtype="float64")
+    mask = np.asarray(mask, dtype=bool)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window)
+        masks = sliding_window_view(mask, window)
+        for start in range(0, len(windows), _CHUNK_ROWS):
+            block = windows[start:start + _CHUNK_ROWS]
+            selected = masks[start:start + _CHUNK_ROWS]
+            at = start + window - 1
+            sums = np.where(selected, block, 0.0).sum(axis=1)
+            counts = np.count_nonzero(selected, axis=1)
+            with np.errstate(invalid="ignore"):
+                out[at:at + len(block)] = sums / counts
+        out[window - 1:][_nan_in_window(values, window)] = np.nan
+    return pd.Series(out, index=series.index, name=series.name)
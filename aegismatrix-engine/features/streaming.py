@@ -0,0 +1,553 @@
+"""
+Streaming (incremental) version of the daily base features.
+
+StreamingFeatures keeps the rolling state behind add_basic_features: the
+pct_change lags, Welford-style rolling variance windows for the vols, the ATR
+and RSI rolling means, and the EMA accumulators. Appending a bar costs O(1)
+whatever the history length. StreamingBaseFeatures pairs an index and a VIX
+engine and also maintains the 252-day VIX percentile window, so it yields
+rows of the base frame from merge_vix_features.
+
+The rules follow the batch code: pandas' full-window rolling semantics and
+its adjusted-EWM recurrence. A bar with the same timestamp as the previous
+one replaces it, e.g. today's forming daily bar being refreshed. Batch and
+stream differ only by floating-point rounding in the rolling sums. The
+verify modes assert that against the batch functions.
+
+Usage:
+    engine = StreamingFeatures.from_frame(nifty)   # warm up on history
+    row = engine.update(ts, o, h, l, c, v)         # each new/refreshed bar
+    engine.save(path); StreamingFeatures.load(path)
+"""
+
+import logging
+import math
+import pickle
+from bisect import bisect_right, insort
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import atomic_write
+from features.daily_features import add_basic_features, merge_vix_features
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+# Columns appended by add_basic_features, in its order
+FEATURE_COLUMNS = [
+    "ret_1d", "ret_5d", "ret_10d", "ret_20d",
+    "vol_10d", "vol_20d", "vol_60d",
+    "tr", "atr_14", "delta", "rsi_14",
+    "ema_20", "ema_50", "ema_slope_20", "ema_slope_50",
+]
+RETURN_LAGS = (1, 5, 10, 20)
+VOL_WINDOWS = (10, 20, 60)
+PERCENTILE_WINDOW = 252
+VIX_MERGE_COLUMNS = ["vix_vol_10d", "vix_vol_20d", "vix_vol_60d"]
+RECENT_DAYS = 10  # dates one side may lag the other and still be joined
+
+# Relative/absolute tolerance of the verify modes (rolling sums are accumulated differently)
+VERIFY_RTOL = 1e-9
+VERIFY_ATOL = 1e-12
+
+NAN = float("nan")
+
+
+def _max(a: float, b: float) -> float:
+    """np.maximum for scalars (NaN propagates)."""
+    return NAN if a != a or b != b else (a if a >= b else b)
+
+
+class _RollingMean:
+    """Full-window rolling mean with a compensated (Kahan) running sum."""
+    __slots__ = ("window", "values", "total", "comp", "nans")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque()
+        self.total = 0.0
+        self.comp = 0.0
+        self.nans = 0
+
+    def _add(self, x: float):
+        y = x - self.comp
+        t = self.total + y
+        self.comp = (t - self.total) - y
+        self.total = t
+
+    def push(self, x: float):
+        self.values.append(x)
+        if x != x:
+            self.nans += 1
+        else:
+            self._add(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old != old:
+                self.nans -= 1
+            else:
+                self._add(-old)
+
+    def mean(self) -> float:
+        if len(self.values) < self.window or self.nans:
+            return NAN
+        return self.total / self.window
+
+    def clone(self) -> "_RollingMean":
+        other = _RollingMean.__new__(_RollingMean)
+        other.window, other.values = self.window, deque(self.values)
+        other.total, other.comp, other.nans = self.total, self.comp, self.nans
+        return other
+
+
+class _RollingStd:
+    """Full-window rolling sample std (ddof=1) with Welford add/remove updates."""
+    __slots__ = ("window", "values", "n", "mean", "m2", "nans")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.nans = 0
+
+    def push(self, x: float):
+        self.values.append(x)
+        if x != x:
+            self.nans += 1
+        else:
+            self.n += 1
+            d = x - self.mean
+            self.mean += d / self.n
+            self.m2 += d * (x - self.mean)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old != old:
+                self.nans -= 1
+            else:
+                self.n -= 1
+                if self.n == 0:
+                    self.mean = self.m2 = 0.0
+                else:
+                    d = old - self.mean
+                    self.mean -= d / self.n
+                    self.m2 -= d * (old - self.mean)
+
+    def std(self) -> float:
+        if len(self.values) < self.window or self.nans or self.n < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1))
+
+    def clone(self) -> "_RollingStd":
+        other = _RollingStd.__new__(_RollingStd)
+        other.window, other.values = self.window, deque(self.values)
+        other.n, other.mean, other.m2, other.nans = self.n, self.mean, self.m2, self.nans
+        return other
+
+
+class _Ewm:
+    """pandas ewm(span=...).mean() (adjust=True, ignore_na=False), one value at a time."""
+    __slots__ = ("decay", "weighted", "old_wt", "started")
+
+    def __init__(self, span: int):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.started = False
+
+    def push(self, x: float) -> float:
+        if not self.started:
+            self.weighted = x
+            self.started = x == x
+            return self.weighted
+        self.old_wt *= self.decay
+        if x == x:
+            if self.weighted != x:
+                self.weighted = (self.old_wt * self.weighted + x) / (self.old_wt + 1.0)
+            self.old_wt += 1.0
+        return self.weighted
+
+    def clone(self) -> "_Ewm":
+        other = _Ewm.__new__(_Ewm)
+        other.decay, other.weighted, other.old_wt, other.started = self.decay, self.weighted, self.old_wt, self.started
+        return other
+
+
+class RollingPercentile:
+    """
+    Trailing-window percentile rank (fraction of the window <= the newest
+    value), kept in a sorted window: O(log w) lookup per update.
+    Matches features.rolling.rolling_percentile for NaN-free input.
+    """
+
+    def __init__(self, window: int = PERCENTILE_WINDOW):
+        self.window = window
+        self.values: deque = deque()
+        self.ordered: List[float] = []
+        self._evicted: Optional[float] = None  # value the last update pushed out, for replace
+
+    def update(self, x: float, replace: bool = False) -> float:
+        """Add x (or replace the newest value with it) and return its percentile rank."""
+        if replace and self.values:
+            self.ordered.pop(bisect_right(self.ordered, self.values.pop()) - 1)
+            if self._evicted is not None:
+                self.values.appendleft(self._evicted)
+                insort(self.ordered, self._evicted)
+        self._evicted = None
+        self.values.append(x)
+        insort(self.ordered, x)
+        if len(self.values) > self.window:
+            self._evicted = self.values.popleft()
+            self.ordered.pop(bisect_right(self.ordered, self._evicted) - 1)
+        if len(self.values) < self.window:
+            return NAN
+        return bisect_right(self.ordered, x) / self.window
+
+
+class StreamingFeatures:
+    """
+    Incremental add_basic_features.
+
+    Args:
+        verify: After every update, recompute add_basic_features over all bars
+            seen so far and assert the new row matches (O(n); for testing)
+    """
+
+    def __init__(self, verify: bool = False):
+        self.verify = verify
+        self.last_ts: Optional[pd.Timestamp] = None
+        self._index: List[pd.Timestamp] = []
+        self._rows: List[Tuple[float, ...]] = []
+        self._init_state()
+        self._checkpoint = None
+        self._bars: List[Tuple[float, ...]] = []  # raw bars, kept only in verify mode
+
+    def _init_state(self):
+        self._closes: deque = deque(maxlen=max(RETURN_LAGS))
+        self._vols = {w: _RollingStd(w) for w in VOL_WINDOWS}
+        self._atr = _RollingMean(14)
+        self._gain = _RollingMean(14)
+        self._loss = _RollingMean(14)
+        self._ema = {20: _Ewm(20), 50: _Ewm(50)}
+        self._ema_hist = {span: deque(maxlen=6) for span in self._ema}
+
+    def _state(self) -> tuple:
+        """Copy of the rolling state (bounded windows, so O(1) in history length)."""
+        return (
+            deque(self._closes, maxlen=self._closes.maxlen),
+            {w: s.clone() for w, s in self._vols.items()},
+            self._atr.clone(),
+            self._gain.clone(),
+            self._loss.clone(),
+            {span: e.clone() for span, e in self._ema.items()},
+            {span: deque(h, maxlen=h.maxlen) for span, h in self._ema_hist.items()},
+        )
+
+    def _restore(self, state: tuple):
+        (self._closes, self._vols, self._atr, self._gain, self._loss, self._ema, self._ema_hist) = state
+
+    def update(self, ts, o: float, h: float, l: float, c: float, v: float) -> Optional[Dict[str, float]]:
+        """
+        Apply one daily bar and return its feature row.
+
+        A bar with the same timestamp as the previous one replaces it; older
+        bars are ignored.
+
+        Returns:
+            Row dict (bar columns + FEATURE_COLUMNS), or None if ignored
+        """
+        ts = pd.Timestamp(ts)
+        if self.last_ts is not None and ts < self.last_ts:
+            logger.debug(f"Ignoring out-of-order bar at {ts}")
+            return None
+        replace = ts == self.last_ts
+        if replace:
+            # Roll the state back to before the previous version of this bar
+            self._restore(self._checkpoint)
+        self._checkpoint = self._state()
+
+        prev = self._closes[-1] if self._closes else NAN
+        rets = [c / self._closes[-k] - 1 if len(self._closes) >= k else NAN for k in RETURN_LAGS]
+        self._closes.append(c)
+
+        vols = []
+        for w in VOL_WINDOWS:
+            self._vols[w].push(rets[0])
+            vols.append(self._vols[w].std())
+
+        tr = _max(h - l, _max(abs(h - prev), abs(l - prev)))
+        self._atr.push(tr)
+
+        delta = c - prev
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-(delta if delta < 0 else 0.0))
+        gain, loss = self._gain.mean(), self._loss.mean()
+        if gain != gain or loss != loss:
+            rsi = NAN
+        elif loss == 0:
+            rsi = 100.0 if gain > 0 else NAN
+        else:
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        emas, slopes = [], []
+        for span, ewm in self._ema.items():
+            ema = ewm.push(c)
+            hist = self._ema_hist[span]
+            hist.append(ema)
+            emas.append(ema)
+            slopes.append((ema - hist[0]) / ema if len(hist) == hist.maxlen else NAN)
+
+        row = (o, h, l, c, v, *rets, *vols, tr, self._atr.mean(), delta, rsi, *emas, *slopes)
+        if replace:
+            self._rows[-1] = row
+        else:
+            self._index.append(ts)
+            self._rows.append(row)
+        self.last_ts = ts
+
+        if self.verify:
+            if replace:
+                self._bars[-1] = (o, h, l, c, v)
+            else:
+                self._bars.append((o, h, l, c, v))
+            self._verify_last()
+        return dict(zip(BAR_COLUMNS + FEATURE_COLUMNS, row))
+
+    def ingest(self, df: pd.DataFrame) -> int:
+        """
+        Feed bars from an OHLCV frame; only bars at or after the last
+        ingested timestamp are applied.
+
+        Returns:
+            Number of bars applied
+        """
+        if df is None or df.empty:
+            return 0
+        values = df.reindex(columns=BAR_COLUMNS).to_numpy(dtype="float64")
+        start = 0 if self.last_ts is None else int(df.index.searchsorted(self.last_ts, side="left"))
+        for i in range(start, len(df)):
+            self.update(df.index[i], *values[i].tolist())
+        return len(df) - start
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, verify: bool = False) -> "StreamingFeatures":
+        """Engine warmed up on a daily OHLCV history."""
+        engine = cls(verify=verify)
+        engine.ingest(df)
+        return engine
+
+    def frame(self) -> pd.DataFrame:
+        """All rows so far, as add_basic_features would return them for OHLCV input."""
+        index = pd.DatetimeIndex(self._index, name="Date")
+        return pd.DataFrame(self._rows, index=index, columns=BAR_COLUMNS + FEATURE_COLUMNS)
+
+    def compact(self):
+        """
+        Drop materialized rows except the last (which a replacing update
+        needs), e.g. before persisting; frame() then starts at that row.
+        No-op in verify mode, which re-checks against the full history.
+        """
+        if self.verify:
+            return
+        self._index = self._index[-1:]
+        self._rows = self._rows[-1:]
+
+    def _verify_last(self):
+        index = pd.DatetimeIndex(self._index)
+        batch = add_basic_features(pd.DataFrame(self._bars, index=index, columns=BAR_COLUMNS))
+        expected = batch[FEATURE_COLUMNS].iloc[-1].to_numpy(dtype="float64")
+        got = np.asarray(self._rows[-1][len(BAR_COLUMNS):], dtype="float64")
+        bad = ~np.isclose(got, expected, rtol=VERIFY_RTOL, atol=VERIFY_ATOL, equal_nan=True)
+        if bad.any():
+            cols = [f"{col}: stream={g!r} batch={e!r}" for col, g, e, b in zip(FEATURE_COLUMNS, got, expected, bad) if b]
+            raise AssertionError(f"Streaming features diverged at {self.last_ts}: {'; '.join(cols)}")
+
+    def save(self, path: Path):
+        """Persist the engine (state and rows) atomically."""
+        with atomic_write(path, "wb") as handle:
+            pickle.dump(self, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["StreamingFeatures"]:
+        """Load a saved engine (None if missing or unreadable)."""
+        try:
+            with open(path, "rb") as handle:
+                engine = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning(f"Cannot load streaming feature state {path}: {e}")
+            return None
+        return engine if isinstance(engine, cls) else None
+
+
+class StreamingBaseFeatures:
+    """
+    Incremental merge_vix_features: index and VIX engines plus the VIX
+    percentile window. Rows are emitted for dates where both sides have a
+    bar and every column is defined (the batch join + dropna).
+
+    Feed both streams date by date. Either side may lag the other by up to
+    RECENT_DAYS dates (e.g. VIX published a day late); a refreshed bar for
+    the latest emitted date replaces that row. A date that would land before
+    an already emitted row cannot be streamed and sets `out_of_order`.
+
+    Args:
+        verify: Verify both engines and every emitted row against the batch code
+    """
+
+    def __init__(self, verify: bool = False):
+        self.verify = verify
+        self.index = StreamingFeatures(verify=verify)
+        self.vix = StreamingFeatures(verify=verify)
+        self.out_of_order = False
+        self._percentile = RollingPercentile(PERCENTILE_WINDOW)
+        # side -> {date: feature row} for the last RECENT_DAYS dates, to join a lagging side
+        self._recent: Dict[str, "OrderedDict[pd.Timestamp, Dict[str, float]]"] = {
+            "index": OrderedDict(), "vix": OrderedDict()
+        }
+        self._dates: List[pd.Timestamp] = []
+        self._rows: List[Dict[str, float]] = []
+        self._index_bars: List[Tuple] = []
+        self._vix_bars: List[Tuple] = []
+
+    @staticmethod
+    def _day(ts) -> pd.Timestamp:
+        ts = pd.Timestamp(ts)
+        return (ts.tz_localize(None) if ts.tz is not None else ts).normalize()
+
+    def update(
+        self, ts, index_bar: Optional[Sequence[float]] = None, vix_bar: Optional[Sequence[float]] = None
+    ) -> Optional[Dict[str, float]]:
+        """
+        Apply the index and/or VIX bar of one date.
+
+        Args:
+            ts: Bar timestamp
+            index_bar, vix_bar: (Open, High, Low, Close, Volume) or None if that side has no bar
+
+        Returns:
+            Base row for the date, or None if the date has no complete row
+        """
+        day = self._day(ts)
+        for side, engine, bar, log in (
+            ("index", self.index, index_bar, self._index_bars),
+            ("vix", self.vix, vix_bar, self._vix_bars),
+        ):
+            if bar is None:
+                continue
+            row = engine.update(ts, *bar)
+            if row is None:
+                continue
+            recent = self._recent[side]
+            recent[day] = row
+            while len(recent) > RECENT_DAYS:
+                recent.popitem(last=False)
+            if self.verify:
+                log.append((ts, tuple(bar)))
+
+        left, right = self._recent["index"].get(day), self._recent["vix"].get(day)
+        if left is None or right is None:
+            return None
+        row = dict(left)
+        row["Close_vix"] = right["Close"]
+        for col in VIX_MERGE_COLUMNS:
+            row[col] = right[col[len("vix_"):]]
+        if any(value != value for value in row.values()):
+            return None
+
+        if self._dates and day < self._dates[-1]:
+            logger.warning(f"Base row for {day.date()} arrives after {self._dates[-1].date()}, cannot stream it")
+            self.out_of_order = True
+            return None
+        replace = bool(self._dates) and self._dates[-1] == day
+        row["vix_percentile"] = self._percentile.update(row["Close_vix"], replace=replace)
+        if replace:
+            self._rows[-1] = row
+        else:
+            self._dates.append(day)
+            self._rows.append(row)
+        if self.verify:
+            self._verify_last()
+        return row
+
+    def frame(self) -> pd.DataFrame:
+        """Emitted rows, as merge_vix_features returns them for OHLCV input."""
+        return pd.DataFrame(self._rows, index=pd.DatetimeIndex(self._dates, name="Date"))
+
+    def compact(self):
+        """Drop emitted rows except the last (see StreamingFeatures.compact)."""
+        if self.verify:
+            return
+        self.index.compact()
+        self.vix.compact()
+        self._dates = self._dates[-1:]
+        self._rows = self._rows[-1:]
+
+    def _verify_last(self):
+        def bars(log):
+            dedup = {ts: bar for ts, bar in log}
+            return pd.DataFrame(list(dedup.values()), index=pd.DatetimeIndex(list(dedup)), columns=BAR_COLUMNS)
+
+        batch = merge_vix_features(add_basic_features(bars(self._index_bars)), add_basic_features(bars(self._vix_bars)))
+        assert_frames_match(self.frame().tail(1), batch.tail(1))
+
+
+def assert_frames_match(stream: pd.DataFrame, batch: pd.DataFrame):
+    """
+    Assert a streamed frame equals its batch counterpart (same index and
+    columns, equal NaN positions, values within VERIFY_RTOL/VERIFY_ATOL).
+
+    Raises:
+        AssertionError: Describing the first mismatching columns
+    """
+    if not stream.index.equals(batch.index):
+        raise AssertionError(f"Index mismatch: stream {len(stream)} rows, batch {len(batch)} rows")
+    missing = [col for col in batch.columns if col not in stream.columns]
+    if missing:
+        raise AssertionError(f"Columns missing from stream: {missing}")
+    bad = []
+    for col in batch.columns:
+        a = stream[col].to_numpy(dtype="float64")
+        b = batch[col].to_numpy(dtype="float64")
+        if not np.isclose(a, b, rtol=VERIFY_RTOL, atol=VERIFY_ATOL, equal_nan=True).all():
+            bad.append(col)
+    if bad:
+        raise AssertionError(f"Streaming features differ from batch in {bad}")
+
+
+def verify_against_batch(index: pd.DataFrame, vix: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Stream whole histories and compare with the batch features in one pass.
+
+    Args:
+        index: Daily OHLCV
+        vix: Daily VIX OHLCV; if given, the merged base frame is checked too
+
+    Returns:
+        The streamed frame (basic features, or the base frame with vix)
+
+    Raises:
+        AssertionError: If any value differs beyond rounding
+    """
+    index = index[BAR_COLUMNS]
+    if vix is None:
+        stream = StreamingFeatures.from_frame(index).frame()
+        assert_frames_match(stream, add_basic_features(index))
+        return stream
+
+    vix = vix[BAR_COLUMNS]
+    engine = StreamingBaseFeatures()
+    index_days = index.index.normalize().tz_localize(None)
+    vix_days = vix.index.normalize().tz_localize(None)
+    index_bars = dict(zip(index_days, index.to_numpy(dtype="float64").tolist()))
+    vix_bars = dict(zip(vix_days, vix.to_numpy(dtype="float64").tolist()))
+    for day in sorted(set(index_bars) | set(vix_bars)):
+        engine.update(day, index_bars.get(day), vix_bars.get(day))
+    stream = engine.frame()
+    batch = merge_vix_features(add_basic_features(index), add_basic_features(vix))
+    assert_frames_match(stream, batch)
+    return stream
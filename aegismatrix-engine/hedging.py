@@ -0,0 +1,208 @@
+"""
+Hedged multi-source fetching.
+
+The primary source starts immediately; if it has not produced a valid result
+after the hedge delay (or fails outright) the next source is started too. The
+first result that passes validation wins and the rest are abandoned. Per-source
+latency/win statistics drive an adaptive hedge delay. A fallback source whose
+host is cooling down (see rate_limiter) is held back rather than started.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import HEDGED_FETCH, HEDGE_DELAY, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY
+
+logger = logging.getLogger(__name__)
+
+class HedgeStats:
+    """Per (group, source) calls, wins, failures and recent successful latencies."""
+
+    def __init__(self, window: int = 50):
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(lambda: {"calls": 0, "wins": 0, "failures": 0})
+
+    def record(self, group: str, source: str, elapsed: float, ok: bool):
+        with self._lock:
+            counts = self._counts[(group, source)]
+            counts["calls"] += 1
+            if ok:
+                self._latency[(group, source)].append(elapsed)
+            else:
+                counts["failures"] += 1
+
+    def record_win(self, group: str, source: str):
+        with self._lock:
+            self._counts[(group, source)]["wins"] += 1
+
+    def hedge_delay(self, group: str, source: str) -> float:
+        """
+        Delay before hedging a source: its p90 successful latency, clamped to
+        [HEDGE_MIN_DELAY, HEDGE_MAX_DELAY]. Falls back to HEDGE_DELAY until
+        a few samples exist.
+        """
+        with self._lock:
+            samples = list(self._latency[(group, source)])
+        if len(samples) < 5:
+            return HEDGE_DELAY
+        return float(np.clip(np.percentile(samples, 90), HEDGE_MIN_DELAY, HEDGE_MAX_DELAY))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Stats keyed by "group/source" for logging."""
+        with self._lock:
+            out = {}
+            for (group, source), counts in self._counts.items():
+                samples = self._latency[(group, source)]
+                out[f"{group}/{source}"] = {
+                    **counts,
+                    "mean_latency": float(np.mean(samples)) if samples else None,
+                }
+            return out
+
+
+HEDGE_STATS = HedgeStats()
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _record_late(group: str, name: str, validate: Callable[[Any], bool]):
+    """Done-callback recording the outcome of an abandoned source."""
+    def callback(future):
+        try:
+            result, elapsed = future.result()
+            HEDGE_STATS.record(group, name, elapsed, result is not None and validate(result))
+        except Exception:
+            HEDGE_STATS.record(group, name, 0.0, False)
+    return callback
+
+
+def hedged_fetch(
+    group: str,
+    sources: List[Tuple[str, Callable[[], Any]]],
+    validate: Callable[[Any], bool],
+    hedged: bool = HEDGED_FETCH,
+    blocked: Optional[Callable[[str], bool]] = None,
+) -> Optional[Any]:
+    """
+    Run fetch sources in order, hedging slow ones.
+
+    Args:
+        group: Stats bucket (e.g. "daily", "intraday")
+        sources: (name, zero-arg callable) pairs in preference order
+        validate: Returns True if a result is acceptable
+        hedged: If False, try sources strictly one after another
+        blocked: Called with a fallback source's name before starting it;
+            True skips that source (e.g. its host is in a rate-limit cool-down)
+
+    Returns:
+        First valid result, or None if every source failed
+    """
+    def held(idx: int) -> bool:
+        name = sources[idx][0]
+        if idx > 0 and blocked is not None and blocked(name):
+            logger.info(f"{group}: not starting '{name}', its host is cooling down")
+            return True
+        return False
+
+    if not hedged:
+        for idx, (name, fn) in enumerate(sources):
+            if held(idx):
+                continue
+            try:
+                result, elapsed = _timed(fn)
+            except Exception as e:
+                logger.warning(f"{group} source '{name}' failed: {e}")
+                HEDGE_STATS.record(group, name, 0.0, False)
+                continue
+            ok = result is not None and validate(result)
+            HEDGE_STATS.record(group, name, elapsed, ok)
+            if ok:
+                HEDGE_STATS.record_win(group, name)
+                return result
+        return None
+
+    # One worker per source, so a hedge never queues behind other calls' primaries;
+    # abandoned sources finish in the background after shutdown(wait=False)
+    executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="hedge")
+    try:
+        return _hedged(group, sources, validate, held, executor)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _hedged(
+    group: str,
+    sources: List[Tuple[str, Callable[[], Any]]],
+    validate: Callable[[Any], bool],
+    held: Callable[[int], bool],
+    executor: ThreadPoolExecutor,
+) -> Optional[Any]:
+    pending = {}
+    next_idx = 0
+
+    def launch() -> Optional[float]:
+        """Start the next source that is not held back; returns its hedge deadline."""
+        nonlocal next_idx
+        while next_idx < len(sources) and held(next_idx):
+            next_idx += 1
+        if next_idx == len(sources):
+            return None
+        name, fn = sources[next_idx]
+        next_idx += 1
+        future = executor.submit(_timed, fn)
+        pending[future] = name
+        return time.perf_counter() + HEDGE_STATS.hedge_delay(group, name)
+
+    hedge_at = launch()
+
+    while pending:
+        timeout = max(0.0, hedge_at - time.perf_counter()) if next_idx < len(sources) else None
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done:
+            # Hedge delay elapsed with nothing back yet: start the next source alongside
+            slow = list(pending.values())
+            hedge_at = launch()
+            if hedge_at is not None:
+                logger.info(f"{group}: {slow} slow, hedging with '{sources[next_idx - 1][0]}'")
+            continue
+
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result, elapsed = future.result()
+                ok = result is not None and validate(result)
+            except Exception as e:
+                logger.warning(f"{group} source '{name}' failed: {e}")
+                result, elapsed, ok = None, 0.0, False
+            HEDGE_STATS.record(group, name, elapsed, ok)
+            if ok:
+                HEDGE_STATS.record_win(group, name)
+                for other, other_name in pending.items():
+                    # Running ones cannot be interrupted; their latency is still recorded
+                    if not other.cancel():
+                        other.add_done_callback(_record_late(group, other_name, validate))
+                if pending:
+                    logger.info(f"{group}: '{name}' won after {elapsed:.2f}s, abandoning {list(pending.values())}")
+                return result
+
+        # A source failed: start the next one right away instead of waiting out the delay
+        if next_idx < len(sources):
+            hedge_at = launch()
+
+    return None
@@ -0,0 +1,177 @@
+"""
+Process-wide pooled HTTP client for Yahoo and NSE requests.
+One requests.Session with per-host keep-alive pools, so repeated calls
+skip DNS/TCP/TLS setup. Response bodies are gzip/deflate decoded, plus
+brotli when the brotli package is installed.
+
+Every request passes through the per-host rate limiter (rate_limiter), which
+also learns from 429/Retry-After responses and connection errors.
+
+In record/replay mode (HTTP_MODE) responses are captured to or served from
+cassettes on disk, see http_replay.
+"""
+
+import logging
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_MODE
+from http_replay import CassetteStore, ReplayFaults
+from rate_limiter import RATE_LIMITER, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Every encoding urllib3 can decode in this environment (includes "br" if brotli is available)
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+
+class HttpClient:
+    """
+    Thin wrapper around a shared requests.Session.
+
+    Args:
+        pool_connections: Number of per-host pools kept alive
+        pool_maxsize: Max keep-alive connections per host
+        timeout: Default request timeout in seconds
+        mode: "live", "record" or "replay"
+        cassettes: Cassette store for record/replay
+        faults: Injected latency/429/timeouts for replay
+        limiter: Per-host rate limiter (shared process-wide by default)
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        timeout: float = HTTP_TIMEOUT,
+        mode: str = HTTP_MODE,
+        cassettes: Optional[CassetteStore] = None,
+        faults: Optional[ReplayFaults] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Unknown HTTP mode: {mode}")
+        self.timeout = timeout
+        self.mode = mode
+        self.cassettes = cassettes or CassetteStore()
+        self.faults = faults or ReplayFaults()
+        self.limiter = limiter or RATE_LIMITER
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        })
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self._requests = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        host = requests.utils.urlparse(url).hostname
+        with self._lock:
+            self._requests[host] += 1
+        
+        limiter = self.limiter.host(host)
+        limiter.acquire()
+        try:
+            response = self._send(method, url, **kwargs)
+        except Exception:
+            # Any failure counts, or a half-open probe would stay in flight forever
+            limiter.on_error()
+            raise
+        limiter.on_response(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self.mode == "live":
+            return self.session.request(method, url, **kwargs)
+        
+        # Resolve params into the URL so cassettes are keyed on the full request
+        full_url = requests.Request(method, url, params=kwargs.pop("params", None)).prepare().url
+        if self.mode == "replay":
+            return self._replay(method, full_url, kwargs["timeout"])
+        
+        response = self.session.request(method, full_url, **kwargs)
+        self.cassettes.save(method, full_url, response)
+        return response
+
+    def _replay(self, method: str, url: str, timeout: float) -> requests.Response:
+        injected = self.faults.apply(method, url, timeout)
+        if injected is not None:
+            return injected
+        response = self.cassettes.load(method, url)
+        if response is None:
+            raise requests.exceptions.ConnectionError(f"No cassette recorded for {method} {url}")
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Connection-reuse statistics per host.
+
+        Returns:
+            {host: {"requests", "connections", "reused"}}; "connections" counts
+            TCP/TLS handshakes, so reused = requests - connections
+        """
+        stats = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = stats.setdefault(pool.host, {"requests": 0, "connections": 0, "reused": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+        for host, entry in stats.items():
+            entry["requests"] = max(entry["requests"], self._requests.get(host, 0))
+            entry["reused"] = max(0, entry["requests"] - entry["connections"])
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HttpClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_http_client(client: HttpClient) -> HttpClient:
+    """Replace the process-wide client (e.g. with a replay client in benchmarks)."""
+    global _client
+    with _client_lock:
+        _client = client
+        return _client
+
+
+def log_connection_stats():
+    """Log per-host connection reuse (call at the end of a run)."""
+    if _client is None:
+        return
+    for host, s in _client.stats().items():
+        logger.info(f"HTTP {host}: {s['requests']} requests, {s['connections']} connections, {s['reused']} reused")
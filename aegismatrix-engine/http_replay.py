@@ -0,0 +1,144 @@
+"""
+Record/replay support for the shared HTTP client.
+
+record: every live response is written to a cassette file on disk.
+replay: responses are served from cassettes without touching the network,
+        with optional injected latency, 429s and timeouts, so retry/backoff
+        and parse throughput can be measured reproducibly offline.
+
+Select the mode with AEGIS_HTTP_MODE=live|record|replay (see config.py).
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Iterable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import (
+    HTTP_CASSETTE_DIR,
+    HTTP_CASSETTE_IGNORE_PARAMS,
+    HTTP_REPLAY_LATENCY,
+    HTTP_REPLAY_429_RATE,
+    HTTP_REPLAY_TIMEOUT_RATE,
+    RANDOM_SEED,
+)
+from atomic_io import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# Headers that describe the wire encoding, not the (already decoded) body we store
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+def normalize_url(url: str, ignore_params: Iterable[str] = HTTP_CASSETTE_IGNORE_PARAMS) -> str:
+    """
+    Canonical URL for cassette lookup: sorted query, volatile params removed
+    (e.g. Yahoo period1/period2, which change on every run).
+    """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignore_params)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class CassetteStore:
+    """One JSON file per (method, normalized URL)."""
+
+    def __init__(self, root: Path = HTTP_CASSETTE_DIR):
+        self.root = Path(root)
+
+    def path(self, method: str, url: str) -> Path:
+        key = f"{method.upper()} {normalize_url(url)}"
+        host = urlsplit(url).hostname or "unknown"
+        return self.root / host / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.json"
+
+    def save(self, method: str, url: str, response: requests.Response) -> Path:
+        path = self.path(method, url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "method": method.upper(),
+            "url": normalize_url(url),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS},
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "recorded_at": time.time(),
+        }
+        atomic_write_text(path, json.dumps(payload))
+        return path
+
+    def load(self, method: str, url: str) -> Optional[requests.Response]:
+        path = self.path(method, url)
+        if not path.exists():
+            return None
+        payload = json.loads(path.read_text())
+        response = requests.Response()
+        response.status_code = payload["status"]
+        response.headers = CaseInsensitiveDict(payload["headers"])
+        response._content = base64.b64decode(payload["body"])
+        response.encoding = "utf-8"
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+
+class ReplayFaults:
+    """
+    Deterministic fault injection for replay mode.
+
+    Args:
+        latency: Seconds added to every replayed response
+        rate_429: Fraction of requests answered with HTTP 429
+        rate_timeout: Fraction of requests that raise requests.Timeout
+        timeout_delay: Seconds an injected timeout blocks (default: the request timeout)
+        seed: RNG seed so a benchmark run is reproducible
+    """
+
+    def __init__(
+        self,
+        latency: float = HTTP_REPLAY_LATENCY,
+        rate_429: float = HTTP_REPLAY_429_RATE,
+        rate_timeout: float = HTTP_REPLAY_TIMEOUT_RATE,
+        timeout_delay: Optional[float] = None,
+        seed: int = RANDOM_SEED,
+    ):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rate_timeout = rate_timeout
+        self.timeout_delay = timeout_delay
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self, method: str, url: str, timeout: Optional[float]) -> Optional[requests.Response]:
+        """
+        Sleep for the injected latency and maybe fail.
+
+        Returns:
+            A 429 response to serve instead of the cassette, or None
+        """
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_timeout:
+            time.sleep(self.timeout_delay if self.timeout_delay is not None else (timeout or 0))
+            raise requests.exceptions.Timeout(f"Injected timeout for {url}")
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.rate_timeout + self.rate_429:
+            response = requests.Response()
+            response.status_code = 429
+            response.headers = CaseInsensitiveDict({"Retry-After": "1"})
+            response._content = b""
+            response.url = url
+            response.request = requests.Request(method, url).prepare()
+            return response
+        return None
@@ -5,7 +5,7 @@ Generates aegismatrix.json from market data + models.
 
 import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import sys
 import pandas as pd
@@ -14,18 +14,26 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import (
     JSON_OUTPUT_PATH,
+    ACTIVE_INDICES,
+    PRIMARY_INDEX,
     DIRECTION_HORIZONS,
     SELLER_EXPIRY_HORIZON_DAYS,
+    VIX_SYMBOL,
+    GAMMA_HISTORY_DAYS,
 )
-from data_fetcher import get_market_snapshots, get_intraday_history
-from features.daily_features import (
-    build_direction_features,
-    build_seller_features,
-    build_buyer_features,
-)
+from data_fetcher import acquire_universe_data, get_intraday_sessions
+from http_client import log_connection_stats
+from rate_limiter import log_rate_limit_stats
+from atomic_io import atomic_write
+from data_quality import DataQualityError, check_ohlcv, raise_on_fail
+from model_registry import current_generation, modeled_indices
+from hedging import HEDGE_STATS
+from feature_store import FEATURE_STORE
+from features.pipeline import FeaturePipeline
 from features.intraday_features import (
     build_today_direction_features,
     build_gamma_window_features,
+    build_gamma_window_history,
 )
 from direction.model import (
     predict_direction_horizons,
@@ -210,12 +218,13 @@ def build_buyer_block(buy_feats, gamma_feats, intraday_df, nifty, models) -> dic
     }
 
 
-def _update_market_block_with_live_price(market_block: dict) -> dict:
+def _update_market_block_with_live_price(market_block: dict, live_price: float = None) -> dict:
     """
     Try to update market block with live spot price.
     
     Args:
         market_block: Current market block dict
+        live_price: Already-fetched live spot; fetched here if not given
         
     Returns:
         Updated market block with live price if available
@@ -223,7 +232,8 @@ def _update_market_block_with_live_price(market_block: dict) -> dict:
     from data_fetcher import get_live_price
     
     try:
-        live_price = get_live_price("^NSEI")
+        if live_price is None:
+            live_price = get_live_price("^NSEI")
         if live_price and live_price > 0:
             # Calculate changes based on live price
             prev_close = market_block.get("spot", 19800) - market_block.get("spot_change", 0)
@@ -253,9 +263,139 @@ def _get_horizon_label(h_str: str) -> str:
     return mapping.get(h_str, h_str)
 
 
-def main():
-    """Main inference pipeline."""
-    logger.info("=== AegisMatrix Inference Start ===")
+def output_path_for(index: str) -> Path:
+    """
+    JSON output path for an index: the primary index keeps JSON_OUTPUT_PATH,
+    others are written alongside it as aegismatrix_<index>.json.
+    """
+    if index == PRIMARY_INDEX:
+        return JSON_OUTPUT_PATH
+    return JSON_OUTPUT_PATH.with_name(f"{JSON_OUTPUT_PATH.stem}_{index.lower()}.json")
+
+
+def mark_degraded(output_path: Path, reports) -> bool:
+    """
+    Keep the last published payload but flag it as degraded, with the
+    failed quality reports, so the dashboard can show it is not current.
+    
+    Returns:
+        True if a previous payload existed and was marked
+    """
+    try:
+        payload = json.loads(output_path.read_text())
+    except (OSError, ValueError):
+        logger.error(f"No previous payload at {output_path} to fall back to")
+        return False
+    payload["degraded"] = True
+    payload["data_quality"] = [report.to_dict() for report in reports]
+    with atomic_write(output_path) as f:
+        json.dump(payload, f, indent=2)
+    logger.warning(f"Kept last good payload from {payload.get('generated_at')} at {output_path}, marked degraded")
+    return True
+
+
+def build_gamma_windows(symbol: str, intraday: pd.DataFrame) -> list[dict]:
+    """
+    Gamma-window scores averaged over the archived sessions of the last
+    GAMMA_HISTORY_DAYS, falling back to the current pull alone.
+    
+    Args:
+        symbol: Ticker symbol of the index
+        intraday: Gated intraday frame from this run
+        
+    Returns:
+        List of {"window": "HH:MM-HH:MM", "score": 0-1}
+    """
+    start = datetime.now(timezone.utc).date() - timedelta(days=GAMMA_HISTORY_DAYS)
+    history = build_gamma_window_history(get_intraday_sessions(symbol, start=start))
+    if not history:
+        return build_gamma_window_features(intraday)
+    return [{"window": w["window"], "score": w["score"]} for w in history]
+
+
+def build_payload(snapshot, dir_models, sel_models, buy_models) -> dict:
+    """
+    Run features and all three engines for one index snapshot.
+    
+    Args:
+        snapshot: MarketSnapshot from the shared fetch stage
+        dir_models, sel_models, buy_models: Loaded model tuples
+        
+    Returns:
+        Validated payload dict
+        
+    Raises:
+        DataQualityError: A daily or intraday frame failed the quality gate
+    """
+    nifty, vix, intraday = snapshot.daily, snapshot.vix, snapshot.intraday
+    logger.info(f"Data fetched: {snapshot.index} {len(nifty)} rows, VIX {len(vix)} rows, intraday {len(intraday)} rows")
+    
+    # Quality gate: drop bad bars explicitly before they reach the features;
+    # a frame that fails outright stops this index (see main). No intraday at
+    # all (fetch failed) is handled downstream as before, bad intraday is not.
+    nifty, nifty_report = check_ohlcv(nifty, snapshot.symbol, "daily", repair=True)
+    vix, vix_report = check_ohlcv(vix, VIX_SYMBOL, "daily", repair=True)
+    intraday, intraday_report = check_ohlcv(intraday, snapshot.symbol, "intraday", repair=True)
+    gated = [nifty_report, vix_report]
+    if intraday_report.bars:
+        gated.append(intraday_report)
+    else:
+        intraday_report.log()
+    raise_on_fail(*gated)
+    
+    # 2. Build features
+    logger.info(f"Building {snapshot.index} features...")
+    # Base frame built once; seller/buyer layer their columns on top of it
+    pipeline = FeaturePipeline(nifty, vix, name=snapshot.index, store=FEATURE_STORE)
+    dir_feats = pipeline.direction()
+    sel_feats = pipeline.seller()
+    buy_feats = pipeline.buyer()
+    pipeline.log_timings()
+    
+    previous_close = float(nifty["Close"].iloc[-2]) if len(nifty) >= 2 else 19800
+    today_intraday_feats = build_today_direction_features(intraday, previous_close)
+    gamma_feats = build_gamma_windows(snapshot.symbol, intraday)
+    
+    logger.info("Features built successfully")
+    
+    # 3. Build blocks
+    logger.info("Computing predictions...")
+    market_block = build_market_block(nifty, vix, intraday)
+    
+    # Try to enhance with live price if available
+    if snapshot.live_spot is not None:
+        market_block = _update_market_block_with_live_price(market_block, snapshot.live_spot)
+    
+    direction_block = build_direction_block(dir_feats, today_intraday_feats, gamma_feats, nifty, vix, dir_models)
+    seller_block = build_seller_block(sel_feats, nifty, sel_models)
+    buyer_block = build_buyer_block(buy_feats, gamma_feats, intraday, nifty, buy_models)
+    
+    # 4. Assemble payload
+    logger.info("Assembling payload...")
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "market": market_block,
+        "direction": direction_block,
+        "seller": seller_block,
+        "buyer": buyer_block
+    }
+    
+    # 5. Validate
+    logger.info("Validating payload...")
+    validate_payload(payload)
+    return payload
+
+
+def main(indices=None):
+    """
+    Main inference pipeline.
+    
+    Args:
+        indices: Keys of INDEX_UNIVERSE to run (default: ACTIVE_INDICES);
+            each must have trained models (MODELED_INDICES)
+    """
+    indices = modeled_indices(list(indices or ACTIVE_INDICES))
+    logger.info(f"=== AegisMatrix Inference Start ({', '.join(indices)}) ===")
     
     # Load Models
     logger.info("Loading trained models...")
@@ -263,94 +403,41 @@ def main():
     import buyer.model
     import seller.model
     
-    dir_models = direction.model.load_models()
-    buy_models = buyer.model.load_models()
-    sel_models = seller.model.load_models()
+    # Resolve the published generation once so all engines load a consistent set
+    model_dir = current_generation()
+    logger.info(f"Model generation: {model_dir}")
+    dir_models = direction.model.load_models(model_dir)
+    buy_models = buyer.model.load_models(model_dir)
+    sel_models = seller.model.load_models(model_dir)
     
     if dir_models[0] is None: logger.warning("Direction models not found - using heuristics")
     if buy_models[0] is None: logger.warning("Buyer models not found - using heuristics")
     if sel_models[0] is None: logger.warning("Seller models not found - using heuristics")
     
     try:
-        # 1. Fetch data
+        # 1. Fetch data for every index in one concurrent stage
         logger.info("Fetching market data...")
-        nifty, vix = get_market_snapshots()
-        intraday = get_intraday_history("^NSEI")
-        logger.info(f"Data fetched: NIFTY {len(nifty)} rows, VIX {len(vix)} rows, intraday {len(intraday)} rows")
-        
-        # Check if we have data
-        if len(nifty) < 2 or len(vix) < 2:
-            logger.error("Insufficient market data fetched. Check internet connection or yfinance availability.")
-            logger.info("For testing, using placeholder data...")
-            # Create minimal test data
-            import pandas as pd
-            nifty = pd.DataFrame({
-                'Open': [19700, 19750, 19800],
-                'High': [19750, 19800, 19850],
-                'Low': [19650, 19700, 19750],
-                'Close': [19780, 19820, 19850],
-                'Volume': [1000000, 1100000, 1200000]
-            })
-            vix = pd.DataFrame({
-                'Open': [14.5, 14.8, 15.0],
-                'High': [15.0, 15.2, 15.5],
-                'Low': [14.3, 14.6, 14.9],
-                'Close': [14.8, 15.0, 15.2],
-                'Volume': [100000, 110000, 120000]
-            })
-            intraday = pd.DataFrame({
-                'Open': [19800, 19810, 19820],
-                'High': [19820, 19830, 19840],
-                'Low': [19790, 19800, 19810],
-                'Close': [19815, 19825, 19835],
-                'Volume': [50000, 55000, 60000]
-            })
-        
-        # 2. Build features
-        logger.info("Building features...")
-        dir_feats = build_direction_features(nifty, vix)
-        sel_feats = build_seller_features(nifty, vix)
-        buy_feats = build_buyer_features(nifty, vix)
-        
-        previous_close = float(nifty["Close"].iloc[-2]) if len(nifty) >= 2 else 19800
-        today_intraday_feats = build_today_direction_features(intraday, previous_close)
-        gamma_feats = build_gamma_window_features(intraday)
-        
-        logger.info("Features built successfully")
-        
-        # 3. Build blocks
-        logger.info("Computing predictions...")
-        market_block = build_market_block(nifty, vix, intraday)
+        snapshots = acquire_universe_data(indices)
         
-        # Try to enhance with live price if available
-        market_block = _update_market_block_with_live_price(market_block)
-        
-        direction_block = build_direction_block(dir_feats, today_intraday_feats, gamma_feats, nifty, vix, dir_models)
-        seller_block = build_seller_block(sel_feats, nifty, sel_models)
-        buyer_block = build_buyer_block(buy_feats, gamma_feats, intraday, nifty, buy_models)
-        
-        # 4. Assemble payload
-        logger.info("Assembling payload...")
-        payload = {
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "market": market_block,
-            "direction": direction_block,
-            "seller": seller_block,
-            "buyer": buyer_block
-        }
-        
-        # 5. Validate
-        logger.info("Validating payload...")
-        validate_payload(payload)
-        
-        # 6. Write
-        logger.info(f"Writing to {JSON_OUTPUT_PATH}...")
-        JSON_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(JSON_OUTPUT_PATH, "w") as f:
-            json.dump(payload, f, indent=2)
+        for index in indices:
+            output_path = output_path_for(index)
+            try:
+                payload = build_payload(snapshots[index], dir_models, sel_models, buy_models)
+            except DataQualityError as e:
+                logger.error(f"Skipping {index}: {e}")
+                mark_degraded(output_path, e.reports)
+                continue
+            
+            # 6. Write
+            logger.info(f"Writing to {output_path}...")
+            with atomic_write(output_path) as f:
+                json.dump(payload, f, indent=2)
+            logger.info(f"Output written to: {output_path}")
         
         logger.info("=== AegisMatrix Inference Complete ===")
-        logger.info(f"Output written to: {JSON_OUTPUT_PATH}")
+        log_connection_stats()
+        log_rate_limit_stats()
+        logger.info(f"Fetch source stats: {HEDGE_STATS.snapshot()}")
         
     except Exception as e:
         logger.error(f"Inference failed: {e}", exc_info=True)
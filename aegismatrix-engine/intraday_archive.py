@@ -0,0 +1,129 @@
+"""
+Persistent intraday archive, one partition per trading session.
+
+Every rolling INTRADAY_PERIOD pull is merged into per-session files
+(deduplicated, newest bar wins; the off-grid live quote Yahoo appends is
+left out, its slot's bar settles in a later pull), so history grows past the 5-day window
+Yahoo serves and any range of sessions can be read back without a download.
+
+Layout: DATA_DIR/intraday_archive/<SYMBOL>/<YYYY-MM-DD>_<interval>.<ext>
+using the configured cache backend for the file format.
+"""
+
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR, INTRADAY_INTERVAL
+from cache_store import get_cache_store, _safe_symbol
+from atomic_io import write_lock
+from bar_aggregator import interval_minutes, on_grid
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = DATA_DIR / "intraday_archive"
+
+
+def _to_utc_naive(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Store bars the way the direct API returns them: naive UTC."""
+    if index.tz is not None:
+        return index.tz_convert("UTC").tz_localize(None)
+    return index
+
+
+def session_dates(index: pd.DatetimeIndex) -> pd.Index:
+    """IST session date of each bar in a naive-UTC index."""
+    return pd.Index(index.tz_localize("UTC").tz_convert("Asia/Kolkata").date)
+
+
+class IntradayArchive:
+    """Session-partitioned intraday bars per symbol and interval."""
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+
+    def _store(self, symbol: str):
+        return get_cache_store(root=self.root / _safe_symbol(symbol))
+
+    def merge(self, symbol: str, df: pd.DataFrame, interval: str = INTRADAY_INTERVAL) -> List[date]:
+        """
+        Merge freshly pulled bars into their session partitions.
+
+        Returns:
+            Session dates that were written
+        """
+        if df is None or df.empty:
+            return []
+        df = df.copy()
+        df.index = _to_utc_naive(pd.DatetimeIndex(df.index))
+        minutes = interval_minutes(interval)
+        if minutes is not None:
+            aligned = on_grid(df.index, minutes)
+            if not aligned.all():
+                logger.debug(f"Not archiving {int((~aligned).sum())} off-grid {interval} bars for {symbol}")
+                df = df[aligned]
+                if df.empty:
+                    return []
+        store = self._store(symbol)
+        written = []
+
+        # Read-merge-write per session; overlapping runs serialize on the symbol lock
+        with write_lock(store.root):
+            for session, bars in df.groupby(session_dates(df.index)):
+                key = session.isoformat()
+                if store.exists(key, interval):
+                    existing = store.load(key, interval)
+                    bars = pd.concat([existing, bars[existing.columns.intersection(bars.columns)]])
+                    bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+                store.save(key, interval, bars)
+                written.append(session)
+
+        logger.info(f"Archived {len(df)} intraday bars for {symbol} into {len(written)} sessions")
+        return written
+
+    def sessions(self, symbol: str, interval: str = INTRADAY_INTERVAL) -> List[date]:
+        """Archived session dates, oldest first."""
+        base = self.root / _safe_symbol(symbol)
+        if not base.exists():
+            return []
+        suffix = f"_{interval}"
+        found = set()
+        for entry in base.rglob(f"*{suffix}*"):
+            stem = entry.name.split(suffix)[0]
+            try:
+                found.add(date.fromisoformat(stem))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def load(
+        self,
+        symbol: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        interval: str = INTRADAY_INTERVAL,
+    ) -> pd.DataFrame:
+        """
+        Read bars for sessions in [start, end] (inclusive; None = unbounded).
+
+        Returns:
+            Concatenated OHLCV frame (naive UTC index), empty if nothing archived
+        """
+        store = self._store(symbol)
+        frames = [
+            store.load(session.isoformat(), interval)
+            for session in self.sessions(symbol, interval)
+            if (start is None or session >= start) and (end is None or session <= end)
+        ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames).sort_index()
+
+
+ARCHIVE = IntradayArchive()
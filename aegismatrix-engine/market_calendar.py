@@ -0,0 +1,161 @@
+"""
+NSE trading calendar: sessions, holidays and pre-open/close times (IST).
+Used by the data layer to decide whether new bars can exist at all
+before going to the network.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# India has no DST, so a fixed offset is exact
+IST = timezone(timedelta(hours=5, minutes=30))
+
+PRE_OPEN_START = time(9, 0)
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+# Yahoo/NSE settle the final daily bar a little after the close
+SETTLE_BUFFER = timedelta(minutes=15)
+
+# NSE equity/F&O trading holidays (weekdays only; weekends are always closed).
+# Source: NSE holiday circulars - extend each December for the next year.
+NSE_HOLIDAYS = {
+    # 2025
+    date(2025, 2, 26), date(2025, 3, 14), date(2025, 3, 31), date(2025, 4, 10),
+    date(2025, 4, 14), date(2025, 4, 18), date(2025, 5, 1), date(2025, 8, 15),
+    date(2025, 8, 27), date(2025, 10, 2), date(2025, 10, 21), date(2025, 10, 22),
+    date(2025, 11, 5), date(2025, 12, 25),
+    # 2026
+    date(2026, 1, 26), date(2026, 3, 3), date(2026, 3, 26), date(2026, 3, 31),
+    date(2026, 4, 3), date(2026, 4, 14), date(2026, 5, 1), date(2026, 5, 28),
+    date(2026, 6, 26), date(2026, 9, 14), date(2026, 10, 2), date(2026, 10, 20),
+    date(2026, 11, 10), date(2026, 11, 24), date(2026, 12, 25),
+}
+HOLIDAYS_LAST_YEAR = max(d.year for d in NSE_HOLIDAYS)
+_uncovered_years_warned: Set[int] = set()
+
+
+def now_ist() -> datetime:
+    """Current time in IST (timezone-aware)."""
+    return datetime.now(IST)
+
+
+def to_ist(dt: datetime) -> datetime:
+    """Convert a datetime to IST; naive values are treated as system local time."""
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.astimezone(IST)
+
+
+def is_trading_day(d: date) -> bool:
+    """
+    True if NSE holds a regular session on this date. Past the last year in
+    NSE_HOLIDAYS only weekends are known to be closed (warned once per year).
+    """
+    if d.year > HOLIDAYS_LAST_YEAR and d.year not in _uncovered_years_warned:
+        _uncovered_years_warned.add(d.year)
+        logger.warning(
+            f"NSE_HOLIDAYS ends in {HOLIDAYS_LAST_YEAR}; treating every weekday of {d.year} as a "
+            "trading day (add that year's holidays to market_calendar.py)"
+        )
+    return d.weekday() < 5 and d not in NSE_HOLIDAYS
+
+
+def previous_trading_day(d: date) -> date:
+    """Most recent trading day strictly before d."""
+    d -= timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
+
+
+def next_trading_day(d: date) -> date:
+    """First trading day strictly after d."""
+    d += timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+
+def session_bounds(d: date) -> Tuple[datetime, datetime]:
+    """(open, close) of the session on date d, in IST."""
+    return (
+        datetime.combine(d, MARKET_OPEN, tzinfo=IST),
+        datetime.combine(d, MARKET_CLOSE, tzinfo=IST),
+    )
+
+
+def market_phase(dt: Optional[datetime] = None) -> str:
+    """
+    Market phase at dt.
+
+    Returns:
+        "CLOSED", "PRE_OPEN", "OPEN" or "POST_CLOSE"
+    """
+    dt = to_ist(dt) if dt is not None else now_ist()
+    if not is_trading_day(dt.date()):
+        return "CLOSED"
+    t = dt.timetz().replace(tzinfo=None)
+    if t < PRE_OPEN_START:
+        return "CLOSED"
+    if t < MARKET_OPEN:
+        return "PRE_OPEN"
+    if t < MARKET_CLOSE:
+        return "OPEN"
+    return "POST_CLOSE"
+
+
+def is_market_open(dt: Optional[datetime] = None) -> bool:
+    return market_phase(dt) == "OPEN"
+
+
+def latest_session_date(dt: Optional[datetime] = None) -> date:
+    """
+    Date of the most recent session that has started by dt
+    (today once the market opens, otherwise the previous trading day).
+    """
+    dt = to_ist(dt) if dt is not None else now_ist()
+    d = dt.date()
+    if is_trading_day(d) and dt >= session_bounds(d)[0]:
+        return d
+    return previous_trading_day(d)
+
+
+def daily_cache_is_fresh(last_bar_date: date, cache_mtime: datetime, now: Optional[datetime] = None) -> bool:
+    """
+    Decide whether a daily cache can possibly be missing data.
+
+    Fresh when it already holds the latest session, unless that bar was
+    written before the session closed and the close has now passed (the
+    partial bar needs settling).
+
+    Args:
+        last_bar_date: Date of the last cached daily bar
+        cache_mtime: When the cache was last written
+        now: Reference time (default: now)
+    """
+    now = to_ist(now) if now is not None else now_ist()
+    expected = latest_session_date(now)
+    if last_bar_date < expected:
+        return False
+    settled_at = session_bounds(expected)[1] + SETTLE_BUFFER
+    if now >= settled_at and to_ist(cache_mtime) < settled_at:
+        return False
+    return True
+
+
+def intraday_cache_is_fresh(cache_mtime: datetime, max_age: timedelta, now: Optional[datetime] = None) -> bool:
+    """
+    Decide whether new intraday bars can exist since the cache was written.
+
+    While the market is open the cache is fresh for `max_age`; outside market
+    hours it is fresh if it was written after the latest session closed.
+    """
+    now = to_ist(now) if now is not None else now_ist()
+    cache_mtime = to_ist(cache_mtime)
+    if is_market_open(now):
+        return now - cache_mtime < max_age
+    close = session_bounds(latest_session_date(now))[1]
+    return cache_mtime >= close
@@ -0,0 +1,155 @@
+"""
+Versioned model generations.
+
+Trained artifacts live in MODEL_DIR/generations/<id>/ and the CURRENT file
+names the generation inference should use. A training run stages a new
+generation (hard-linking the files of the current one, so engines trained
+separately still publish a complete set), writes its own artifacts there,
+and publishes by atomically rewriting CURRENT. Inference resolves CURRENT
+once and loads every engine from that directory, so it never mixes files
+from two training runs and never sees a half-written model.
+
+train_all.py stages one generation for all three engines and hands its
+directory to each training script through STAGING_ENV, so a full run
+publishes exactly once; a script run on its own stages its own generation.
+
+Without a CURRENT file (older checkouts) models are read from MODEL_DIR
+directly.
+"""
+
+import logging
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import MODEL_DIR, MODEL_KEEP_GENERATIONS, MODELED_INDICES
+from atomic_io import atomic_write_text, write_lock
+
+logger = logging.getLogger(__name__)
+
+GENERATIONS_DIR = MODEL_DIR / "generations"
+CURRENT_POINTER = MODEL_DIR / "CURRENT"
+MODEL_SUFFIXES = {".pkl", ".pt"}
+STAGING_ENV = "AEGIS_MODEL_STAGING_DIR"  # set by train_all.py for its training scripts
+
+
+def current_generation() -> Path:
+    """
+    Directory of the published model generation.
+
+    Returns:
+        MODEL_DIR/generations/<id>, or MODEL_DIR itself if nothing is published
+    """
+    try:
+        generation = CURRENT_POINTER.read_text().strip()
+    except OSError:
+        return MODEL_DIR
+    path = GENERATIONS_DIR / generation
+    if not generation or not path.is_dir():
+        logger.warning(f"Model pointer names missing generation '{generation}', using {MODEL_DIR}")
+        return MODEL_DIR
+    return path
+
+
+def modeled_indices(indices: List[str]) -> List[str]:
+    """
+    Check that every entry of `indices` has trained models (MODELED_INDICES).
+
+    The models are NIFTY-trained and use NIFTY constants, so running them on
+    another index would publish NIFTY-calibrated numbers.
+
+    Returns:
+        `indices` unchanged
+
+    Raises:
+        ValueError: An index has no trained models, or none was given
+    """
+    unmodeled = [i for i in indices if i not in MODELED_INDICES]
+    if unmodeled or not indices:
+        raise ValueError(
+            f"No trained models for {unmodeled or 'an empty index list'}; "
+            f"AEGIS_INDICES must be a subset of {list(MODELED_INDICES)}"
+        )
+    return list(indices)
+
+
+def list_generations() -> List[str]:
+    """Published generation ids, oldest first."""
+    if not GENERATIONS_DIR.exists():
+        return []
+    return sorted(p.name for p in GENERATIONS_DIR.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def _link_or_copy(src: Path, dst: Path):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _prune(keep: int, current: str):
+    for generation in list_generations()[:-keep]:
+        if generation != current:
+            shutil.rmtree(GENERATIONS_DIR / generation, ignore_errors=True)
+            logger.info(f"Pruned model generation {generation}")
+
+
+@contextmanager
+def stage_generation(keep: int = MODEL_KEEP_GENERATIONS) -> Iterator[Path]:
+    """
+    Stage a new model generation and publish it if the block succeeds.
+
+    Files of the current generation are carried forward, so a run that only
+    retrains one engine still publishes a complete set. Staging directories
+    are invisible to inference until CURRENT is switched; publishers are
+    serialized by an advisory lock on MODEL_DIR.
+
+    Yields:
+        Staging directory to write model files into
+    """
+    GENERATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    generation = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}"
+    staging = GENERATIONS_DIR / f".{generation}"
+    staging.mkdir()
+    try:
+        yield staging
+        with write_lock(GENERATIONS_DIR):
+            # Carry forward whatever this run did not write, from the generation current *now*
+            base = current_generation()
+            for src in base.iterdir():
+                if src.suffix in MODEL_SUFFIXES and not (staging / src.name).exists():
+                    _link_or_copy(src, staging / src.name)
+            staging.rename(GENERATIONS_DIR / generation)
+            atomic_write_text(CURRENT_POINTER, generation + "\n")
+            logger.info(f"Published model generation {generation}")
+            _prune(keep, generation)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+@contextmanager
+def training_generation() -> Iterator[Path]:
+    """
+    Directory a training script writes its models into.
+
+    Under train_all.py this is the shared staging directory named by
+    STAGING_ENV, which train_all publishes once every engine has trained;
+    otherwise the script stages and publishes its own generation.
+
+    Yields:
+        Staging directory to write model files into
+    """
+    shared = os.environ.get(STAGING_ENV)
+    if shared:
+        logger.info(f"Writing models into shared staging directory {shared}")
+        yield Path(shared)
+        return
+    with stage_generation() as staging:
+        yield staging
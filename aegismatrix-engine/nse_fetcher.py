@@ -3,16 +3,30 @@ NSE Option Chain Fetcher - Fallback for intraday/current market data
 When yfinance intraday fails, use direct NSE API as fallback
 """
 
-import requests
 import json
+import sys
+import time
 from pathlib import Path
 from datetime import datetime, timezone
 import logging
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR, NSE_COOKIE_MAX_AGE
+from http_client import get_http_client
+from atomic_io import atomic_write_text
+from rate_limiter import CircuitOpenError
+from option_chain import OptionChain
+from option_history import OPTION_HISTORY
 
 logger = logging.getLogger(__name__)
 
-NSE_CHAIN_URL = "https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY"
+NSE_HOME_URL = "https://www.nseindia.com"
+NSE_CHAIN_URL_TEMPLATE = "https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
+NSE_CHAIN_URL = NSE_CHAIN_URL_TEMPLATE.format(symbol="NIFTY")
 NSE_QUOTE_URL = "https://www.nseindia.com/api/quote-equity?symbol=NIFTY50"
+NSE_COOKIE_PATH = DATA_DIR / "nse_cookies.json"
 
 HDR = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -21,27 +35,106 @@ HDR = {
     "Referer": "https://www.nseindia.com/",
 }
 
+# Epoch time after which the current NSE cookies must be re-warmed (0 = no cookies)
+_cookie_expiry = 0.0
+
+
+def _save_cookies(client) -> None:
+    """Persist NSE cookies with an overall expiry (earliest cookie expiry, capped)."""
+    global _cookie_expiry
+    now = time.time()
+    cookies = [c for c in client.cookies if "nseindia.com" in c.domain]
+    expiries = [c.expires for c in cookies if c.expires]
+    _cookie_expiry = min(expiries + [now + NSE_COOKIE_MAX_AGE])
+    
+    payload = {
+        "expires_at": _cookie_expiry,
+        "cookies": [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires}
+            for c in cookies
+        ],
+    }
+    try:
+        NSE_COOKIE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(NSE_COOKIE_PATH, json.dumps(payload))
+    except OSError as e:
+        logger.debug(f"Failed to persist NSE cookies: {e}")
 
-def get_nse_option_chain(max_retries=2):
+
+def _load_cookies(client) -> bool:
     """
-    Fetch live NIFTY option chain data from NSE.
-    Includes current spot price and volatility.
+    Load persisted NSE cookies into the shared client if they have not expired.
+    
+    Returns:
+        True if usable cookies were loaded
+    """
+    global _cookie_expiry
+    try:
+        payload = json.loads(NSE_COOKIE_PATH.read_text())
+    except (OSError, ValueError):
+        return False
+    
+    if payload.get("expires_at", 0) <= time.time() or not payload.get("cookies"):
+        return False
+    
+    for c in payload["cookies"]:
+        client.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"], expires=c["expires"])
+    _cookie_expiry = payload["expires_at"]
+    logger.debug(f"Reusing {len(payload['cookies'])} persisted NSE cookies")
+    return True
+
+
+def _warm_session(client) -> None:
+    """Hit the NSE homepage to obtain fresh cookies, then persist them."""
+    logger.info("Warming NSE session cookies...")
+    client.get(NSE_HOME_URL, headers=HDR, timeout=10)
+    _save_cookies(client)
+
+
+def nse_get(url: str, timeout: float = 15):
+    """
+    GET an NSE API endpoint, reusing cached cookies across calls and runs.
+    The homepage warm-up only happens when there are no valid cookies or
+    NSE answers 401/403.
     
+    Args:
+        url: NSE API URL
+        timeout: Request timeout in seconds
+        
     Returns:
-        dict with spot, vix, option chain data or None if failed
+        requests.Response
+    """
+    client = get_http_client()
+    if _cookie_expiry <= time.time() and not _load_cookies(client):
+        _warm_session(client)
+    
+    response = client.get(url, headers=HDR, timeout=timeout)
+    if response.status_code in (401, 403):
+        logger.info(f"NSE returned {response.status_code}, re-warming cookies")
+        _warm_session(client)
+        response = client.get(url, headers=HDR, timeout=timeout)
+    return response
+
+
+def get_nse_option_chain(symbol="NIFTY", max_retries=2):
     """
-    session = requests.Session()
-    session.headers.update(HDR)
+    Fetch live index option chain data from NSE.
+    Includes current spot price and volatility.
+    
+    Args:
+        symbol: NSE index symbol (NIFTY, BANKNIFTY, FINNIFTY, MIDCPNIFTY)
+        max_retries: Attempts before giving up
     
+    Returns:
+        dict with spot, columnar OptionChain ("chain"), per-strike OI change
+        since the session open ("oi_change") and the raw payload, or None if failed
+    """
     for attempt in range(max_retries):
         try:
-            logger.info(f"Fetching NSE option chain (attempt {attempt+1}/{max_retries})...")
+            logger.info(f"Fetching NSE {symbol} option chain (attempt {attempt+1}/{max_retries})...")
             
-            # Establish session first
-            session.get("https://www.nseindia.com", timeout=10)
-            
-            # Fetch option chain
-            response = session.get(NSE_CHAIN_URL, timeout=15)
+            # Fetch option chain (cookies are reused or re-warmed by nse_get)
+            response = nse_get(NSE_CHAIN_URL_TEMPLATE.format(symbol=symbol), timeout=15)
             response.raise_for_status()
             data = response.json()
             
@@ -56,20 +149,32 @@ def get_nse_option_chain(max_retries=2):
             stats = records.get("strikeLimits", {})
             chain_data = records.get("data", [])
             
-            logger.info(f"✓ Got NSE data: Spot={spot}, Strikes={len(chain_data)}")
+            chain = OptionChain.from_nse(data)
+            try:
+                OPTION_HISTORY.append(chain, symbol)
+                oi_change = OPTION_HISTORY.oi_change_since_open(symbol)
+            except Exception as e:
+                logger.warning(f"Could not archive {symbol} option chain snapshot: {e}")
+                oi_change = pd.DataFrame()
+            
+            logger.info(f"✓ Got NSE data: Spot={spot}, Strikes={len(chain_data)}, Contracts={len(chain)}")
             
             return {
+                "symbol": symbol,
                 "spot": spot,
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "chain_size": len(chain_data),
+                "chain": chain,
+                "oi_change": oi_change,
                 "raw_data": data
             }
             
+        except CircuitOpenError as e:
+            logger.warning(f"{e}; skipping NSE option chain")
+            break
         except Exception as e:
+            # Spacing between attempts comes from the shared rate limiter
             logger.warning(f"NSE fetch failed (attempt {attempt+1}): {e}")
-            if attempt < max_retries - 1:
-                import time
-                time.sleep(1)
     
     logger.error("Failed to fetch NSE option chain after retries")
     return None
@@ -83,15 +188,9 @@ def get_nse_quote():
         dict with price, change, volume or None if failed
     """
     try:
-        session = requests.Session()
-        session.headers.update(HDR)
-        
         logger.info("Fetching NSE quote...")
         
-        # Establish session
-        session.get("https://www.nseindia.com", timeout=10)
-        
-        response = session.get(NSE_QUOTE_URL, timeout=15)
+        response = nse_get(NSE_QUOTE_URL, timeout=15)
         response.raise_for_status()
         data = response.json()
         
@@ -113,5 +212,8 @@ if __name__ == "__main__":
     if chain:
         print(f"✓ Spot: {chain['spot']}")
         print(f"  Strikes in chain: {chain['chain_size']}")
+        print(f"  Nearest expiry {chain['chain'].nearest_expiry}: {chain['chain'].summary()}")
+        if len(chain["oi_change"]):
+            print(f"  OI change since open (nearest expiry):\n{chain['oi_change'].sum()}")
     else:
         print("✗ Failed to fetch NSE data")
@@ -0,0 +1,190 @@
+"""
+Columnar option-chain model built from the NSE option-chain API payload.
+
+All quotes live in one numpy structured array shaped
+(expiry, strike, side), side 0 = CE and 1 = PE, with NaN where NSE has no
+contract. Expiry and strike lookups go through dicts, so reading a single
+contract is O(1) and per-expiry analytics (max pain, PCR, skew) are plain
+vectorized numpy over one slice.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SIDES = ("CE", "PE")
+
+# Output field -> key in each NSE CE/PE record
+NSE_FIELDS = {
+    "oi": "openInterest",
+    "chg_oi": "changeinOpenInterest",
+    "iv": "impliedVolatility",
+    "ltp": "lastPrice",
+    "bid": "bidprice",
+    "ask": "askPrice",
+    "volume": "totalTradedVolume",
+}
+
+QUOTE_DTYPE = np.dtype([(name, "f8") for name in NSE_FIELDS])
+
+ExpiryLike = Union[str, datetime, np.datetime64, pd.Timestamp]
+
+
+def _to_day(expiry: ExpiryLike) -> np.datetime64:
+    """NSE "28-Nov-2024" strings, dates or timestamps -> datetime64[D]."""
+    if isinstance(expiry, str):
+        try:
+            return np.datetime64(datetime.strptime(expiry, "%d-%b-%Y").date(), "D")
+        except ValueError:
+            return np.datetime64(expiry, "D")
+    return np.datetime64(pd.Timestamp(expiry).date(), "D")
+
+
+class OptionChain:
+    """
+    Dense (expiry x strike x side) grid of option quotes.
+
+    Args:
+        expiries: Sorted datetime64[D] expiries
+        strikes: Sorted float64 strikes (union across expiries)
+        quotes: Structured array of QUOTE_DTYPE, shape (len(expiries), len(strikes), 2)
+        spot: Underlying value reported with the chain
+        timestamp: NSE data timestamp
+    """
+
+    def __init__(
+        self,
+        expiries: np.ndarray,
+        strikes: np.ndarray,
+        quotes: np.ndarray,
+        spot: Optional[float] = None,
+        timestamp: Optional[pd.Timestamp] = None,
+    ):
+        self.expiries = np.asarray(expiries, dtype="datetime64[D]")
+        self.strikes = np.asarray(strikes, dtype="float64")
+        self.quotes = quotes
+        self.spot = spot
+        self.timestamp = timestamp
+        self._expiry_idx = {e: i for i, e in enumerate(self.expiries.tolist())}
+        self._strike_idx = {s: j for j, s in enumerate(self.strikes.tolist())}
+
+    @classmethod
+    def from_nse(cls, payload: dict) -> "OptionChain":
+        """
+        Build from the option-chain-indices JSON.
+
+        Args:
+            payload: Decoded NSE response (with a "records" block)
+
+        Returns:
+            OptionChain (empty grid if the payload has no rows)
+        """
+        records = payload.get("records", {}) or {}
+        rows = records.get("data", []) or []
+
+        expiry_of = [_to_day(row["expiryDate"]) for row in rows]
+        strike_of = np.fromiter((row["strikePrice"] for row in rows), dtype="float64", count=len(rows))
+        expiries = np.unique(np.array(expiry_of, dtype="datetime64[D]"))
+        strikes = np.unique(strike_of)
+
+        quotes = np.full((len(expiries), len(strikes), len(SIDES)), np.nan, dtype=QUOTE_DTYPE)
+        e_idx = np.searchsorted(expiries, np.array(expiry_of, dtype="datetime64[D]"))
+        s_idx = np.searchsorted(strikes, strike_of)
+
+        # Per side and field: gather one flat column, scatter it into the grid
+        for side_idx, side in enumerate(SIDES):
+            present = [k for k, row in enumerate(rows) if row.get(side)]
+            if not present:
+                continue
+            at = (e_idx[present], s_idx[present], side_idx)
+            for name, key in NSE_FIELDS.items():
+                quotes[name][at] = np.array([rows[k][side].get(key) for k in present], dtype="float64")
+
+        timestamp = records.get("timestamp")
+        return cls(
+            expiries,
+            strikes,
+            quotes,
+            spot=records.get("underlyingValue"),
+            timestamp=pd.to_datetime(timestamp, format="%d-%b-%Y %H:%M:%S") if timestamp else None,
+        )
+
+    def __len__(self) -> int:
+        """Number of listed contracts."""
+        return int((~np.isnan(self.quotes["oi"])).sum())
+
+    def expiry_index(self, expiry: ExpiryLike) -> int:
+        return self._expiry_idx[_to_day(expiry).astype(object)]
+
+    def strike_index(self, strike: float) -> int:
+        return self._strike_idx[float(strike)]
+
+    @property
+    def nearest_expiry(self) -> Optional[np.datetime64]:
+        return self.expiries[0] if len(self.expiries) else None
+
+    def get(self, expiry: ExpiryLike, strike: float, side: str) -> np.void:
+        """
+        One contract's quote record (O(1)).
+
+        Raises:
+            KeyError: Unknown expiry or strike
+        """
+        return self.quotes[self.expiry_index(expiry), self.strike_index(strike), SIDES.index(side)]
+
+    def expiry_slice(self, expiry: Optional[ExpiryLike] = None) -> np.ndarray:
+        """(strike, side) view for one expiry (nearest if None); all-NaN if the chain has no expiries."""
+        if expiry is None and not len(self.expiries):
+            # Empty chain (e.g. NSE rejected the cookies): stats come out NaN, frames empty
+            return np.full((len(self.strikes), len(SIDES)), np.nan, dtype=QUOTE_DTYPE)
+        i = 0 if expiry is None else self.expiry_index(expiry)
+        return self.quotes[i]
+
+    def to_frame(self, expiry: Optional[ExpiryLike] = None) -> pd.DataFrame:
+        """Wide per-strike frame (CE_oi, PE_oi, ...) for one expiry; unlisted strikes dropped."""
+        block = self.expiry_slice(expiry)
+        data = {
+            f"{side}_{name}": block[:, side_idx][name]
+            for side_idx, side in enumerate(SIDES)
+            for name in QUOTE_DTYPE.names
+        }
+        df = pd.DataFrame(data, index=pd.Index(self.strikes, name="strike"))
+        return df.dropna(how="all")
+
+    def pcr(self, expiry: Optional[ExpiryLike] = None) -> float:
+        """Put/call open-interest ratio for one expiry."""
+        oi = self.expiry_slice(expiry)["oi"]
+        calls = np.nansum(oi[:, 0])
+        return float(np.nansum(oi[:, 1]) / calls) if calls > 0 else float("nan")
+
+    def max_pain(self, expiry: Optional[ExpiryLike] = None) -> float:
+        """
+        Strike minimizing total option-writer payout at expiry.
+
+        Returns:
+            Max-pain strike (NaN if the expiry has no open interest)
+        """
+        oi = np.nan_to_num(self.expiry_slice(expiry)["oi"])
+        if not oi.any():
+            return float("nan")
+        k = self.strikes
+        # payout[i] = sum_j CE_oi[j] * max(k[i] - k[j], 0) + PE_oi[j] * max(k[j] - k[i], 0)
+        diff = k[:, None] - k[None, :]
+        payout = np.maximum(diff, 0) @ oi[:, 0] + np.maximum(-diff, 0) @ oi[:, 1]
+        return float(k[np.argmin(payout)])
+
+    def atm_strike(self, spot: Optional[float] = None) -> Optional[float]:
+        """Listed strike closest to spot (the chain's own spot by default)."""
+        spot = self.spot if spot is None else spot
+        if spot is None or not len(self.strikes):
+            return None
+        return float(self.strikes[np.abs(self.strikes - spot).argmin()])
+
+    def summary(self, expiry: Optional[ExpiryLike] = None) -> Dict[str, float]:
+        """Headline stats for one expiry."""
+        return {"pcr": self.pcr(expiry), "max_pain": self.max_pain(expiry), "atm_strike": self.atm_strike()}
@@ -0,0 +1,256 @@
+"""
+Intraday option-chain history, stored as keyframes plus per-contract deltas.
+
+Every refresh appends one snapshot. The first snapshot of a session, every
+OPTION_KEYFRAME_INTERVAL-th snapshot and any snapshot whose expiry/strike axes
+changed are written in full (keyframe); the rest only store the grid cells
+whose quotes changed since the previous snapshot. Reconstructing a snapshot
+loads the nearest keyframe and applies at most OPTION_KEYFRAME_INTERVAL - 1
+deltas.
+
+Layout: DATA_DIR/option_chain_history/<SYMBOL>/<YYYY-MM-DD>/<seq>_<HHMMSS>_<k|d>.npz
+(IST session date and NSE data time in the file name, so listing a session
+needs no manifest).
+"""
+
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR, OPTION_KEYFRAME_INTERVAL
+from option_chain import OptionChain, QUOTE_DTYPE, SIDES, ExpiryLike, _to_day
+from market_calendar import now_ist
+from atomic_io import atomic_path, write_lock
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = DATA_DIR / "option_chain_history"
+
+
+@dataclass(frozen=True)
+class SnapshotRef:
+    """One stored snapshot (parsed from its file name)."""
+    seq: int
+    time: str  # HHMMSS, IST
+    keyframe: bool
+    path: Path
+
+    @classmethod
+    def parse(cls, path: Path) -> Optional["SnapshotRef"]:
+        try:
+            seq, hhmmss, kind = path.stem.split("_")
+            return cls(int(seq), hhmmss, kind == "k", path)
+        except ValueError:
+            return None
+
+
+def _changed_cells(prev: np.ndarray, curr: np.ndarray) -> np.ndarray:
+    """Flat indices of grid cells where any field differs (NaN == NaN)."""
+    changed = np.zeros(curr.shape, dtype=bool)
+    for name in QUOTE_DTYPE.names:
+        a, b = prev[name], curr[name]
+        changed |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    return np.flatnonzero(changed)
+
+
+def _meta(chain: OptionChain) -> Dict[str, np.ndarray]:
+    ts = chain.timestamp if chain.timestamp is not None else pd.Timestamp(now_ist().replace(tzinfo=None))
+    return {
+        "spot": np.float64(np.nan if chain.spot is None else chain.spot),
+        "timestamp": np.datetime64(ts.to_datetime64(), "s"),
+    }
+
+
+class OptionChainHistory:
+    """
+    Append-only snapshot history per symbol and session.
+
+    Args:
+        root: Base directory
+        keyframe_interval: Write a full snapshot every N appends
+    """
+
+    def __init__(self, root: Path = HISTORY_DIR, keyframe_interval: int = OPTION_KEYFRAME_INTERVAL):
+        self.root = Path(root)
+        self.keyframe_interval = keyframe_interval
+        # symbol -> (session, last seq, last chain) so appends only re-read disk after another writer
+        self._last: Dict[str, Tuple[date, int, OptionChain]] = {}
+
+    def _session_dir(self, symbol: str, session: date) -> Path:
+        return self.root / symbol / session.isoformat()
+
+    def snapshots(self, symbol: str, session: date) -> List[SnapshotRef]:
+        """Stored snapshots for a session, in order."""
+        base = self._session_dir(symbol, session)
+        if not base.exists():
+            return []
+        refs = [SnapshotRef.parse(p) for p in base.glob("[0-9]*.npz")]
+        return sorted((r for r in refs if r is not None), key=lambda r: r.seq)
+
+    def sessions(self, symbol: str) -> List[date]:
+        """Sessions with stored snapshots, oldest first."""
+        base = self.root / symbol
+        if not base.exists():
+            return []
+        found = []
+        for entry in base.iterdir():
+            try:
+                found.append(date.fromisoformat(entry.name))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def append(self, chain: OptionChain, symbol: str = "NIFTY") -> SnapshotRef:
+        """
+        Store a new snapshot as a keyframe or a delta against the previous one.
+        Appenders (e.g. overlapping runs) serialize on a lock per session.
+
+        Returns:
+            Reference to the written snapshot
+        """
+        meta = _meta(chain)
+        ts = pd.Timestamp(meta["timestamp"])
+        session = ts.date()
+        base = self._session_dir(symbol, session)
+        base.mkdir(parents=True, exist_ok=True)
+
+        with write_lock(base):
+            refs = self.snapshots(symbol, session)
+            last = self._last.get(symbol)
+            if refs and (last is None or last[0] != session or last[1] != refs[-1].seq):
+                # Another process appended since our last write: diff against its snapshot
+                last = (session, refs[-1].seq, self.load(symbol, session, refs[-1].seq))
+            elif not refs:
+                last = None
+
+            prev = None
+            seq = 0
+            if last is not None:
+                _, prev_seq, prev = last
+                seq = prev_seq + 1
+
+            keyframe = (
+                prev is None
+                or seq % self.keyframe_interval == 0
+                or not np.array_equal(prev.expiries, chain.expiries)
+                or not np.array_equal(prev.strikes, chain.strikes)
+            )
+
+            path = base / f"{seq:05d}_{ts.strftime('%H%M%S')}_{'k' if keyframe else 'd'}.npz"
+            with atomic_path(path) as tmp:
+                if keyframe:
+                    np.savez_compressed(
+                        tmp, expiries=chain.expiries, strikes=chain.strikes, quotes=chain.quotes, **meta
+                    )
+                else:
+                    cells = _changed_cells(prev.quotes, chain.quotes)
+                    np.savez_compressed(
+                        tmp, cells=cells.astype("int32"), values=chain.quotes.reshape(-1)[cells], **meta
+                    )
+                    logger.debug(f"Option chain delta {symbol} #{seq}: {len(cells)}/{chain.quotes.size} cells changed")
+
+        self._last[symbol] = (session, seq, chain)
+        return SnapshotRef.parse(path)
+
+    def replay(self, symbol: str, session: date, start: int = 0) -> Iterator[OptionChain]:
+        """
+        Yield every snapshot of a session from seq `start`, applying deltas
+        incrementally (each file is read once).
+        """
+        refs = self.snapshots(symbol, session)
+        keyframes = [r for r in refs if r.keyframe and r.seq <= start]
+        if not keyframes:
+            return
+        chain = None
+        for ref in refs:
+            if ref.seq < keyframes[-1].seq:
+                continue
+            with np.load(ref.path) as data:
+                if ref.keyframe:
+                    quotes = data["quotes"].copy()
+                    expiries, strikes = data["expiries"], data["strikes"]
+                else:
+                    quotes = chain.quotes.copy()
+                    quotes.reshape(-1)[data["cells"]] = data["values"]
+                    expiries, strikes = chain.expiries, chain.strikes
+                chain = OptionChain(
+                    expiries,
+                    strikes,
+                    quotes,
+                    spot=float(data["spot"]),
+                    timestamp=pd.Timestamp(data["timestamp"].item()),
+                )
+            if ref.seq >= start:
+                yield chain
+
+    def load(self, symbol: str, session: date, seq: Optional[int] = None) -> Optional[OptionChain]:
+        """
+        Reconstruct one snapshot (latest if seq is None).
+
+        Returns:
+            OptionChain, or None if the session has no such snapshot
+        """
+        refs = self.snapshots(symbol, session)
+        if not refs:
+            return None
+        seq = refs[-1].seq if seq is None else seq
+        for chain in self.replay(symbol, session, start=seq):
+            return chain
+        return None
+
+    def oi_change_since_open(
+        self, symbol: str = "NIFTY", session: Optional[date] = None, expiry: Optional[ExpiryLike] = None
+    ) -> pd.DataFrame:
+        """
+        Per-strike OI change between the session's first and latest snapshot.
+
+        Only two snapshots are reconstructed: the opening keyframe is read
+        directly, the latest one from its nearest keyframe.
+
+        Args:
+            symbol: Index symbol
+            session: IST session date (latest stored session if None)
+            expiry: Expiry to report (nearest if None)
+
+        Returns:
+            DataFrame indexed by strike with CE_oi_change/PE_oi_change
+            (empty if nothing is stored)
+        """
+        if session is None:
+            sessions = self.sessions(symbol)
+            if not sessions:
+                return pd.DataFrame()
+            session = sessions[-1]
+        opening = self.load(symbol, session, seq=0)
+        latest = self.load(symbol, session)
+        if opening is None or latest is None:
+            return pd.DataFrame()
+
+        expiry = latest.nearest_expiry if expiry is None else expiry
+        now_oi = latest.expiry_slice(expiry)["oi"]
+        open_oi = np.full_like(now_oi, np.nan)
+        if expiry is not None and _to_day(expiry).astype(object) in opening._expiry_idx:
+            block = opening.expiry_slice(expiry)["oi"]
+            # Align on strike; strikes listed after the open keep NaN opening OI
+            pos = np.searchsorted(opening.strikes, latest.strikes)
+            pos = np.minimum(pos, len(opening.strikes) - 1)
+            listed = opening.strikes[pos] == latest.strikes
+            open_oi[listed] = block[pos[listed]]
+
+        change = now_oi - open_oi
+        df = pd.DataFrame(
+            {f"{side}_oi_change": change[:, i] for i, side in enumerate(SIDES)},
+            index=pd.Index(latest.strikes, name="strike"),
+        )
+        return df.dropna(how="all")
+
+
+OPTION_HISTORY = OptionChainHistory()
@@ -0,0 +1,293 @@
+"""
+Background cache pre-warmer aligned to the inference cron schedule.
+
+infer.py runs cold on the schedule in INFER_WORKFLOW_PATH and spends the
+start of every run fetching. The pre-warmer reads the same cron lines and,
+PREWARM_LEAD before each scheduled run on an NSE trading day, runs the
+shared fetch stage (daily, VIX, intraday and live quotes for the active
+indices) so the run finds fresh disk caches and the intraday archive
+already merged.
+
+Nothing here bypasses the data layer: fetches go through the shared HTTP
+client and its per-host rate limiter, and the calendar-aware cache checks
+decide whether anything needs downloading at all (e.g. before the open the
+daily caches are already settled and no request is sent). A warm is
+postponed while a host is cooling down and skipped if that would push it
+past the run it is for.
+
+Deployment: the caches must land on the disk infer.py reads. In GitHub
+Actions each run is a fresh runner, so aegismatrix-prewarm.yml runs
+`--once` PREWARM_LEAD before each inference cron and saves
+aegismatrix-engine/data with actions/cache; aegismatrix-infer-build.yml
+restores the newest entry before infer.py (and saves its own for the next
+run). The daemon mode is for a long-lived host that also runs infer.py
+from the same checkout.
+
+Usage:
+    python prewarm.py                 # run in the foreground until interrupted
+    python prewarm.py --once          # warm now and exit
+    python prewarm.py --list          # print the next scheduled runs
+"""
+
+import argparse
+import logging
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import ACTIVE_INDICES, FETCH_DEADLINE_SECONDS, INFER_WORKFLOW_PATH, INTRADAY_CACHE_TTL, PREWARM_LEAD
+from data_fetcher import acquire_universe_data
+from market_calendar import IST, is_trading_day
+from model_registry import modeled_indices
+from rate_limiter import RATE_LIMITER, log_rate_limit_stats
+
+logger = logging.getLogger(__name__)
+
+_CRON_LINE = re.compile(r"""^\s*-\s*cron:\s*['"]([^'"]+)['"]""", re.MULTILINE)
+
+
+def _cron_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    """Expand one cron field ("*", "5", "1-5", "0,30", "*/15")."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/")
+            step = int(step_str)
+        if part == "*":
+            start, stop = low, high
+        elif "-" in part:
+            start, stop = (int(v) for v in part.split("-"))
+        else:
+            start = stop = int(part)
+        if start < low or stop > high or start > stop:
+            raise ValueError(f"Cron value out of range: {field}")
+        values.update(range(start, stop + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSlot:
+    """One cron line (UTC, as GitHub Actions evaluates it)."""
+    expr: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    weekdays: FrozenSet[int]  # Python weekday numbers, Monday = 0
+
+    @classmethod
+    def parse(cls, expr: str) -> "CronSlot":
+        """
+        Parse "minute hour day-of-month month day-of-week".
+
+        Raises:
+            ValueError: Malformed line, or day-of-month/month restrictions (unused by the schedule)
+        """
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields: {expr!r}")
+        minute, hour, dom, month, dow = fields
+        if dom != "*" or month != "*":
+            raise ValueError(f"Day-of-month/month restrictions are not supported: {expr!r}")
+        # Cron counts Sunday as 0 (or 7), Python counts Monday as 0
+        weekdays = frozenset((d - 1) % 7 for d in _cron_field(dow, 0, 7))
+        return cls(expr, _cron_field(minute, 0, 59), _cron_field(hour, 0, 23), weekdays)
+
+    def times_on(self, day: date) -> List[datetime]:
+        """Fire times on a UTC date."""
+        if day.weekday() not in self.weekdays:
+            return []
+        return [
+            datetime(day.year, day.month, day.day, h, m, tzinfo=timezone.utc)
+            for h in sorted(self.hours)
+            for m in sorted(self.minutes)
+        ]
+
+
+def load_schedule(path: Path = INFER_WORKFLOW_PATH) -> List[CronSlot]:
+    """
+    Cron slots of the inference workflow.
+
+    Args:
+        path: Workflow YAML (only its `- cron: '...'` lines are read)
+
+    Returns:
+        List of CronSlot (empty if the file is missing or has no schedule)
+    """
+    try:
+        text = Path(path).read_text()
+    except OSError as e:
+        logger.error(f"Cannot read inference schedule {path}: {e}")
+        return []
+    slots = []
+    for expr in _CRON_LINE.findall(text):
+        try:
+            slots.append(CronSlot.parse(expr))
+        except ValueError as e:
+            logger.warning(f"Skipping cron line: {e}")
+    return slots
+
+
+def upcoming_runs(slots: List[CronSlot], after: datetime, days: int = 14) -> Iterator[datetime]:
+    """
+    Scheduled runs strictly after `after`, in order, on NSE trading days only
+    (runs on holidays find every cache fresh and need no warming).
+
+    Args:
+        slots: Parsed schedule
+        after: Reference time (timezone-aware)
+        days: How far ahead to look
+    """
+    after = after.astimezone(timezone.utc)
+    for offset in range(days + 1):
+        day = after.date() + timedelta(days=offset)
+        runs = sorted({t for slot in slots for t in slot.times_on(day)})
+        for run in runs:
+            if run > after and is_trading_day(run.astimezone(IST).date()):
+                yield run
+
+
+def next_run(slots: List[CronSlot], after: Optional[datetime] = None) -> Optional[datetime]:
+    """Next scheduled run after `after` (default: now), or None if there is none within two weeks."""
+    after = after if after is not None else datetime.now(timezone.utc)
+    return next(upcoming_runs(slots, after), None)
+
+
+def _host_cooldown() -> float:
+    """Longest remaining backoff/open-circuit wait across limited hosts, in seconds."""
+    return max((s["cooldown_s"] for s in RATE_LIMITER.snapshot().values()), default=0.0)
+
+
+def warm_caches(indices: List[str] = ACTIVE_INDICES, deadline: float = FETCH_DEADLINE_SECONDS) -> Dict[str, float]:
+    """
+    Run the shared fetch stage once so its caches are fresh.
+
+    Args:
+        indices: Keys of INDEX_UNIVERSE to warm
+        deadline: Budget for the fetch stage in seconds
+
+    Returns:
+        Per-job fetch timings (seconds); {} if there is nothing to warm
+    """
+    if not indices:
+        logger.warning("No indices to pre-warm, skipping the fetch")
+        return {}
+    start = time.perf_counter()
+    snapshots = acquire_universe_data(indices, deadline)
+    any_snapshot = next(iter(snapshots.values()))
+    logger.info(
+        f"Pre-warmed caches for {indices} in {time.perf_counter() - start:.2f}s"
+        + (f", timed out: {any_snapshot.timed_out}" if any_snapshot.timed_out else "")
+    )
+    return dict(any_snapshot.timings)
+
+
+class CachePrewarmer:
+    """
+    Daemon thread that warms the caches PREWARM_LEAD before each scheduled run.
+
+    Args:
+        slots: Parsed schedule (default: load_schedule())
+        lead: How long before a run to warm
+        indices: Keys of INDEX_UNIVERSE to warm
+    """
+
+    def __init__(
+        self,
+        slots: Optional[List[CronSlot]] = None,
+        lead: timedelta = PREWARM_LEAD,
+        indices: List[str] = ACTIVE_INDICES,
+    ):
+        self.slots = load_schedule() if slots is None else slots
+        self.lead = lead
+        self.indices = modeled_indices(list(indices))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if lead >= INTRADAY_CACHE_TTL:
+            logger.warning(
+                f"Pre-warm lead {lead} is not below the intraday cache TTL {INTRADAY_CACHE_TTL}; "
+                "intraday caches will be stale again by the scheduled run"
+            )
+
+    def start(self) -> "CachePrewarmer":
+        self._thread = threading.Thread(target=self.run_forever, name="cache-prewarmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_forever(self):
+        """Sleep until each warm time and warm; returns when stopped or the schedule is empty."""
+        if not self.slots:
+            logger.error("No inference schedule found, pre-warmer not started")
+            return
+        after = datetime.now(timezone.utc)
+        while not self._stop.is_set():
+            run = next_run(self.slots, after)
+            if run is None:
+                logger.error("No scheduled run on a trading day within two weeks, pre-warmer stopping")
+                return
+            warm_at = run - self.lead
+            logger.info(f"Next inference run {run.astimezone(IST):%Y-%m-%d %H:%M} IST, warming at {warm_at.astimezone(IST):%H:%M:%S}")
+            if self._stop.wait(max(0.0, (warm_at - datetime.now(timezone.utc)).total_seconds())):
+                return
+            self._warm_for(run)
+            after = run
+
+    def _warm_for(self, run: datetime):
+        # Wait out a host backoff/open circuit rather than spending the run's retries on it
+        cooldown = _host_cooldown()
+        if cooldown > 0:
+            if datetime.now(timezone.utc) + timedelta(seconds=cooldown) >= run:
+                logger.warning(f"Rate limiter cooling down for {cooldown:.0f}s, skipping warm for {run:%H:%M} UTC")
+                return
+            logger.info(f"Rate limiter cooling down, postponing warm by {cooldown:.0f}s")
+            if self._stop.wait(cooldown):
+                return
+        remaining = (run - datetime.now(timezone.utc)).total_seconds()
+        try:
+            warm_caches(self.indices, deadline=max(1.0, min(FETCH_DEADLINE_SECONDS, remaining)))
+        except Exception as e:
+            logger.error(f"Cache pre-warm failed: {e}")
+        log_rate_limit_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm data caches ahead of scheduled inference runs")
+    parser.add_argument("--once", action="store_true", help="warm now and exit")
+    parser.add_argument("--list", type=int, nargs="?", const=10, metavar="N", help="print the next N scheduled runs")
+    parser.add_argument("--lead", type=float, default=PREWARM_LEAD.total_seconds() / 60, help="minutes before each run")
+    parser.add_argument("--indices", default=",".join(ACTIVE_INDICES), help="comma-separated INDEX_UNIVERSE keys")
+    args = parser.parse_args()
+    indices = modeled_indices([i.strip() for i in args.indices.split(",") if i.strip()])
+
+    if args.once:
+        warm_caches(indices)
+        log_rate_limit_stats()
+        return
+    slots = load_schedule()
+    if args.list:
+        runs = upcoming_runs(slots, datetime.now(timezone.utc))
+        for _, run in zip(range(args.list), runs):
+            print(f"{run:%a %Y-%m-%d %H:%M} UTC  ({run.astimezone(IST):%H:%M} IST)")
+        return
+
+    prewarmer = CachePrewarmer(slots, lead=timedelta(minutes=args.lead), indices=indices)
+    try:
+        prewarmer.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Pre-warmer stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,231 @@
+"""
+Per-host rate limiting shared by every request made through the HTTP client.
+
+Each host gets a token bucket (steady request rate plus a small burst), a
+cool-down window set by Retry-After or jittered exponential backoff after a
+429/5xx/connection error, and a circuit breaker that fails fast once a host
+keeps failing. Concurrent fetches therefore slow down together instead of
+each retrying on its own schedule.
+"""
+
+import logging
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import (
+    RATE_LIMITS,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_MAX_WAIT,
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = {429, 503}
+
+
+class RateLimitExceeded(requests.exceptions.ConnectionError):
+    """The host is cooling down for longer than the caller is willing to wait."""
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The host's circuit breaker is open; the request was not sent."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+
+    Returns:
+        Non-negative seconds, or None if absent/unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """
+    Token bucket, backoff and circuit breaker state for one host.
+
+    Args:
+        host: Hostname (for logs)
+        rate: Sustained requests per second
+        burst: Bucket capacity
+    """
+
+    def __init__(self, host: str, rate: float, burst: int):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0  # consecutive throttles/errors
+        self._state = "closed"  # closed -> open -> half_open -> closed
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counts = {"requests": 0, "throttled": 0, "errors": 0, "rejected": 0}
+        self._waited = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self, max_wait: float = RATE_LIMIT_MAX_WAIT):
+        """
+        Block until a request may be sent.
+
+        Raises:
+            CircuitOpenError: The circuit is open (or a half-open probe is already out)
+            RateLimitExceeded: The required wait is longer than max_wait
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._state == "open":
+                    if now - self._opened_at < CIRCUIT_RESET_SECONDS:
+                        self._counts["rejected"] += 1
+                        raise CircuitOpenError(f"Circuit open for {self.host}")
+                    self._state = "half_open"
+                    logger.info(f"Circuit half-open for {self.host}, sending a probe")
+                if self._state == "half_open":
+                    if self._probe_in_flight:
+                        self._counts["rejected"] += 1
+                        raise CircuitOpenError(f"Circuit half-open for {self.host}, probe in flight")
+
+                self._refill(now)
+                wait = max(self._blocked_until - now, (1.0 - self._tokens) / self.rate, 0.0)
+                if wait <= 0:
+                    self._tokens -= 1.0
+                    self._counts["requests"] += 1
+                    self._waited += waited
+                    if self._state == "half_open":
+                        self._probe_in_flight = True
+                    return
+                if waited + wait > max_wait:
+                    self._counts["rejected"] += 1
+                    raise RateLimitExceeded(f"{self.host} needs a {wait:.1f}s wait (max {max_wait:.1f}s)")
+            time.sleep(wait)
+            waited += wait
+
+    def _backoff(self) -> float:
+        """Full-jitter exponential backoff for the current failure streak."""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._failures - 1)))
+
+    def _fail(self, now: float, delay: float):
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self._probe_in_flight = False
+        if self._state == "half_open" or self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if self._state != "open":
+                logger.warning(f"Circuit opened for {self.host} after {self._failures} consecutive failures")
+            self._state = "open"
+            self._opened_at = now
+
+    def on_response(self, status: int, retry_after: Optional[str] = None):
+        """Update state from a response status (and its Retry-After header)."""
+        with self._lock:
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES or status >= 500:
+                self._failures += 1
+                self._counts["throttled" if status in THROTTLE_STATUSES else "errors"] += 1
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = self._backoff()
+                delay = min(delay, BACKOFF_MAX)
+                logger.info(f"{self.host} returned {status}, cooling down {delay:.1f}s")
+                self._fail(now, delay)
+                return
+            if self._state != "closed":
+                logger.info(f"Circuit closed for {self.host}")
+            self._failures = 0
+            self._state = "closed"
+            self._probe_in_flight = False
+
+    def on_error(self):
+        """Update state after a timeout/connection error."""
+        with self._lock:
+            self._failures += 1
+            self._counts["errors"] += 1
+            self._fail(time.monotonic(), self._backoff())
+
+    def cooling_down(self) -> bool:
+        """True during a backoff wait or while the circuit is not closed."""
+        with self._lock:
+            return self._state != "closed" or self._blocked_until > time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "state": self._state,
+                "tokens": round(self._tokens, 2),
+                "cooldown_s": round(max(0.0, self._blocked_until - now), 2),
+                "consecutive_failures": self._failures,
+                "waited_s": round(self._waited, 2),
+                **self._counts,
+            }
+
+
+class RateLimiter:
+    """Registry of HostLimiter instances, created on first use per host."""
+
+    def __init__(self, limits: Dict[str, tuple] = RATE_LIMITS, default: tuple = RATE_LIMIT_DEFAULT):
+        self.limits = dict(limits)
+        self.default = default
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> HostLimiter:
+        with self._lock:
+            if host not in self._hosts:
+                rate, burst = self.limits.get(host, self.default)
+                self._hosts[host] = HostLimiter(host, rate, burst)
+            return self._hosts[host]
+
+    def cooling_down(self, host: str) -> bool:
+        """True if requests to host are being held back (see HostLimiter.cooling_down)."""
+        with self._lock:
+            limiter = self._hosts.get(host)
+        return limiter is not None and limiter.cooling_down()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host limiter state, for logging and tuning."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limiter.snapshot() for host, limiter in hosts.items()}
+
+
+RATE_LIMITER = RateLimiter()
+
+
+def log_rate_limit_stats():
+    """Log per-host limiter state (call at the end of a run)."""
+    for host, s in RATE_LIMITER.snapshot().items():
+        logger.info(
+            f"Rate limit {host}: {s['requests']} sent, {s['throttled']} throttled, {s['errors']} errors, "
+            f"{s['rejected']} rejected, waited {s['waited_s']}s, circuit {s['state']}"
+        )
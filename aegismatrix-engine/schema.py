@@ -4,7 +4,7 @@ Ensures frontend never breaks due to missing or malformed fields.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional
 from datetime import datetime
 
 
@@ -136,9 +136,22 @@ class BuyerBlock(BaseModel):
     buyer_environment: BuyerEnvironment
 
 
+# Data-quality report (data_quality.QualityReport.to_dict), set on degraded payloads
+class DataQualityReport(BaseModel):
+    name: str
+    kind: Literal["daily", "intraday"]
+    bars: int
+    severity: Literal["ok", "warn", "fail"]
+    counts: Dict[str, int]
+    examples: Dict[str, List[str]]
+    repaired: Dict[str, int]
+
+
 # Top-level schema
 class AegisMatrixPayload(BaseModel):
     generated_at: str = Field(..., description="ISO8601 UTC string")
+    degraded: bool = Field(False, description="Last good payload kept after the fresh data failed the quality gate")
+    data_quality: Optional[List[DataQualityReport]] = Field(None, description="Failed quality reports when degraded")
     market: MarketBlock
     direction: DirectionBlock
     seller: SellerBlock
@@ -14,22 +14,27 @@ import joblib
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import SELLER_EXPIRY_HORIZON_DAYS, SAFE_RANGE_MULTIPLIER, MODEL_DIR
+from config import SELLER_EXPIRY_HORIZON_DAYS, SAFE_RANGE_MULTIPLIER
+from model_registry import current_generation
 
 logger = logging.getLogger(__name__)
 
 
-def load_models():
+def load_models(model_dir=None):
     """
     Load pre-trained seller models.
     
+    Args:
+        model_dir: Model generation directory (default: the published one, see model_registry)
+    
     Returns:
         Tuple of (trap_model, regime_model, breach_model)
     """
+    model_dir = model_dir or current_generation()
     try:
-        trap_model = joblib.load(MODEL_DIR / "seller_trap.pkl")
-        regime_model = joblib.load(MODEL_DIR / "seller_regime.pkl")
-        breach_model = joblib.load(MODEL_DIR / "seller_breach.pkl")
+        trap_model = joblib.load(model_dir / "seller_trap.pkl")
+        regime_model = joblib.load(model_dir / "seller_regime.pkl")
+        breach_model = joblib.load(model_dir / "seller_breach.pkl")
         return trap_model, regime_model, breach_model
     except Exception as e:
         logger.error(f"Error loading seller models: {e}")
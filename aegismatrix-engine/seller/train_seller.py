@@ -26,7 +26,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import MODEL_DIR, RANDOM_SEED, SELLER_EXPIRY_HORIZON_DAYS
 from data_fetcher import get_market_snapshots
-from features.daily_features import build_seller_features
+from model_registry import training_generation
+from feature_store import FEATURE_STORE
+from features.pipeline import FeaturePipeline
 
 # Setup logging
 logging.basicConfig(
@@ -144,7 +146,7 @@ def create_breach_labels(nifty_df, safe_range_multiplier=1.5, horizon=30):
     return labels
 
 
-def train_trap_classifier(X, y_trap):
+def train_trap_classifier(X, y_trap, model_dir=MODEL_DIR):
     """Train XGBoost classifier for volatility trap detection."""
     logger.info("=" * 60)
     logger.info("Training Volatility Trap Classifier")
@@ -186,13 +188,13 @@ def train_trap_classifier(X, y_trap):
     logger.info(f"  AUC-ROC: {auc:.4f}")
     logger.info(classification_report(y_val, y_pred, target_names=["No Trap", "Trap"]))
     
-    joblib.dump(model, MODEL_DIR / "seller_trap.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'seller_trap.pkl'}")
+    joblib.dump(model, model_dir / "seller_trap.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'seller_trap.pkl'}")
     
     return model
 
 
-def train_regime_classifier(X, y_regime):
+def train_regime_classifier(X, y_regime, model_dir=MODEL_DIR):
     """Train classifier for volatility regime detection."""
     logger.info("=" * 60)
     logger.info("Training Regime Classifier")
@@ -230,13 +232,13 @@ def train_regime_classifier(X, y_regime):
     logger.info(classification_report(y_val, y_pred, 
                                       target_names=["Low Vol", "Med Vol", "High Vol"]))
     
-    joblib.dump(model, MODEL_DIR / "seller_regime.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'seller_regime.pkl'}")
+    joblib.dump(model, model_dir / "seller_regime.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'seller_regime.pkl'}")
     
     return model
 
 
-def train_breach_classifier(X, y_breach):
+def train_breach_classifier(X, y_breach, model_dir=MODEL_DIR):
     """Train classifier for breach probability prediction."""
     logger.info("=" * 60)
     logger.info("Training Breach Classifier")
@@ -277,8 +279,8 @@ def train_breach_classifier(X, y_breach):
     logger.info(f"  Accuracy: {accuracy:.4f}")
     logger.info(f"  AUC-ROC: {auc:.4f}")
     
-    joblib.dump(model, MODEL_DIR / "seller_breach.pkl")
-    logger.info(f"✓ Model saved: {MODEL_DIR / 'seller_breach.pkl'}")
+    joblib.dump(model, model_dir / "seller_breach.pkl")
+    logger.info(f"✓ Model saved: {model_dir / 'seller_breach.pkl'}")
     
     return model
 
@@ -299,7 +301,7 @@ def main():
     
     # Build features
     logger.info("Building seller features...")
-    features_df = build_seller_features(nifty, vix)
+    features_df = FeaturePipeline(nifty, vix, name="NIFTY", store=FEATURE_STORE).seller()
     
     if features_df is None or len(features_df) < 200:
         logger.error("Feature engineering failed")
@@ -328,9 +330,11 @@ def main():
                f"Regime: {np.bincount(y_regime)}, Breach: {np.bincount(y_breach)}")
     
     # Train models
-    train_trap_classifier(X, y_trap)
-    train_regime_classifier(X, y_regime)
-    train_breach_classifier(X, y_breach)
+    # Written into a staged model generation, published atomically on success
+    with training_generation() as model_dir:
+        train_trap_classifier(X, y_trap, model_dir)
+        train_regime_classifier(X, y_regime, model_dir)
+        train_breach_classifier(X, y_breach, model_dir)
     
     logger.info("=" * 60)
     logger.info("✓ Seller training complete!")
@@ -15,9 +15,11 @@ Usage:
     python train_all.py --engine seller     # Train only seller
     python train_all.py --engine buyer      # Train only buyer
 
-Models output to: models/
+Models output to: models/ (a full run publishes one generation, only if
+every engine trained)
 """
 
+import os
 import sys
 import time
 import subprocess
@@ -25,6 +27,10 @@ import logging
 from pathlib import Path
 import argparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from model_registry import STAGING_ENV, stage_generation
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,8 +41,27 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).resolve().parent
 
 
-def run_training_script(script_name, description):
-    """Run a training script and handle errors."""
+class TrainingFailed(RuntimeError):
+    """An engine failed, so the staged generation must not be published."""
+
+
+def run_training_script(script_name, description, staging_dir=None):
+    """
+    Run a training script and handle errors.
+    
+    Args:
+        script_name: Script path relative to the project root
+        description: Engine name for the logs
+        staging_dir: Shared generation directory to train into (None = the
+            script stages and publishes its own)
+        
+    Returns:
+        True if the script succeeded
+    """
+    env = None
+    if staging_dir is not None:
+        env = {**os.environ, STAGING_ENV: str(staging_dir)}
+    
     script_path = PROJECT_ROOT / script_name
     
     logger.info("=" * 70)
@@ -50,6 +75,7 @@ def run_training_script(script_name, description):
         result = subprocess.run(
             [sys.executable, str(script_path)],
             cwd=str(PROJECT_ROOT),
+            env=env,
             capture_output=False,
             timeout=300  # 5 minute timeout per script
         )
@@ -79,29 +105,37 @@ def train_all():
     start_time = time.time()
     results = {}
     
-    # Train Direction Engine
-    results['direction'] = run_training_script(
-        'direction/train_direction.py',
-        'Direction Engine (AegisCore)'
-    )
-    
-    if not results['direction']:
-        logger.warning("Direction training failed, continuing with other engines...")
-    
-    # Train Seller Engine
-    results['seller'] = run_training_script(
-        'seller/train_seller.py',
-        'Seller Engine (RangeShield)'
-    )
-    
-    if not results['seller']:
-        logger.warning("Seller training failed, continuing with buyer engine...")
-    
-    # Train Buyer Engine
-    results['buyer'] = run_training_script(
-        'buyer/train_buyer.py',
-        'Buyer Engine (TrendScout)'
-    )
+    # One generation for all three engines, published only if every engine trained
+    try:
+        with stage_generation() as staging_dir:
+            results['direction'] = run_training_script(
+                'direction/train_direction.py',
+                'Direction Engine (AegisCore)',
+                staging_dir
+            )
+            
+            if not results['direction']:
+                logger.warning("Direction training failed, continuing with other engines (nothing will be published)...")
+            
+            results['seller'] = run_training_script(
+                'seller/train_seller.py',
+                'Seller Engine (RangeShield)',
+                staging_dir
+            )
+            
+            if not results['seller']:
+                logger.warning("Seller training failed, continuing with buyer engine (nothing will be published)...")
+            
+            results['buyer'] = run_training_script(
+                'buyer/train_buyer.py',
+                'Buyer Engine (TrendScout)',
+                staging_dir
+            )
+            
+            if not all(results.values()):
+                raise TrainingFailed()
+    except TrainingFailed:
+        logger.warning("Discarded the staged model generation, the published models are unchanged")
     
     # Summary
     total_time = time.time() - start_time
@@ -0,0 +1,93 @@
+"""
+Fast parser for Yahoo v8 chart responses.
+
+Decodes the body with orjson when it is installed (stdlib json otherwise) and
+builds the OHLCV frame straight from typed numpy arrays: one float64 block for
+all five columns, one validity mask for nulls, no intermediate DataFrame.
+The chart `meta` block (regularMarketPrice, previousClose, ...) is returned
+alongside so callers do not need a separate quote request.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # optional speed-up
+    orjson = None
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+QUOTE_FIELDS = ("open", "high", "low", "close", "volume")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class ChartError(ValueError):
+    """Error or malformed chart payload (worth retrying), as opposed to a well-formed empty range."""
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype="float64")
+
+
+def parse_chart(content: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Parse a chart response body.
+
+    Rows with a null in any OHLCV field are dropped (same as DataFrame.dropna
+    on the old list-based path); a field missing from the quote block counts
+    as null throughout.
+
+    Args:
+        content: Raw response body (bytes or str)
+
+    Returns:
+        (OHLCV frame indexed by naive-UTC "Date", meta dict); the frame is
+        empty if the range has no bars (holiday, newly listed symbol)
+
+    Raises:
+        ValueError: The body is not valid JSON (json.JSONDecodeError)
+        ChartError: The body carries a chart error, has no result, or has
+            bars that are all null
+    """
+    data = loads(content)
+    chart = data.get("chart") or {}
+    if chart.get("error"):
+        raise ChartError(f"chart error: {chart['error']}")
+    results = chart.get("result") or []
+    if not results:
+        raise ChartError("chart response has no result")
+
+    result = results[0]
+    meta = result.get("meta") or {}
+    timestamps = result.get("timestamp") or []
+    quote = ((result.get("indicators") or {}).get("quote") or [{}])[0] or {}
+    n = len(timestamps)
+    if n == 0 or not quote:
+        return _empty(), meta
+
+    # (5, n) float64 block; None -> NaN during the conversion itself
+    values = np.full((len(QUOTE_FIELDS), n), np.nan)
+    for row, name in enumerate(QUOTE_FIELDS):
+        series = quote.get(name)
+        if series is not None and len(series) == n:
+            values[row] = np.array(series, dtype="float64")
+
+    valid = ~np.isnan(values).any(axis=0)
+    if not valid.any():
+        raise ChartError(f"all {n} bars have null fields")
+    ts = np.fromiter(timestamps, dtype="int64", count=n)
+    if not valid.all():
+        values = values[:, valid]
+        ts = ts[valid]
+
+    index = pd.DatetimeIndex(pd.to_datetime(ts, unit="s"), name="Date")
+    # Transposed view of a C-ordered (5, n) array: pandas keeps it as one block without copying
+    df = pd.DataFrame(values.T, index=index, columns=COLUMNS, copy=False)
+    return df, meta
@@ -5,12 +5,25 @@
 
 export interface AegisMatrixData {
   generated_at: string;
+  degraded?: boolean; // last good payload kept after the fresh data failed the quality gate
+  data_quality?: DataQualityReport[]; // failed quality reports when degraded
   market: MarketBlock;
   direction: DirectionBlock;
   seller: SellerBlock;
   buyer: BuyerBlock;
 }
 
+// Data-quality report (set with degraded)
+export interface DataQualityReport {
+  name: string;
+  kind: "daily" | "intraday";
+  bars: number;
+  severity: "ok" | "warn" | "fail";
+  counts: Record<string, number>;
+  examples: Record<string, string[]>;
+  repaired: Record<string, number>;
+}
+
 // Market Block
 export interface MarketBlock {
   spot: number;
@@ -181,8 +181,20 @@ export const buyerDataResponseSchema = z.object({
   environment_state: z.enum(["PREMIUM_FRIENDLY", "CAUTIOUS", "AVOID_FULL_RISK"]),
 });
 
+export const dataQualityReportSchema = z.object({
+  name: z.string(),
+  kind: z.enum(["daily", "intraday"]),
+  bars: z.number(),
+  severity: z.enum(["ok", "warn", "fail"]),
+  counts: z.record(z.number()),
+  examples: z.record(z.array(z.string())),
+  repaired: z.record(z.number()),
+});
+
 export const aegisMatrixDataSchema = z.object({
   generated_at: z.string(),
+  degraded: z.boolean().optional(),
+  data_quality: z.array(dataQualityReportSchema).optional(),
   market: marketDataSchema,
   direction: directionDataSchema,
   seller: sellerDataResponseSchema,
@@ -194,4 +206,5 @@ export type HorizonData = z.infer<typeof horizonDataSchema>;
 export type DirectionData = z.infer<typeof directionDataSchema>;
 export type SellerDataResponse = z.infer<typeof sellerDataResponseSchema>;
 export type BuyerDataResponse = z.infer<typeof buyerDataResponseSchema>;
+export type DataQualityReport = z.infer<typeof dataQualityReportSchema>;
 export type AegisMatrixData = z.infer<typeof aegisMatrixDataSchema>;